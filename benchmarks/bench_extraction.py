@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for resume text extraction.
+
+Compares the current extraction layer (src/services/extraction.py) with the
+original implementation (temp-file DOCX parsing, string-concatenated PDF
+pages) over a generated corpus of PDF and DOCX files.
+
+    python benchmarks/bench_extraction.py [--repeat 5] [--json]
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PyPDF2
+import docx
+from werkzeug.datastructures import FileStorage
+
+from benchmarks.synthetic import make_resume
+from src.services.extraction import extract_text_from_upload
+
+CORPUS = [
+    ('pdf', 45), ('pdf', 225), ('pdf', 1350), ('pdf', 9000),
+    ('docx', 50), ('docx', 500), ('docx', 5000),
+]
+
+
+def legacy_extract(filename, data):
+    """The original extract_text_from_pdf / extract_text_from_docx behavior"""
+    file = FileStorage(stream=io.BytesIO(data), filename=filename)
+    if filename.endswith('.pdf'):
+        text = ""
+        for page in PyPDF2.PdfReader(file).pages:
+            text += page.extract_text() + "\n"
+        return text.strip()
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp_file:
+        file.save(tmp_file.name)
+        document = docx.Document(tmp_file.name)
+        text = ""
+        for paragraph in document.paragraphs:
+            text += paragraph.text + "\n"
+        os.unlink(tmp_file.name)
+        return text.strip()
+
+
+def time_call(func, filename, data, repeat):
+    timings = []
+    text = ''
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = func(filename, data)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), len(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    args = parser.parse_args()
+
+    results = []
+    for file_type, lines in CORPUS:
+        filename, data = make_resume(file_type, lines)
+        legacy_time, legacy_chars = time_call(legacy_extract, filename, data, args.repeat)
+        current_time, current_chars = time_call(extract_text_from_upload, filename, data, args.repeat)
+        results.append({
+            'type': file_type, 'lines': lines, 'bytes': len(data),
+            'legacy_ms': round(legacy_time * 1000, 2), 'current_ms': round(current_time * 1000, 2),
+            'legacy_chars': legacy_chars, 'current_chars': current_chars
+        })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'type':<5} {'lines':>6} {'bytes':>9} {'legacy ms':>10} {'current ms':>11} "
+          f"{'legacy chars':>13} {'current chars':>14}")
+    for r in results:
+        print(f"{r['type']:<5} {r['lines']:>6} {r['bytes']:>9} {r['legacy_ms']:>10} {r['current_ms']:>11} "
+              f"{r['legacy_chars']:>13} {r['current_chars']:>14}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the analysis history endpoints on a large history.
+
+Fills a scratch SQLite database with --records synthetic analyses (and their
+full-text index entries) directly, then times, in this process:
+
+  newest        GET /api/analyses, first page
+  deep          the same, a page starting --records * 0.9 rows in (by cursor)
+  score         sort=score, first page
+  score_range   minScore=90, first page
+  date_range    from/to spanning a middle tenth of the history
+  job           jobDigest filter (one of 50 job descriptions)
+  search_common q= a word in half of the resumes
+  search_rare   q= a word in 1 in 10000 resumes
+  export_csv / export_ndjson
+                GET /api/analyses/export for about --export-rows rows (a
+                score band), and the peak Python memory of a second run
+
+    python benchmarks/bench_history.py [--records 1000000] [--repeat 5]
+        [--export-rows 100000] [--explain] [--json]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+from datetime import datetime, timedelta, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.load_test import percentile
+
+WORDS = ('python', 'java', 'kubernetes', 'docker', 'postgresql', 'react', 'terraform', 'aws', 'leadership',
+         'mentoring', 'microservices', 'kafka', 'spark', 'airflow', 'golang', 'rust', 'typescript', 'graphql',
+         'redis', 'linux', 'agile', 'scrum', 'analytics', 'security', 'testing', 'ci', 'cd', 'design')
+COMMON_WORD = 'experienced'
+RARE_WORD = 'zanzibarian'
+SEED_BATCH = 5000
+
+
+def seed(db, records, rng):
+    """Insert synthetic records and index entries with plain executemany batches"""
+    start = datetime.now(timezone.utc) - timedelta(days=365)
+    jobs = [hashlib.sha256(f'job {i}'.encode()).hexdigest() for i in range(50)]
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        for first in range(1, records + 1, SEED_BATCH):
+            rows, terms = [], []
+            for record_id in range(first, min(first + SEED_BATCH, records + 1)):
+                score = rng.randint(0, 100)
+                recommendations = [f"Highlight {rng.choice(WORDS)} experience", f"Add {rng.choice(WORDS)} projects"]
+                result = {'matchScore': score, 'recommendations': recommendations,
+                          'suitability': {'overall': 'Synthetic', 'strengths': [], 'concerns': []},
+                          'skillGaps': {'missing': [rng.choice(WORDS)], 'weak': []}}
+                created_at = start + timedelta(seconds=record_id * 365 * 86400 / records)
+                rows.append((record_id, created_at.strftime('%Y-%m-%d %H:%M:%S.%f'),
+                             hashlib.sha256(str(record_id).encode()).hexdigest(), rng.choice(jobs), score,
+                             'ai', zlib.compress(json.dumps(result).encode(), 6)))
+                resume = ' '.join(rng.choice(WORDS) for _ in range(40))
+                if record_id % 2 == 0:
+                    resume += ' ' + COMMON_WORD
+                if record_id % 10000 == 0:
+                    resume += ' ' + RARE_WORD
+                terms.append((record_id, resume, '\n'.join(recommendations)))
+            cursor.executemany('INSERT INTO analysis_record (id, created_at, resume_digest, job_digest, '
+                               'match_score, source, result_compressed) VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            cursor.executemany('INSERT INTO analysis_record_fts (rowid, resume_text, recommendations) '
+                               'VALUES (?, ?, ?)', terms)
+            connection.commit()
+        return start, jobs
+    finally:
+        connection.close()
+
+
+def measure(func, repeat):
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - started)
+    return round(percentile(seconds, 0.5) * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--export-rows', type=int, default=100000)
+    parser.add_argument('--explain', action='store_true', help="Print the query plan of each listing")
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch, 'bench.db')}"
+        # Imported here so DATABASE_URL is set first
+        from src.main import app, init_db
+        from src.models.user import db
+        from src.services.pagination import encode_cursor
+
+        init_db(app)
+        with app.app_context():
+            started = time.perf_counter()
+            start, jobs = seed(db, args.records, rng)
+            seed_seconds = time.perf_counter() - started
+        client = app.test_client()
+
+        def page(query):
+            response = client.get(f'/api/analyses?limit=50&{query}')
+            assert response.status_code == 200, response.data[:200]
+            return json.loads(response.get_data())
+
+        middle = start + timedelta(days=365 * 0.45)
+        deep_cursor = encode_cursor(['newest', args.records - int(args.records * 0.9)])
+        queries = {
+            'newest': '',
+            'deep': f'after={deep_cursor}',
+            'score': 'sort=score',
+            'score_range': 'minScore=90',
+            'date_range': f"from={middle.strftime('%Y-%m-%dT%H:%M:%S')}&to="
+                          f"{(middle + timedelta(days=36.5)).strftime('%Y-%m-%dT%H:%M:%S')}",
+            'job': f'jobDigest={jobs[0]}',
+            'search_common': f'q={COMMON_WORD}',
+            'search_rare': f'q={RARE_WORD}',
+        }
+        results = {'records': args.records, 'seed_seconds': round(seed_seconds, 1)}
+        for name, query in queries.items():
+            rows = len(page(query)['analyses'])
+            results[name] = {'p50_ms': measure(lambda: page(query), args.repeat), 'rows': rows}
+
+        if args.explain:
+            from sqlalchemy.dialects import sqlite
+            from src.services.analysis_history import SUMMARY_COLUMNS, history_query
+            with app.test_request_context():
+                for name, filters, sort in (('search', {'search': COMMON_WORD}, 'newest'),
+                                            ('job', {'job_digest': jobs[0]}, 'newest'),
+                                            ('score', {}, 'score')):
+                    statement = history_query(SUMMARY_COLUMNS, filters, sort).limit(50).statement
+                    sql = str(statement.compile(dialect=sqlite.dialect(), compile_kwargs={'literal_binds': True}))
+                    plan = db.session.execute(db.text('EXPLAIN QUERY PLAN ' + sql)).fetchall()
+                    print(name, [step[-1] for step in plan])
+
+        # A score band holding about --export-rows rows
+        band = max(0, 100 - int(101 * args.export_rows / args.records))
+        for export_format in ('csv', 'ndjson'):
+            def export():
+                response = client.get(f'/api/analyses/export?format={export_format}&minScore={band}')
+                return sum(len(chunk) for chunk in response.response)
+
+            started = time.perf_counter()
+            size = export()
+            seconds = time.perf_counter() - started
+            # Traced separately, since tracing slows allocation down
+            tracemalloc.start()
+            export()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results[f'export_{export_format}'] = {'seconds': round(seconds, 2), 'mb': round(size / 1e6, 1),
+                                                  'peak_mb': round(peak / (1024 * 1024), 1)}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.records} records (seeded in {results['seed_seconds']} s)")
+    print(f"{'listing':<14} {'p50 ms':>9} {'rows':>5}")
+    for name in queries:
+        print(f"{name:<14} {results[name]['p50_ms']:>9} {results[name]['rows']:>5}")
+    for export_format in ('csv', 'ndjson'):
+        r = results[f'export_{export_format}']
+        print(f"export {export_format:<7} {r['seconds']} s, {r['mb']} MB, peak Python memory {r['peak_mb']} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark and corpus check for AI response parsing.
+
+Runs the malformed-response corpus (benchmarks/malformed_responses.py)
+through the original greedy-regex parser and the current one, reporting
+which fields each recovers, then times both on well-formed responses of
+increasing size, on a pathological input, and fed as a token stream.
+
+    python benchmarks/bench_parsing.py [--check] [--json]
+
+--check exits non-zero if the current parser misses any corpus expectation.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.malformed_responses import ALL_FIELDS, CASES, VALID
+from src.services.analysis_schema import ANALYSIS_FIELDS, validate_analysis
+from src.services.json_stream import IncrementalJSONFieldParser, extract_json_fields
+
+
+def legacy_parse(response_text):
+    """The original parse_ai_response; returns None where it fell back to canned text"""
+    json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+    if not json_match:
+        return None
+    try:
+        return json.loads(json_match.group())
+    except json.JSONDecodeError:
+        return None
+
+
+def current_parse(response_text):
+    fields, _ = extract_json_fields(response_text)
+    valid, missing = validate_analysis(fields, ANALYSIS_FIELDS)
+    return valid or None, missing
+
+
+def check_case(case):
+    """Return a list of failed expectations for one corpus case"""
+    parsed, missing = current_parse(case['text'])
+    expect = case['expect']
+    if expect is None:
+        return [] if parsed is None else ['expected no result']
+    if parsed is None:
+        return ['no fields recovered']
+    failures = []
+    for key, value in expect.items():
+        if parsed.get(key) != value:
+            failures.append(f"{key}: got {parsed.get(key)!r}")
+    if missing != case.get('missing', []):
+        failures.append(f"missing: got {missing}")
+    return failures
+
+
+def run_corpus():
+    results = []
+    for case in CASES:
+        legacy = legacy_parse(case['text'])
+        parsed, _ = current_parse(case['text'])
+        legacy_valid = validate_analysis(legacy, ANALYSIS_FIELDS)[0] if isinstance(legacy, dict) else {}
+        results.append({
+            'case': case['name'],
+            'legacy_fields': len(legacy_valid),
+            'current_fields': len(parsed or {}),
+            'failures': check_case(case),
+        })
+    return results
+
+
+def sized_response(resume_chars):
+    analysis = json.loads(VALID)
+    analysis['optimizedResume'] = ('<p>Led the migration of billing services to "AWS".</p>\n'
+                                   * (resume_chars // 56 + 1))[:resume_chars]
+    return json.dumps(analysis)
+
+
+def time_it(func, *args, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def stream_parse(text, chunk_size=16):
+    parser = IncrementalJSONFieldParser()
+    for i in range(0, len(text), chunk_size):
+        parser.feed(text[i:i + chunk_size])
+    return parser.close()
+
+
+def run_timings():
+    results = []
+    for size in (4_000, 64_000, 1_000_000):
+        text = sized_response(size)
+        results.append({
+            'input': f"valid, {len(text)} chars",
+            'legacy_ms': round(time_it(legacy_parse, text) * 1000, 3),
+            'current_ms': round(time_it(current_parse, text) * 1000, 3),
+            'stream_ms': round(time_it(stream_parse, text) * 1000, 3),
+        })
+    # Many unmatched braces: the greedy regex retries from every one of them
+    text = "{" + "x {" * 20_000
+    results.append({
+        'input': f"unbalanced braces, {len(text)} chars",
+        'legacy_ms': round(time_it(legacy_parse, text, repeat=1) * 1000, 3),
+        'current_ms': round(time_it(current_parse, text, repeat=1) * 1000, 3),
+        'stream_ms': round(time_it(stream_parse, text, repeat=1) * 1000, 3),
+    })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--check', action='store_true', help="Fail if the corpus expectations are not met")
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    args = parser.parse_args()
+
+    corpus = run_corpus()
+    failed = [result for result in corpus if result['failures']]
+    if args.check:
+        for result in failed:
+            print(f"FAIL {result['case']}: {'; '.join(result['failures'])}")
+        print(f"{len(corpus) - len(failed)}/{len(corpus)} corpus cases passed")
+        sys.exit(1 if failed else 0)
+
+    timings = run_timings()
+    if args.json:
+        print(json.dumps({'corpus': corpus, 'timings': timings}, indent=2))
+        return
+
+    print(f"{'case':<42} {'legacy fields':>13} {'current fields':>15}  (of {len(ALL_FIELDS)})")
+    for r in corpus:
+        flag = '' if not r['failures'] else '  FAIL'
+        print(f"{r['case']:<42} {r['legacy_fields']:>13} {r['current_fields']:>15}{flag}")
+    print()
+    print(f"{'input':<36} {'legacy ms':>10} {'current ms':>11} {'stream ms':>10}")
+    for r in timings:
+        print(f"{r['input']:<36} {r['legacy_ms']:>10} {r['current_ms']:>11} {r['stream_ms']:>10}")
+
+
+if __name__ == '__main__':
+    main()
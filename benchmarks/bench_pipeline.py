@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the full /api/analyze pipeline.
+
+Stage timings: each synthetic resume (TXT, DOCX and PDF at several sizes,
+built from sample-resume.txt) is run through the pipeline stages one at a
+time in this process: extraction, local scoring, prompt building, the AI
+call to the fake Together AI server, response parsing and the cache write.
+Reports p50/p95/p99 per stage.
+
+End to end: the app is started in a subprocess (see load_test.py) and
+POST /api/analyze is driven at each concurrency level with distinct
+uploads. Reports throughput, latency percentiles and errors.
+
+    python benchmarks/bench_pipeline.py [--types txt,docx,pdf] [--lines 60,600]
+        [--repeat 10] [--concurrency 1,10,50] [--requests 200] [--mode sync]
+        [--latency 0.5] [--error-rate 0.0] [--json] [--output results.jsonl]
+
+--output appends the run, with its commit and a timestamp, as one JSON line
+so results can be tracked over time.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fake_together import start_in_background
+from benchmarks.load_test import percentile, run_mode
+from benchmarks.synthetic import JOB_DESCRIPTION, make_resume
+
+STAGES = ['extract', 'score', 'prompt', 'ai_call', 'parse', 'cache_write']
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(seconds):
+    if not seconds:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+    return {f"p{int(q * 100)}_ms": round(percentile(seconds, q) * 1000, 2) for q in (0.50, 0.95, 0.99)}
+
+
+def time_stages(app, filename, data, repeat):
+    """Run each pipeline stage repeat times; returns {stage: [seconds]} and the AI error count"""
+    # Imported here so TOGETHER_API_URL and DATABASE_URL are set first
+    from src.routes import analysis
+    from src.services.analysis_cache import make_cache_key, store_analysis
+    from src.services.analysis_schema import ANALYSIS_FIELDS
+    from src.services.extraction import extract_text_from_upload
+    from src.services.scoring import get_scoring_engine
+
+    timings = {stage: [] for stage in STAGES}
+    errors = 0
+
+    def timed(stage, func, *args):
+        start = time.perf_counter()
+        value = func(*args)
+        timings[stage].append(time.perf_counter() - start)
+        return value
+
+    engine = get_scoring_engine()
+    with app.app_context():
+        for i in range(repeat):
+            text = timed('extract', extract_text_from_upload, filename, data)
+            timed('score', lambda: engine.score(engine.compile_job(JOB_DESCRIPTION), text))
+            prompt, max_tokens = timed('prompt', analysis.prepare_analysis_prompt, text, JOB_DESCRIPTION)
+            try:
+                response = timed('ai_call', analysis.call_together_ai, prompt, max_tokens)
+            except Exception:
+                errors += 1
+                continue
+            result, missing, _ = timed('parse', analysis.parse_ai_response, response, ANALYSIS_FIELDS)
+            analysis.complete_analysis(result, missing, text, JOB_DESCRIPTION)
+            key = make_cache_key(text, JOB_DESCRIPTION, analysis.MODEL_NAME, f"bench-{i}")
+            timed('cache_write', store_analysis, key, result)
+    return timings, errors
+
+
+def run_stages(args, upstream_url):
+    os.environ['TOGETHER_API_URL'] = upstream_url
+    from src.main import app, init_db
+    init_db(app)
+
+    results = []
+    for file_type in args.types.split(','):
+        for lines in [int(n) for n in args.lines.split(',')]:
+            filename, data = make_resume(file_type, lines)
+            timings, errors = time_stages(app, filename, data, args.repeat)
+            results.append({
+                'type': file_type, 'lines': lines, 'bytes': len(data), 'ai_errors': errors,
+                'stages': {stage: summarize(seconds) for stage, seconds in timings.items()},
+            })
+    return results
+
+
+def run_end_to_end(args, upstream_url):
+    # Seeds only vary the lines added beyond the seed resume, so keep uploads longer than it
+    uploads = [make_resume(args.e2e_type, 60, seed=i) for i in range(args.requests)]
+    return [run_mode(args.mode, upstream_url, concurrency, args.requests, args.port, uploads)
+            for concurrency in [int(n) for n in args.concurrency.split(',')]]
+
+
+def print_report(report):
+    print(f"commit {report['commit']}, upstream latency {report['config']['latency']}s, "
+          f"error rate {report['config']['error_rate']}")
+    print()
+    columns = [f"{r['type']}/{r['lines']}" for r in report['stages']]
+    print(f"{'stage':<12} " + ' '.join(f"{column:>16}" for column in columns))
+    print(f"{'':<12} " + ' '.join(f"{'p50 / p99 ms':>16}" for _ in columns))
+    for stage in STAGES:
+        cells = []
+        for r in report['stages']:
+            timing = r['stages'][stage]
+            cells.append(f"{timing['p50_ms']} / {timing['p99_ms']}")
+        print(f"{stage:<12} " + ' '.join(f"{cell:>16}" for cell in cells))
+
+    if report['end_to_end']:
+        print()
+        print(f"{'mode':<6} {'clients':>8} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for r in report['end_to_end']:
+            print(f"{r['mode']:<6} {r['concurrency']:>8} {r['req_per_s']:>7} {r['p50_ms']!s:>8} "
+                  f"{r['p95_ms']!s:>8} {r['p99_ms']!s:>8} {r['errors']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--types', default='txt,docx,pdf')
+    parser.add_argument('--lines', default='60,600', help="Synthetic resume sizes in lines")
+    parser.add_argument('--repeat', type=int, default=10, help="Stage runs per resume")
+    parser.add_argument('--concurrency', default='1,10,50', help="End-to-end client counts; empty to skip")
+    parser.add_argument('--requests', type=int, default=200, help="End-to-end requests per level")
+    parser.add_argument('--mode', choices=['sync', 'async'], default='sync')
+    parser.add_argument('--e2e-type', choices=['txt', 'docx', 'pdf'], default='txt')
+    parser.add_argument('--latency', type=float, default=0.5, help="Fake upstream latency in seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of upstream calls that fail")
+    parser.add_argument('--port', type=int, default=8120)
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    parser.add_argument('--output', help="Append the results as one JSON line to this file")
+    args = parser.parse_args()
+
+    upstream = start_in_background(port=args.port + 10, latency=args.latency, error_rate=args.error_rate)
+    upstream_url = f"http://127.0.0.1:{args.port + 10}/v1/chat/completions"
+
+    with tempfile.TemporaryDirectory() as scratch:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch, 'bench.db')}"
+        stages = run_stages(args, upstream_url)
+    end_to_end = run_end_to_end(args, upstream_url) if args.concurrency else []
+    upstream.shutdown()
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'config': {key: getattr(args, key) for key in
+                   ('types', 'lines', 'repeat', 'concurrency', 'requests', 'mode', 'e2e_type',
+                    'latency', 'error_rate')},
+        'stages': stages,
+        'end_to_end': end_to_end,
+    }
+    if args.output:
+        with open(args.output, 'a') as f:
+            f.write(json.dumps(report) + '\n')
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
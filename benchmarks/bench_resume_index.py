@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark for reverse search: ranking stored resumes for a job description.
+
+Fills a scratch SQLite database's extracted text table with --resumes
+synthetic resumes (the seed resume's lines plus a random mix of dictionary
+skills, so documents differ), then compares, in this process:
+
+  exhaustive  decompress and score every stored resume with the local
+              scoring engine, as ranking stored resumes would take without
+              an index
+  index       POST /api/candidates/search through the in-memory resume index
+
+Reports the index build rate and size, search latency (p50/p95 over
+--repeat runs of each job description), and how many of the index's top k
+score at least the exhaustive k-th best score (k of k unless tied scores
+were cut differently). With NumPy installed, --vector-dim also blends in
+hashed term vectors.
+
+    python benchmarks/bench_resume_index.py [--resumes 20000] [--k 20]
+        [--repeat 20] [--vector-dim 0] [--json]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import zlib
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.load_test import percentile
+from benchmarks.synthetic import JOB_DESCRIPTION, seed_lines
+
+JOB_DESCRIPTIONS = {
+    'full_stack': JOB_DESCRIPTION,
+    'data': """
+Data Engineer. You will build batch and streaming data pipelines with Apache Spark, Kafka and
+Airflow, model data in Snowflake and PostgreSQL, and write production Python and SQL. Experience
+with dbt, Terraform and AWS is expected; Scala and machine learning experience is a plus.
+""".strip(),
+    'mobile': """
+Senior iOS Engineer. Build and ship our consumer app in Swift and SwiftUI, with some Objective-C.
+You will own the networking layer, offline storage with Core Data, CI with Fastlane and GitHub
+Actions, and work with the Android team (Kotlin) on shared GraphQL APIs.
+""".strip(),
+}
+SEED_BATCH = 2000
+
+
+def skill_names():
+    from src.services.scoring import SKILLS_DICTIONARY_PATH
+    with open(SKILLS_DICTIONARY_PATH, encoding='utf-8') as f:
+        return [line.split('|')[0].lstrip('=') for line in f if line.strip() and not line.startswith('#')]
+
+
+def make_resume(rng, base, skills):
+    lines = rng.sample(base, min(len(base), 25))
+    lines.append('Skills: ' + ', '.join(rng.sample(skills, 12)))
+    for _ in range(10):
+        lines.append(f"Built {rng.choice(skills)} and {rng.choice(skills)} services (project {rng.randint(1, 999)})")
+    return '\n'.join(lines)
+
+
+def seed(db, count, rng):
+    """Insert synthetic extracted texts with plain executemany batches"""
+    base, skills = seed_lines(), skill_names()
+    now = time.time()
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        for first in range(0, count, SEED_BATCH):
+            rows = []
+            for i in range(first, min(first + SEED_BATCH, count)):
+                text = make_resume(rng, base, skills)
+                rows.append((hashlib.sha256(str(i).encode()).hexdigest(), zlib.compress(text.encode('utf-8'), 6),
+                             len(text), len(text), now, now))
+            cursor.executemany('INSERT INTO extracted_text (digest, text_compressed, source_bytes, text_chars, '
+                               'created_at, last_accessed_at) VALUES (?, ?, ?, ?, ?, ?)', rows)
+            connection.commit()
+    finally:
+        connection.close()
+
+
+def exhaustive(db, job_query):
+    """Score every stored resume; returns {digest: score}"""
+    from src.models.extracted_text import ExtractedText
+    from src.services.scoring import get_scoring_engine
+    engine = get_scoring_engine()
+    scores = {}
+    for digest, text_compressed in db.session.query(ExtractedText.digest, ExtractedText.text_compressed).yield_per(500):
+        scores[digest] = engine.score(job_query, zlib.decompress(text_compressed).decode('utf-8')).score
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=20000)
+    parser.add_argument('--k', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--vector-dim', type=int, default=0, help="Hashed term vector width (needs NumPy)")
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    args = parser.parse_args()
+    rng = random.Random(11)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch, 'bench.db')}"
+        os.environ['RESUME_INDEX_VECTOR_DIM'] = str(args.vector_dim)
+        # Imported here so the environment is set first
+        from src.main import app, init_db
+        from src.models.user import db
+        from src.services.job_postings import prepare_job
+        from src.services.resume_index import resume_index
+
+        init_db(app)
+        with app.app_context():
+            seed(db, args.resumes, rng)
+            started = time.perf_counter()
+            resume_index.refresh()
+            build_seconds = time.perf_counter() - started
+        results = {'resumes': args.resumes, 'k': args.k, 'build_seconds': round(build_seconds, 1),
+                   'build_per_second': round(args.resumes / build_seconds), 'index': resume_index.stats()}
+        client = app.test_client()
+
+        for name, description in JOB_DESCRIPTIONS.items():
+            job_query = prepare_job(description).query
+            with app.app_context():
+                started = time.perf_counter()
+                expected = exhaustive(db, job_query)
+                exhaustive_seconds = time.perf_counter() - started
+
+            seconds = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                response = client.post('/api/candidates/search', data={'jobDescription': description, 'k': args.k})
+                seconds.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.data[:200]
+            kth_best = sorted(expected.values(), reverse=True)[args.k - 1]
+            results[name] = {
+                'exhaustive_ms': round(exhaustive_seconds * 1000, 1),
+                'index_p50_ms': round(percentile(seconds, 0.50) * 1000, 2),
+                'index_p95_ms': round(percentile(seconds, 0.95) * 1000, 2),
+                'agreement': sum(expected[candidate['resumeDigest']] >= kth_best
+                                 for candidate in response.json['candidates']),
+            }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    index = results['index']
+    print(f"{args.resumes} resumes indexed in {results['build_seconds']} s ({results['build_per_second']}/s): "
+          f"{index['terms']} terms, {index['postings']} postings, vectors {index['vector_dim'] or 'off'}")
+    print(f"{'job':<11} {'exhaustive ms':>14} {'index p50 ms':>13} {'p95 ms':>8} {f'top {args.k} agreement':>17}")
+    for name in JOB_DESCRIPTIONS:
+        r = results[name]
+        print(f"{name:<11} {r['exhaustive_ms']:>14} {r['index_p50_ms']:>13} {r['index_p95_ms']:>8} "
+              f"{r['agreement']:>12}/{args.k}")
+
+
+if __name__ == '__main__':
+    main()
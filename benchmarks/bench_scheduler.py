@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Interactive latency while a bulk batch shares the Together AI rate limits.
+
+Starts the fake Together AI server enforcing --rpm (and --tpm) limits, then
+for each scheduler setting starts the app in a subprocess (sync mode, see
+load_test.py) and, while POST /api/analyze/batch screens --resumes distinct
+resumes, sends an interactive POST /api/analyze every --interval seconds:
+
+  off        LLM_RATE_LIMIT_RPM=0: every call goes straight upstream and
+             retries its 429s, as before the scheduler
+  scheduled  LLM_RATE_LIMIT_RPM/TPM set to the fake's limits: bulk calls
+             queue behind interactive ones and leave a reserve for them
+
+Reports interactive p50/p95 and how many interactive analyses fell back to
+the local result instead of the AI's, the batch's duration and fallbacks,
+and the 429s upstream answered.
+
+    python benchmarks/bench_scheduler.py [--resumes 60] [--rpm 120] [--tpm 0]
+        [--interval 2.0] [--latency 0.3] [--json]
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import httpx
+
+from benchmarks.fake_together import RateLimits, start_in_background
+from benchmarks.load_test import distinct_txt_uploads, percentile, wait_until_up
+from benchmarks.synthetic import JOB_DESCRIPTION
+
+# Only the fake's canned assessment says this; the local fallback never does
+AI_MARKER = 'Solid candidate'
+
+
+def run_batch(base_url, uploads, outcome):
+    started = time.perf_counter()
+    files = [('resumes', upload) for upload in uploads]
+    results = []
+    with httpx.Client(base_url=base_url, timeout=None) as client:
+        with client.stream('POST', '/api/analyze/batch', files=files,
+                           data={'jobDescription': JOB_DESCRIPTION}) as response:
+            for line in response.iter_lines():
+                if line:
+                    results.append(json.loads(line))
+    outcome['seconds'] = time.perf_counter() - started
+    outcome['results'] = [r for r in results if r['type'] == 'result']
+    outcome['errors'] = sum(1 for r in results if r['type'] == 'error')
+
+
+def run_setting(name, env, args, upstream, port):
+    uploads = distinct_txt_uploads(args.resumes + 200)
+    batch_uploads, interactive_uploads = uploads[:args.resumes], uploads[args.resumes:]
+    with tempfile.TemporaryDirectory() as scratch:
+        env = dict(os.environ, TOGETHER_API_URL=f"http://127.0.0.1:{upstream.server_port}/v1/chat/completions",
+                   DATABASE_URL=f"sqlite:///{os.path.join(scratch, 'bench.db')}",
+                   # Every resume goes to the AI
+                   BATCH_PREFILTER_THRESHOLD='0', **env)
+        server = subprocess.Popen([sys.executable, os.path.join(REPO_ROOT, 'benchmarks', 'load_test.py'),
+                                   '--serve', 'sync', '--port', str(port)],
+                                  cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, start_new_session=True)
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            wait_until_up(f"{base_url}/api/health", server)
+            with upstream.lock:
+                upstream.limits = RateLimits(args.rpm, args.tpm)
+                # As for a key in steady use, the minute's allowance is already spent
+                upstream.limits.requests = upstream.limits.tokens = 0
+                upstream.rate_limited_count = 0
+
+            batch = {}
+            thread = threading.Thread(target=run_batch, args=(base_url, batch_uploads, batch))
+            thread.start()
+            interactive = []
+            with httpx.Client(base_url=base_url, timeout=None) as client:
+                for upload in interactive_uploads:
+                    time.sleep(args.interval)
+                    if not thread.is_alive():
+                        break
+                    started = time.perf_counter()
+                    response = client.post('/api/analyze', files={'resume': upload},
+                                           data={'jobDescription': JOB_DESCRIPTION})
+                    interactive.append((time.perf_counter() - started, response.status_code,
+                                        AI_MARKER in response.text))
+            thread.join()
+            with upstream.lock:
+                rate_limited = upstream.rate_limited_count
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                pass
+            try:
+                os.killpg(server.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            server.wait()
+
+    latencies = [seconds for seconds, _, _ in interactive]
+    return {
+        'setting': name,
+        'interactive': {
+            'requests': len(interactive),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000) if latencies else None,
+            'p95_ms': round(percentile(latencies, 0.95) * 1000) if latencies else None,
+            'errors': sum(1 for _, status, _ in interactive if status != 200),
+            'fallbacks': sum(1 for _, status, from_ai in interactive if status == 200 and not from_ai),
+        },
+        'batch': {
+            'resumes': args.resumes,
+            'seconds': round(batch['seconds'], 1),
+            'errors': batch['errors'],
+            'fallbacks': sum(1 for r in batch['results'] if AI_MARKER not in json.dumps(r['result'])),
+        },
+        'upstream_429s': rate_limited,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=60)
+    parser.add_argument('--rpm', type=int, default=120, help="Requests per minute the fake allows")
+    parser.add_argument('--tpm', type=int, default=0, help="Tokens per minute the fake allows (0: no limit)")
+    parser.add_argument('--interval', type=float, default=2.0, help="Seconds between interactive requests")
+    parser.add_argument('--latency', type=float, default=0.3, help="Fake upstream latency in seconds")
+    parser.add_argument('--port', type=int, default=8170)
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    args = parser.parse_args()
+
+    upstream = start_in_background(port=0, latency=args.latency)
+    settings = {
+        'off': {'LLM_RATE_LIMIT_RPM': '0', 'LLM_RATE_LIMIT_TPM': '0'},
+        'scheduled': {'LLM_RATE_LIMIT_RPM': str(args.rpm), 'LLM_RATE_LIMIT_TPM': str(args.tpm)},
+    }
+    results = [run_setting(name, env, args, upstream, args.port) for name, env in settings.items()]
+    upstream.shutdown()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.resumes}-resume batch against {args.rpm} rpm"
+          f"{f', {args.tpm} tpm' if args.tpm else ''}, interactive request every {args.interval} s")
+    print(f"{'setting':<10} {'inter p50 ms':>12} {'p95 ms':>8} {'fallbacks':>10} "
+          f"{'batch s':>8} {'batch fallbacks':>16} {'upstream 429s':>14}")
+    for r in results:
+        i, b = r['interactive'], r['batch']
+        print(f"{r['setting']:<10} {i['p50_ms']:>12} {i['p95_ms']:>8} {i['fallbacks']:>6}/{i['requests']:<3} "
+              f"{b['seconds']:>8} {b['fallbacks']:>12}/{b['resumes']:<3} {r['upstream_429s']:>14}")
+
+
+if __name__ == '__main__':
+    main()
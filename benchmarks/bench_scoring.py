@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the local scoring engine (src/services/scoring.py).
+
+Measures dictionary build time, job description compile time and resumes
+scored per second on one core, for the shipped skills dictionary and for a
+synthetic dictionary padded to --dictionary-size phrases.
+
+    python benchmarks/bench_scoring.py [--resumes 5000] [--dictionary-size 20000] [--json]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import JOB_DESCRIPTION, resume_lines
+from src.services.scoring import SKILLS_DICTIONARY_PATH, ScoringEngine, SkillDictionary
+
+
+def padded_dictionary(size, seed=0):
+    """The shipped dictionary plus random multi-word phrases up to size entries"""
+    dictionary = SkillDictionary.load(SKILLS_DICTIONARY_PATH)
+    rng = random.Random(seed)
+    syllables = ['ka', 'lo', 'mi', 'ne', 'ra', 'tu', 'zo', 'pe', 'shi', 'va']
+    while dictionary.size < size:
+        words = [''.join(rng.choice(syllables) for _ in range(3)) for _ in range(rng.randint(1, 4))]
+        dictionary.add(' '.join(words), ' '.join(words))
+    return dictionary
+
+
+def run(dictionary_label, build, resumes):
+    start = time.perf_counter()
+    dictionary = build()
+    build_seconds = time.perf_counter() - start
+
+    engine = ScoringEngine(dictionary)
+    start = time.perf_counter()
+    query = engine.compile_job(JOB_DESCRIPTION)
+    compile_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores = [engine.score(query, text).score for text in resumes]
+    score_seconds = time.perf_counter() - start
+
+    return {
+        'dictionary': dictionary_label,
+        'phrases': dictionary.size,
+        'build_ms': round(build_seconds * 1000, 2),
+        'compile_ms': round(compile_seconds * 1000, 3),
+        'resumes': len(resumes),
+        'resumes_per_second': round(len(resumes) / score_seconds),
+        'mean_score': round(sum(scores) / len(scores), 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=5000)
+    parser.add_argument('--lines', type=int, default=60, help="Lines per synthetic resume")
+    parser.add_argument('--dictionary-size', type=int, default=20000)
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    args = parser.parse_args()
+
+    resumes = ['\n'.join(resume_lines(args.lines, seed)) for seed in range(args.resumes)]
+    results = [
+        run('shipped', lambda: SkillDictionary.load(SKILLS_DICTIONARY_PATH), resumes),
+        run('padded', lambda: padded_dictionary(args.dictionary_size), resumes),
+    ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for r in results:
+        print(f"{r['dictionary']:<8} phrases={r['phrases']:<6} build={r['build_ms']}ms "
+              f"compile={r['compile_ms']}ms {r['resumes_per_second']} resumes/s "
+              f"(mean score {r['mean_score']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Cold start of an app worker: import time, time to first request and memory.
+
+For each implementation, starts a fresh server process --runs times against
+an initialized scratch database holding --stored extracted resume texts, and
+reports (medians):
+
+  eager  startup as it was before the app factory: PDF/DOCX backends,
+         requests and httpx imported up front, the schema created by every
+         worker and the resume index loaded from the store at startup
+  lazy   the app as it is: those imports wait for first use, the schema is
+         created once by init-db and the index waits for the first search
+
+  import_ms       time to import src.main (building the app) in a fresh process
+  first_health_ms process start to the first 200 from GET /api/health
+  rss_mb          the worker's resident memory after that request
+  first_<type>_ms a worker's first POST /api/analyze of a TXT, PDF and DOCX
+                  resume, against the fake Together AI server, which pays
+                  for any import left for first use (and, eager, shares the
+                  CPU with the index load)
+  health_p95_ms    p95 of GET /api/health, polled for --settle seconds after
+                  those analyses (the index load holds the GIL in bursts)
+  cpu_s           the worker's CPU seconds by the end of that
+  final_rss_mb    and its resident memory
+
+It also lists the slowest top-level imports of the lazy app, from
+python -X importtime.
+
+    python benchmarks/bench_startup.py [--impls eager,lazy] [--runs 5] [--stored 20000]
+        [--settle 10] [--json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import random
+import signal
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import httpx
+
+from benchmarks.bench_resume_index import SEED_BATCH, make_resume as make_stored_resume, skill_names
+from benchmarks.fake_together import start_in_background
+from benchmarks.load_test import percentile, read_process_stats
+from benchmarks.synthetic import JOB_DESCRIPTION, make_resume, seed_lines
+
+EAGER_IMPORTS = ('PyPDF2', 'docx', 'requests', 'httpx', 'sqlalchemy.dialects.postgresql')
+FILE_TYPES = ('txt', 'pdf', 'docx')
+
+
+def serve(impl, port):
+    if impl == 'eager':
+        import importlib
+        for name in EAGER_IMPORTS:
+            importlib.import_module(name)
+    from werkzeug.serving import make_server
+    from src.main import app, init_db
+    if impl == 'eager':
+        init_db(app)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def impl_env(impl, env):
+    # Before, every worker loaded the resume index at startup
+    return dict(env, RESUME_INDEX_PRELOAD='true' if impl == 'eager' else 'false')
+
+
+def import_ms(impl, env):
+    """Milliseconds to import src.main in a fresh interpreter"""
+    imports = ['src.main'] if impl == 'lazy' else list(EAGER_IMPORTS) + ['src.main']
+    code = ('import importlib, time\n'
+            'started = time.perf_counter()\n'
+            f'for name in {imports!r}: importlib.import_module(name)\n'
+            "print('import_ms', (time.perf_counter() - started) * 1000)")
+    output = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, env=impl_env(impl, env),
+                            capture_output=True, text=True, check=True).stdout
+    # The app logs its startup on the same stdout
+    return float(re.search(r'import_ms ([\d.]+)', output)[1])
+
+
+def heaviest_imports(env, count=8):
+    """[(third-party package, cumulative ms)] imported by src.main, from -X importtime"""
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import src.main'], cwd=REPO_ROOT,
+                            env=env, capture_output=True, text=True, check=True).stderr
+    packages = {}
+    for line in output.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)', line)
+        if not match:
+            continue
+        cumulative, depth, name = int(match[1]), len(match[2]), match[3]
+        # Modules are listed after their own imports, so src.main's come right before it
+        if depth == 1:
+            if name == 'src.main':
+                break
+            packages = {}
+            continue
+        top = name.split('.')[0]
+        if top != 'src' and top not in sys.stdlib_module_names:
+            # A package's outermost import line holds its whole cost
+            packages[top] = max(packages.get(top, 0), cumulative)
+    heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:count]
+    return [(name, round(us / 1000, 1)) for name, us in heaviest]
+
+
+def seed_store(path, count):
+    """Insert count synthetic extracted texts, as bench_resume_index.py does"""
+    rng = random.Random(11)
+    base, skills = seed_lines(), skill_names()
+    now = time.time()
+    with sqlite3.connect(path) as connection:
+        for first in range(0, count, SEED_BATCH):
+            rows = []
+            for i in range(first, min(first + SEED_BATCH, count)):
+                text = make_stored_resume(rng, base, skills)
+                rows.append((f"{i:064x}", zlib.compress(text.encode('utf-8'), 6), len(text), len(text), now, now))
+            connection.executemany('INSERT INTO extracted_text (digest, text_compressed, source_bytes, text_chars, '
+                                   'created_at, last_accessed_at) VALUES (?, ?, ?, ?, ?, ?)', rows)
+
+
+def cpu_seconds(pid):
+    """User plus system CPU time of a process so far"""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def cold_start(impl, port, env, uploads, settle):
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', impl, '--port', str(port)],
+                              cwd=REPO_ROOT, env=impl_env(impl, env), stdout=subprocess.DEVNULL,
+                              start_new_session=True)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"{impl} server exited with status {server.returncode}")
+            try:
+                if httpx.get(f"{base_url}/api/health", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                time.sleep(0.005)
+        result = {'first_health_ms': (time.perf_counter() - started) * 1000,
+                  'rss_mb': read_process_stats(server.pid).get('VmRSS', 0) / 1024}
+        with httpx.Client(base_url=base_url, timeout=60) as client:
+            for file_type, upload in uploads.items():
+                started = time.perf_counter()
+                response = client.post('/api/analyze', files={'resume': upload},
+                                       data={'jobDescription': JOB_DESCRIPTION})
+                assert response.status_code == 200, response.text[:200]
+                result[f'first_{file_type}_ms'] = (time.perf_counter() - started) * 1000
+            latencies = []
+            settle_until = time.perf_counter() + settle
+            while time.perf_counter() < settle_until:
+                started = time.perf_counter()
+                client.get('/api/health')
+                latencies.append(time.perf_counter() - started)
+                time.sleep(0.05)
+        result['health_p95_ms'] = percentile(latencies, 0.95) * 1000 if latencies else 0
+        result['cpu_s'] = cpu_seconds(server.pid)
+        result['final_rss_mb'] = read_process_stats(server.pid).get('VmRSS', 0) / 1024
+        return result
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            pass
+        # The extraction workers forked for the uploads hold the listening socket too
+        try:
+            os.killpg(server.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--impls', default='eager,lazy')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--stored', type=int, default=20000, help="Extracted resume texts in the store")
+    parser.add_argument('--settle', type=float, default=10, help="Seconds to poll /api/health after the analyses")
+    parser.add_argument('--port', type=int, default=8180)
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    parser.add_argument('--serve', choices=['eager', 'lazy'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    upstream = start_in_background(port=0)
+    results = []
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, 'bench.db')
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{path}",
+                   TOGETHER_API_URL=f"http://127.0.0.1:{upstream.server_port}/v1/chat/completions")
+        subprocess.run([sys.executable, os.path.join('src', 'main.py'), 'init-db'], cwd=REPO_ROOT, env=env,
+                       stdout=subprocess.DEVNULL, check=True)
+        seed_store(path, args.stored)
+        for number, impl in enumerate(args.impls.split(',')):
+            runs = []
+            for run in range(args.runs):
+                # Distinct resumes every time, so neither the text nor the analysis cache answers
+                seed = number * 1000 + run
+                uploads = {file_type: make_resume(file_type, 120, seed) for file_type in FILE_TYPES}
+                runs.append(cold_start(impl, args.port, env, uploads, args.settle))
+            result = {'impl': impl,
+                      'import_ms': round(statistics.median(import_ms(impl, env) for _ in range(args.runs)))}
+            for key in runs[0]:
+                result[key] = round(statistics.median(run[key] for run in runs), 1)
+            results.append(result)
+        heaviest = heaviest_imports(env)
+    upstream.shutdown()
+
+    if args.json:
+        print(json.dumps({'stored': args.stored, 'results': results, 'heaviest_imports_ms': heaviest}, indent=2))
+        return
+
+    print(f"Median of {args.runs} cold starts with {args.stored} stored resume texts")
+    print(f"{'impl':<6} {'import ms':>10} {'first health ms':>16} {'rss MB':>7} "
+          + ' '.join(f"{f'first {t} ms':>13}" for t in FILE_TYPES)
+          + f" {'health p95 ms':>14} {'cpu s':>6} {'final rss MB':>13}")
+    for r in results:
+        print(f"{r['impl']:<6} {r['import_ms']:>10} {r['first_health_ms']:>16} {r['rss_mb']:>7} "
+              + ' '.join(f"{r[f'first_{t}_ms']:>13}" for t in FILE_TYPES)
+              + f" {r['health_p95_ms']:>14} {r['cpu_s']:>6} {r['final_rss_mb']:>13}")
+    print("Slowest imports of the lazy app (cumulative ms): "
+          + ', '.join(f"{name} {ms}" for name, ms in heaviest))
+
+
+if __name__ == '__main__':
+    main()
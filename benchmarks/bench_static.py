@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Requests/sec and bytes transferred for the single-page app's static files.
+
+Starts a server per implementation in a subprocess (Werkzeug, threaded, as
+app.run() serves) and drives it with --concurrency clients:
+
+  legacy  the previous catch-all route: os.path.exists and
+          send_from_directory per request, uncompressed, every file
+          revalidated on each visit
+  assets  the app as it is: an in-memory index of fingerprinted, precompressed
+          files with ETags (see src/services/static_assets.py)
+
+Scenarios:
+  shell       GET / with Accept-Encoding: gzip, br
+  revalidate  GET / with If-None-Match from a previous response (304 when supported)
+
+Also reports the requests and body bytes of a first and a repeat page
+load (the shell plus the stylesheet, script and images it references, where
+a repeat visit skips files cached as immutable and revalidates the rest),
+and GET / throughput through the WSGI app in-process, which leaves out the
+HTTP client's own CPU time.
+
+    python benchmarks/bench_static.py [--impls legacy,assets] [--concurrency 16]
+        [--requests 2000] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import httpx
+
+from benchmarks.load_test import percentile, wait_until_up
+
+ACCEPT_ENCODING = 'gzip, br'
+
+
+def legacy_app():
+    """The static route as it was before the asset build, with the app's CORS setup"""
+    from flask import Flask, send_from_directory
+    from flask_cors import CORS
+    app = Flask(__name__, static_folder=os.path.join(REPO_ROOT, 'src', 'static'))
+    CORS(app)
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        static_folder_path = app.static_folder
+        if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
+            return send_from_directory(static_folder_path, path)
+        return send_from_directory(static_folder_path, 'index.html')
+
+    return app
+
+
+def serve(impl, port):
+    from werkzeug.serving import make_server
+    if impl == 'legacy':
+        app = legacy_app()
+    else:
+        from src.main import app
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+async def drive(base_url, concurrency, total, headers):
+    """GET / total times from concurrency clients; returns [(seconds, status, body bytes)]"""
+    results = []
+    counter = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def worker():
+            for _ in counter:
+                start = time.perf_counter()
+                async with client.stream('GET', '/', headers=headers) as response:
+                    size = sum([len(chunk) async for chunk in response.aiter_raw()])
+                results.append((time.perf_counter() - start, response.status_code, size))
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results
+
+
+def page_load_bytes(base_url):
+    """(requests, body bytes) for a first and a repeat visit to the page"""
+    cache = {}
+    refs = []
+    with httpx.Client(base_url=base_url, headers={'Accept-Encoding': ACCEPT_ENCODING}) as client:
+        def fetch(path):
+            cached = cache.get(path)
+            if cached and 'immutable' in cached['cache_control']:
+                return 0, 0
+            headers = {'If-None-Match': cached['etag']} if cached and cached['etag'] else {}
+            response = client.get(path, headers=headers)
+            if response.status_code == 200:
+                cache[path] = {'etag': response.headers.get('ETag'),
+                               'cache_control': response.headers.get('Cache-Control', '')}
+                if path == '/':
+                    refs[:] = ['/' + ref for ref in re.findall(r'(?:href|src)="([^"#:]+)"', response.text)]
+            return 1, response.num_bytes_downloaded
+
+        def visit():
+            fetched = [fetch('/')]
+            fetched += [fetch(ref) for ref in refs]
+            return sum(requests for requests, _ in fetched), sum(size for _, size in fetched)
+
+        return visit(), visit()
+
+
+def wsgi_req_per_s(impl, requests):
+    """GET / through the app's WSGI interface in this process"""
+    if impl == 'legacy':
+        app = legacy_app()
+    else:
+        from src.main import app
+    client = app.test_client()
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get('/', headers={'Accept-Encoding': ACCEPT_ENCODING}).close()
+    return round(requests / (time.perf_counter() - start), 1)
+
+
+def run_impl(impl, concurrency, requests, port):
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', impl, '--port', str(port)],
+                              cwd=REPO_ROOT, stdout=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_up(f"{base_url}/", server)
+        first_visit, repeat_visit = page_load_bytes(base_url)
+        etag = httpx.get(f"{base_url}/", headers={'Accept-Encoding': ACCEPT_ENCODING}).headers.get('ETag')
+        result = {'impl': impl, 'first_visit': first_visit, 'repeat_visit': repeat_visit,
+                  'wsgi_req_per_s': wsgi_req_per_s(impl, requests)}
+        for scenario, headers in (('shell', {'Accept-Encoding': ACCEPT_ENCODING}),
+                                  ('revalidate', {'Accept-Encoding': ACCEPT_ENCODING, 'If-None-Match': etag or '"none"'})):
+            start = time.perf_counter()
+            results = asyncio.run(drive(base_url, concurrency, requests, headers))
+            elapsed = time.perf_counter() - start
+            latencies = [seconds for seconds, _, _ in results]
+            result[scenario] = {
+                'req_per_s': round(len(results) / elapsed, 1),
+                'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+                'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+                'status': sorted({status for _, status, _ in results}),
+                'body_bytes': results[-1][2],
+            }
+        return result
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--impls', default='legacy,assets')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--port', type=int, default=8160)
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    parser.add_argument('--serve', choices=['legacy', 'assets'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    with tempfile.TemporaryDirectory() as scratch:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch, 'bench.db')}"
+        results = [run_impl(impl, args.concurrency, args.requests, args.port) for impl in args.impls.split(',')]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"GET / x {args.requests} from {args.concurrency} clients")
+    print(f"{'impl':<8} {'scenario':<11} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'status':>8} {'bytes':>7}")
+    for r in results:
+        for scenario in ('shell', 'revalidate'):
+            s = r[scenario]
+            print(f"{r['impl']:<8} {scenario:<11} {s['req_per_s']:>8} {s['p50_ms']:>8} {s['p95_ms']:>8} "
+                  f"{','.join(map(str, s['status'])):>8} {s['body_bytes']:>7}")
+    print(f"{'impl':<8} {'in-process req/s':>17} {'first visit':>20} {'repeat visit':>20}")
+    for r in results:
+        first = f"{r['first_visit'][0]} req, {r['first_visit'][1]} B"
+        repeat = f"{r['repeat_visit'][0]} req, {r['repeat_visit'][1]} B"
+        print(f"{r['impl']:<8} {r['wsgi_req_per_s']:>17} {first:>20} {repeat:>20}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Memory use of the app under a burst of concurrent large uploads.
+
+Starts the app (see load_test.py) once per configuration and posts
+distinct PDFs padded to --size-mb (standing in for resumes with embedded
+photos) from --concurrency clients at once. Reports the server's peak
+resident memory, alone and with its extraction workers, and the response
+statuses (429 when the upload memory budget pushes back).
+
+Configurations:
+  unbounded  uploads kept in memory whole, no memory budget
+             (UPLOAD_SPOOL_BYTES=1 GiB, UPLOAD_MEMORY_BUDGET=0)
+  budgeted   the defaults: spooled past UPLOAD_SPOOL_BYTES, extraction
+             under UPLOAD_MEMORY_BUDGET
+
+    python benchmarks/bench_uploads.py [--configs unbounded,budgeted] [--mode sync]
+        [--concurrency 32] [--requests 32] [--size-mb 6] [--budget-mb 64] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fake_together import start_in_background
+from benchmarks.load_test import run_mode
+from benchmarks.synthetic import make_pdf
+
+CONFIGS = {
+    'unbounded': {'UPLOAD_SPOOL_BYTES': str(1 << 30), 'UPLOAD_MEMORY_BUDGET': '0'},
+    'budgeted': {},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--configs', default='unbounded,budgeted')
+    parser.add_argument('--mode', choices=['sync', 'async'], default='sync')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=32)
+    parser.add_argument('--size-mb', type=float, default=6)
+    parser.add_argument('--budget-mb', type=int, default=64, help="UPLOAD_MEMORY_BUDGET for the budgeted run")
+    parser.add_argument('--latency', type=float, default=0.5, help="Fake upstream latency in seconds")
+    parser.add_argument('--port', type=int, default=8140)
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    args = parser.parse_args()
+
+    padding = int(args.size_mb * 1024 * 1024)
+    uploads = [(f'resume-{i}.pdf', make_pdf(60, seed=i, padding_bytes=padding)) for i in range(args.requests)]
+
+    upstream = start_in_background(port=args.port + 10, latency=args.latency)
+    upstream_url = f"http://127.0.0.1:{args.port + 10}/v1/chat/completions"
+    results = []
+    for name in args.configs.split(','):
+        env = dict(CONFIGS[name])
+        if name == 'budgeted':
+            env['UPLOAD_MEMORY_BUDGET'] = str(args.budget_mb * 1024 * 1024)
+        result = run_mode(args.mode, upstream_url, args.concurrency, args.requests, args.port, uploads, env)
+        results.append(dict(result, config=name))
+    upstream.shutdown()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.requests} uploads of {args.size_mb:g} MB from {args.concurrency} clients, {args.mode} mode")
+    print(f"{'config':<10} {'server MB':>10} {'+workers MB':>12} {'req/s':>7} {'p95 ms':>8}  statuses")
+    for r in results:
+        statuses = ', '.join(f"{status}: {count}" for status, count in sorted(r['statuses'].items()))
+        print(f"{r['config']:<10} {r['peak_rss_mb']:>10} {r['peak_tree_rss_mb']:>12} {r['req_per_s']:>7} "
+              f"{r['p95_ms']!s:>8}  {statuses}")
+
+
+if __name__ == '__main__':
+    main()
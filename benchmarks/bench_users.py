@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the user API on a large users table.
+
+Seeds a scratch SQLite database with --users rows through
+POST /api/users/bulk, then compares, in this process:
+
+  legacy     User.query.all() serialized with jsonify, as GET /api/users
+             used to return the whole table
+  first      GET /api/users?limit=--page-size
+  last       the final page, reached through the previous page's cursor
+  offset     the final page fetched with OFFSET instead of a cursor
+
+Reports latency (p50 over --repeat runs) and peak Python memory
+(tracemalloc) for each, plus the bulk insert rate.
+
+    python benchmarks/bench_users.py [--users 100000] [--page-size 100]
+        [--repeat 20] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.load_test import percentile
+
+
+def measure(func, repeat):
+    """Return (p50 ms, peak traced MB) of calling func"""
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - started)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return round(percentile(seconds, 0.5) * 1000, 2), round(peak / (1024 * 1024), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch, 'bench.db')}"
+        # Imported here so DATABASE_URL is set first
+        from flask import jsonify
+        from src.main import app, init_db
+        from src.models.user import User, db
+        from src.routes.user import USERS_BULK_MAX
+        from src.services.pagination import encode_cursor
+
+        init_db(app)
+        client = app.test_client()
+        started = time.perf_counter()
+        for start in range(0, args.users, USERS_BULK_MAX):
+            rows = [{'username': f'user{i:08d}', 'email': f'user{i:08d}@example.com'}
+                    for i in range(start, min(start + USERS_BULK_MAX, args.users))]
+            response = client.post('/api/users/bulk', json=rows)
+            assert response.status_code == 200 and not response.json['failed'], response.data[:200]
+        seed_seconds = time.perf_counter() - started
+
+        def legacy():
+            with app.test_request_context():
+                jsonify([user.to_dict() for user in User.query.all()]).get_data()
+
+        def page(query):
+            response = client.get(f'/api/users?limit={args.page_size}{query}')
+            return json.loads(response.get_data())
+
+        with app.app_context():
+            last_id = db.session.query(db.func.max(User.id)).scalar()
+        # The cursor that ends just before the final page
+        last_cursor = encode_cursor(['id', last_id - args.page_size])
+        offset = max(0, args.users - args.page_size)
+
+        def offset_page():
+            with app.app_context():
+                [user.to_dict() for user in User.query.order_by(User.id).offset(offset).limit(args.page_size)]
+
+        results = {'users': args.users, 'page_size': args.page_size,
+                   'bulk_rows_per_s': round(args.users / seed_seconds)}
+        for name, func in (('legacy', legacy), ('first', lambda: page('')),
+                           ('last', lambda: page(f'&after={last_cursor}')), ('offset', offset_page)):
+            repeat = max(1, args.repeat // 10) if name == 'legacy' else args.repeat
+            p50_ms, peak_mb = measure(func, repeat)
+            results[name] = {'p50_ms': p50_ms, 'peak_mb': peak_mb}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.users} users, bulk insert {results['bulk_rows_per_s']} rows/s, pages of {args.page_size}")
+    print(f"{'request':<8} {'p50 ms':>9} {'peak MB':>9}")
+    for name in ('legacy', 'first', 'last', 'offset'):
+        print(f"{name:<8} {results[name]['p50_ms']:>9} {results[name]['peak_mb']:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Together AI chat completions endpoint.
+
+Point the app at it with:
+    TOGETHER_API_URL=http://127.0.0.1:8008/v1/chat/completions python src/main.py
+
+and start it with:
+    python benchmarks/fake_together.py --port 8008 --latency 2.0 --error-rate 0.05
+
+--rpm and --tpm enforce per-minute request and token limits as upstream
+does, answering 429 with a Retry-After header once either runs out.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+OPTIMIZED_RESUME = "<div class='resume-section'><h3>Candidate</h3>" + "<p>Experienced engineer.</p>" * 40 + "</div>"
+
+
+def build_analysis(prompt):
+    """Return a deterministic response for a prompt
+
+    Mirrors the app's prompts: a rewrite-only prompt gets bare HTML, and the
+    optimizedResume field is only produced when the prompt asks for it.
+    """
+    if prompt.lstrip().startswith('Rewrite the following resume'):
+        return OPTIMIZED_RESUME
+    score = 40 + int(hashlib.sha256(prompt.encode('utf-8')).hexdigest(), 16) % 56
+    analysis = {
+        "matchScore": score,
+        "suitability": {
+            "overall": "Solid candidate with relevant experience for the role.",
+            "strengths": ["Relevant experience", "Matching technical skills", "Clear achievements"],
+            "concerns": ["Limited leadership experience", "Few quantified results"]
+        },
+        "skillGaps": {
+            "missing": ["Kubernetes", "Terraform", "GraphQL"],
+            "weak": ["System design", "Mentoring"]
+        },
+        "recommendations": [
+            "Mirror the job description's keywords in your résumé summary",
+            "Quantify the impact of your recent projects",
+            "Move the most relevant skills to the top",
+            "Add links to public work",
+            "Trim experience older than ten years"
+        ]
+    }
+    if '"optimizedResume"' in prompt:
+        analysis["optimizedResume"] = OPTIMIZED_RESUME
+    return json.dumps(analysis, ensure_ascii=False)
+
+
+class FakeTogetherHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        config = self.server.config
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        request = json.loads(body or b'{}')
+        prompt = request.get('messages', [{}])[-1].get('content', '')
+
+        content = build_analysis(prompt)
+        with self.server.lock:
+            self.server.request_count += 1
+            retry_after = self.server.limits.admit(len(prompt) // 4 + len(content) // 4)
+            if retry_after:
+                self.server.rate_limited_count += 1
+        if retry_after:
+            self._send_json(429, {"error": {"message": "rate limit exceeded"}},
+                            {'Retry-After': str(math.ceil(retry_after))})
+            return
+
+        time.sleep(config.latency + random.uniform(0, config.jitter))
+
+        if random.random() < config.error_rate:
+            self._send_json(503, {"error": {"message": "upstream unavailable"}})
+            return
+
+        if request.get('stream'):
+            self._send_stream(content, config.token_delay)
+        else:
+            # Generation time scales with output length, as it does upstream
+            if config.token_delay:
+                time.sleep(config.token_delay * (len(content) // 16))
+            self._send_json(200, {
+                "choices": [{"message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4}
+            })
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, content, token_delay):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for i in range(0, len(content), 16):
+            event = {"choices": [{"delta": {"content": content[i:i + 16]}}]}
+            # Raw UTF-8, as the real API streams non-ASCII text
+            self._write_chunk(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode('utf-8'))
+            if token_delay:
+                time.sleep(token_delay)
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+
+class RateLimits:
+    """Requests and tokens per minute, each a bucket holding one minute's worth; 0 is unlimited"""
+
+    def __init__(self, rpm=0, tpm=0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = float(rpm)
+        self.tokens = float(tpm)
+        self.updated = time.monotonic()
+
+    def admit(self, tokens):
+        """Charge one request of tokens; returns 0, or the seconds until it would fit"""
+        now = time.monotonic()
+        elapsed, self.updated = now - self.updated, now
+        self.requests = min(self.rpm, self.requests + elapsed * self.rpm / 60)
+        self.tokens = min(self.tpm, self.tokens + elapsed * self.tpm / 60)
+        waits = []
+        if self.rpm and self.requests < 1:
+            waits.append((1 - self.requests) * 60 / self.rpm)
+        if self.tpm and self.tokens < min(tokens, self.tpm):
+            waits.append((min(tokens, self.tpm) - self.tokens) * 60 / self.tpm)
+        if waits:
+            return max(waits)
+        self.requests -= 1
+        self.tokens -= tokens
+        return 0
+
+
+class FakeTogetherServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connections under load tests
+    request_queue_size = 1024
+
+
+def make_server(host='127.0.0.1', port=8008, latency=0.0, jitter=0.0, error_rate=0.0, token_delay=0.0,
+                rpm=0, tpm=0):
+    """Create (but do not start) a fake Together AI server"""
+    server = FakeTogetherServer((host, port), FakeTogetherHandler)
+    server.config = argparse.Namespace(latency=latency, jitter=jitter, error_rate=error_rate,
+                                       token_delay=token_delay)
+    server.lock = threading.Lock()
+    server.limits = RateLimits(rpm, tpm)
+    server.request_count = 0
+    server.rate_limited_count = 0
+    return server
+
+
+def start_in_background(**kwargs):
+    """Start a fake server on a background thread and return it"""
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Together AI chat completions server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8008)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds to wait before responding")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Extra random latency in seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument('--token-delay', type=float, default=0.0, help="Seconds between streamed chunks")
+    parser.add_argument('--rpm', type=int, default=0, help="Requests per minute before answering 429 (0: no limit)")
+    parser.add_argument('--tpm', type=int, default=0, help="Tokens per minute before answering 429 (0: no limit)")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.latency, args.jitter, args.error_rate, args.token_delay,
+                         args.rpm, args.tpm)
+    print(f"Fake Together AI listening on http://{args.host}:{args.port}/v1/chat/completions")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Load test comparing the sync (Flask/Werkzeug) and async (ASGI) serving modes.
+
+Starts the fake Together AI server with the given latency, then for each
+mode starts the app in a subprocess against a scratch database and drives
+POST /api/analyze with a fixed number of concurrent clients. Every request
+uploads a distinct resume, so the analysis cache never answers for the AI.
+Reports req/s, latency percentiles, errors and the server's peak thread
+count and memory.
+
+    python benchmarks/load_test.py [--modes sync,async] [--concurrency 200]
+                                   [--requests 1000] [--latency 2.0]
+                                   [--error-rate 0.0] [--json]
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import logging
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import httpx
+
+from benchmarks.fake_together import start_in_background
+from benchmarks.synthetic import JOB_DESCRIPTION, make_txt
+
+
+def serve(mode, port):
+    """Run the app in this process (used by the subprocess the harness starts)"""
+    from src.main import app, init_db
+    # Each run gets a scratch database
+    init_db(app)
+    if mode == 'sync':
+        from werkzeug.serving import make_server
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        # What app.run() uses: one thread per request
+        make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+    else:
+        import uvicorn
+        uvicorn.run('src.asgi:app', host='127.0.0.1', port=port, log_level='warning')
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def read_process_stats(pid):
+    stats = {}
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in ('Threads', 'VmRSS'):
+                    stats[key] = int(value.split()[0])
+    except OSError:
+        pass
+    return stats
+
+
+def child_pids(pid):
+    """Children of every thread of pid (the extraction pool is forked from a request thread)"""
+    children = []
+    try:
+        tasks = os.listdir(f'/proc/{pid}/task')
+    except OSError:
+        return children
+    for task in tasks:
+        try:
+            with open(f'/proc/{pid}/task/{task}/children') as f:
+                children.extend(int(child) for child in f.read().split())
+        except OSError:
+            pass
+    return children
+
+
+class ProcessSampler:
+    """Track a process's peak thread count and resident memory
+
+    peak_tree_rss_kb adds its child processes (the extraction workers).
+    """
+
+    def __init__(self, pid, interval=0.1):
+        self.pid = pid
+        self.interval = interval
+        self.peak_threads = 0
+        self.peak_rss_kb = 0
+        self.peak_tree_rss_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            stats = read_process_stats(self.pid)
+            self.peak_threads = max(self.peak_threads, stats.get('Threads', 0))
+            self.peak_rss_kb = max(self.peak_rss_kb, stats.get('VmRSS', 0))
+            tree_rss_kb = stats.get('VmRSS', 0) + sum(
+                read_process_stats(child).get('VmRSS', 0) for child in child_pids(self.pid))
+            self.peak_tree_rss_kb = max(self.peak_tree_rss_kb, tree_rss_kb)
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def wait_until_up(url, server, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server for {url} exited with status {server.returncode}")
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start")
+
+
+async def drive(base_url, concurrency, total, uploads):
+    """Send total requests from concurrency clients; return per-request (seconds, status)
+
+    Request i uploads uploads[i % len(uploads)], a (filename, bytes) pair.
+    """
+    results = []
+    counter = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=300) as client:
+        async def worker():
+            for i in counter:
+                files = {'resume': uploads[i % len(uploads)]}
+                start = time.perf_counter()
+                try:
+                    response = await client.post('/api/analyze', files=files,
+                                                 data={'jobDescription': JOB_DESCRIPTION})
+                    status = response.status_code
+                except httpx.HTTPError:
+                    status = None
+                results.append((time.perf_counter() - start, status))
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results
+
+
+def distinct_txt_uploads(count, lines=60):
+    """count text resumes that differ in one line, so the caches never answer"""
+    resume = make_txt(lines)
+    return [(f'resume-{i}.txt', resume + f"\nReference {i}".encode()) for i in range(count)]
+
+
+def run_mode(mode, upstream_url, concurrency, requests, port, uploads=None, env=None):
+    """Start the app in the given mode and drive /api/analyze; returns a results dict
+
+    env holds extra environment variables for the server.
+    """
+    if uploads is None:
+        uploads = distinct_txt_uploads(requests)
+    with tempfile.TemporaryDirectory() as scratch:
+        env = dict(os.environ, TOGETHER_API_URL=upstream_url,
+                   DATABASE_URL=f"sqlite:///{os.path.join(scratch, 'load.db')}",
+                   TOGETHER_ASYNC_POOL_SIZE=str(max(concurrency, 16)),
+                   TOGETHER_POOL_SIZE=str(max(concurrency, 16)), **(env or {}))
+        # In its own session, so anything the server leaves behind can be killed with it
+        server = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', mode, '--port', str(port)],
+                                  cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, start_new_session=True)
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            wait_until_up(f"{base_url}/api/health", server)
+            with ProcessSampler(server.pid) as sampler:
+                start = time.perf_counter()
+                results = asyncio.run(drive(base_url, concurrency, requests, uploads))
+                elapsed = time.perf_counter() - start
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                pass
+            # Sweep up extraction workers a hard-stopped server leaves behind
+            try:
+                os.killpg(server.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            server.wait()
+
+    latencies = [seconds for seconds, status in results if status == 200]
+    return {
+        'mode': mode,
+        'concurrency': concurrency,
+        'requests': len(results),
+        'errors': sum(1 for _, status in results if status != 200),
+        'statuses': dict(collections.Counter(str(status) for _, status in results)),
+        'req_per_s': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95) * 1000) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99) * 1000) if latencies else None,
+        'mean_ms': round(statistics.mean(latencies) * 1000) if latencies else None,
+        'peak_threads': sampler.peak_threads,
+        'peak_rss_mb': round(sampler.peak_rss_kb / 1024, 1),
+        'peak_tree_rss_mb': round(sampler.peak_tree_rss_kb / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modes', default='sync,async')
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=2.0, help="Fake upstream latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of upstream calls that fail")
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    parser.add_argument('--serve', choices=['sync', 'async'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    upstream = start_in_background(port=args.port + 10, latency=args.latency, jitter=args.jitter,
+                                   error_rate=args.error_rate)
+    upstream_url = f"http://127.0.0.1:{args.port + 10}/v1/chat/completions"
+    results = [run_mode(mode, upstream_url, args.concurrency, args.requests,
+                        args.port + (0 if mode == 'sync' else 1))
+               for mode in args.modes.split(',')]
+    upstream.shutdown()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"upstream latency {args.latency}s, concurrency {args.concurrency}, {args.requests} requests")
+    print(f"{'mode':<6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'threads':>8} "
+          f"{'rss MB':>7}")
+    for r in results:
+        print(f"{r['mode']:<6} {r['req_per_s']:>7} {r['p50_ms']!s:>8} {r['p95_ms']!s:>8} {r['p99_ms']!s:>8} "
+              f"{r['errors']:>7} {r['peak_threads']:>8} {r['peak_rss_mb']:>7}")
+
+
+if __name__ == '__main__':
+    main()
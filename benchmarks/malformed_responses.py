@@ -0,0 +1,128 @@
+"""
+Corpus of model responses with the defects seen from chat completion APIs.
+
+Each case lists the fields parse_ai_response must recover (with their
+expected values where they matter) and the fields it must report missing.
+bench_parsing.py --check runs the corpus against the current parser.
+"""
+
+import json
+
+SUITABILITY = {
+    "overall": "Strong backend candidate.",
+    "strengths": ["Python", "AWS"],
+    "concerns": ["No Kubernetes"]
+}
+SKILL_GAPS = {"missing": ["Kubernetes"], "weak": ["Mentoring"]}
+RECOMMENDATIONS = ["Add metrics", "Mention Docker", "Lead with Python"]
+
+VALID = json.dumps({
+    "matchScore": 82,
+    "suitability": SUITABILITY,
+    "skillGaps": SKILL_GAPS,
+    "recommendations": RECOMMENDATIONS,
+    "optimizedResume": "<div class='resume'><h3>Jane Doe</h3></div>"
+}, indent=2)
+
+ALL_FIELDS = ['matchScore', 'suitability', 'skillGaps', 'recommendations', 'optimizedResume']
+
+CASES = [
+    {
+        'name': 'valid',
+        'text': VALID,
+        'expect': {'matchScore': 82, 'suitability': SUITABILITY, 'recommendations': RECOMMENDATIONS},
+    },
+    {
+        'name': 'code fence',
+        'text': "```json\n" + VALID + "\n```",
+        'expect': {'matchScore': 82, 'skillGaps': SKILL_GAPS},
+    },
+    {
+        'name': 'prose with braces after the object',
+        'text': "Here is the analysis:\n" + VALID + "\nLet me know if you need {anything} else!",
+        'expect': {'matchScore': 82, 'optimizedResume': "<div class='resume'><h3>Jane Doe</h3></div>"},
+    },
+    {
+        'name': 'second object after the first',
+        'text': VALID + "\n\nExample of another format:\n{\"matchScore\": 10}",
+        'expect': {'matchScore': 82},
+    },
+    {
+        'name': 'trailing commas',
+        'text': '{"matchScore": 82, "suitability": {"overall": "Strong backend candidate.", '
+                '"strengths": ["Python", "AWS",], "concerns": ["No Kubernetes",],}, '
+                '"skillGaps": {"missing": ["Kubernetes"], "weak": ["Mentoring"],}, '
+                '"recommendations": ["Add metrics", "Mention Docker", "Lead with Python",], '
+                '"optimizedResume": "<p>ok</p>",}',
+        'expect': {'suitability': SUITABILITY, 'skillGaps': SKILL_GAPS, 'recommendations': RECOMMENDATIONS},
+    },
+    {
+        'name': 'raw newlines and tabs in optimizedResume',
+        'text': VALID.replace('"<div class=\'resume\'><h3>Jane Doe</h3></div>"',
+                              '"<div class=\'resume\'>\n\t<h3>Jane Doe</h3>\n</div>"'),
+        'expect': {'optimizedResume': "<div class='resume'>\n\t<h3>Jane Doe</h3>\n</div>"},
+    },
+    {
+        'name': 'unescaped double quotes in HTML',
+        'text': VALID.replace('"<div class=\'resume\'><h3>Jane Doe</h3></div>"',
+                              '"<div class="resume"><h3 id="name">Jane Doe</h3></div>"'),
+        'expect': {'optimizedResume': '<div class="resume"><h3 id="name">Jane Doe</h3></div>',
+                   'recommendations': RECOMMENDATIONS},
+    },
+    {
+        'name': 'invalid escapes',
+        'text': VALID.replace('Strong backend candidate.', "Strong backend candidate\\'s profile\\."),
+        'expect': {'suitability': dict(SUITABILITY, overall="Strong backend candidate\\'s profile\\.")},
+    },
+    {
+        'name': 'truncated inside optimizedResume',
+        'text': VALID[:VALID.index('<h3>')],
+        'expect': {'matchScore': 82, 'recommendations': RECOMMENDATIONS,
+                   'optimizedResume': "<div class='resume'>"},
+    },
+    {
+        'name': 'truncated inside recommendations',
+        'text': VALID[:VALID.index('"Lead with Python"')],
+        'expect': {'matchScore': 82, 'skillGaps': SKILL_GAPS,
+                   'recommendations': ["Add metrics", "Mention Docker"]},
+        'missing': ['optimizedResume'],
+    },
+    {
+        'name': 'score as percentage',
+        'text': VALID.replace('"matchScore": 82', '"matchScore": 82%'),
+        'expect': {'matchScore': 82},
+    },
+    {
+        'name': 'score as string out of 100',
+        'text': VALID.replace('"matchScore": 82', '"matchScore": "85/100"'),
+        'expect': {'matchScore': 85},
+    },
+    {
+        'name': 'score as fraction',
+        'text': VALID.replace('"matchScore": 82', '"matchScore": 0.7'),
+        'expect': {'matchScore': 70},
+    },
+    {
+        'name': 'wrapped in an outer key',
+        'text': json.dumps({"analysis": json.loads(VALID)}),
+        'expect': {'matchScore': 82, 'skillGaps': SKILL_GAPS},
+    },
+    {
+        'name': 'one broken field',
+        'text': VALID.replace(json.dumps(SKILL_GAPS, indent=2).replace('\n', '\n  '), '{"missing": [Kubernetes}'),
+        'expect': {'matchScore': 82, 'recommendations': RECOMMENDATIONS},
+        'missing': ['skillGaps'],
+    },
+    {
+        'name': 'wrong types',
+        'text': '{"matchScore": true, "suitability": "Good fit", "skillGaps": {"missing": "Kubernetes"}, '
+                '"recommendations": "Add metrics", "optimizedResume": ""}',
+        'expect': {'skillGaps': {'missing': ['Kubernetes'], 'weak': []}, 'recommendations': ['Add metrics']},
+        'missing': ['matchScore', 'suitability', 'optimizedResume'],
+    },
+    {
+        'name': 'no JSON at all',
+        'text': "I'm sorry, I can't help with that request.",
+        'expect': None,
+    },
+]
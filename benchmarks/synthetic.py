@@ -0,0 +1,129 @@
+"""
+Synthetic resume generators for benchmarks.
+
+Resumes are built from sample-resume.txt so their content resembles real
+uploads; size is controlled by repeating and varying its lines.
+"""
+
+import io
+import os
+import random
+
+import docx
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEED_RESUME_PATH = os.path.join(REPO_ROOT, 'sample-resume.txt')
+
+JOB_DESCRIPTION = """
+Senior Full Stack Engineer. We are looking for an engineer with 5+ years of
+experience building web applications with Python, Flask or Django, React and
+TypeScript. You will design REST APIs, work with PostgreSQL and Redis, deploy
+services on AWS using Docker and Kubernetes, and maintain CI/CD pipelines.
+Experience with machine learning, data pipelines and mentoring is a plus.
+We are an equal opportunity employer and value diversity.
+""".strip()
+
+
+def seed_lines():
+    with open(SEED_RESUME_PATH, encoding='utf-8') as f:
+        return [line.rstrip() for line in f if line.strip()]
+
+
+def resume_lines(target_lines, seed=0):
+    """Return roughly target_lines resume lines derived from the seed resume"""
+    rng = random.Random(seed)
+    base = seed_lines()
+    lines = list(base)
+    while len(lines) < target_lines:
+        line = rng.choice(base)
+        lines.append(f"{line} (project {rng.randint(1, 999)})")
+    return lines[:max(target_lines, 1)]
+
+
+def make_txt(target_lines, seed=0):
+    return '\n'.join(resume_lines(target_lines, seed)).encode('utf-8')
+
+
+def make_docx(target_lines, seed=0, with_table=True):
+    """Build a DOCX with a header, body paragraphs and a skills table"""
+    document = docx.Document()
+    lines = resume_lines(target_lines, seed)
+    document.sections[0].header.paragraphs[0].text = lines[0]
+    for line in lines[1:]:
+        document.add_paragraph(line)
+    if with_table:
+        table = document.add_table(rows=4, cols=2)
+        for row, (skill, years) in zip(table.rows, [('Python', '6'), ('AWS', '4'), ('React', '3'), ('SQL', '7')]):
+            row.cells[0].text = skill
+            row.cells[1].text = f"{years} years"
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _pdf_escape(text):
+    text = text.encode('latin-1', 'replace').decode('latin-1')
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(target_lines, seed=0, lines_per_page=45, padding_bytes=0):
+    """Build a minimal text PDF (Helvetica, one Tj per line) without extra dependencies
+
+    padding_bytes adds an unreferenced binary stream of that size, standing in
+    for the embedded photos and fonts that make real PDFs large.
+    """
+    lines = resume_lines(target_lines, seed)
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    catalog_id = add(None)
+    pages_id = add(None)
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    page_ids = []
+    for page_lines in pages:
+        commands = ["BT", "/F1 10 Tf", "12 TL", "50 760 Td"]
+        for line in page_lines:
+            commands.append(f"({_pdf_escape(line)}) Tj T*")
+        commands.append("ET")
+        content = '\n'.join(commands).encode('latin-1')
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        page_ids.append(add(
+            f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>".encode('ascii')
+        ))
+
+    if padding_bytes:
+        padding = random.Random(seed).randbytes(padding_bytes)
+        add(b"<< /Length %d >>\nstream\n" % len(padding) + padding + b"\nendstream")
+
+    objects[catalog_id - 1] = f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode('ascii')
+    kids = ' '.join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[pages_id - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode('ascii')
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n".encode('ascii') + body + b"\nendobj\n")
+    xref_at = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('ascii'))
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode('ascii'))
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root {catalog_id} 0 R >>\n"
+              f"startxref\n{xref_at}\n%%EOF\n".encode('ascii'))
+    return out.getvalue()
+
+
+GENERATORS = {'txt': make_txt, 'docx': make_docx, 'pdf': make_pdf}
+
+
+def make_resume(file_type, target_lines, seed=0):
+    """Return (filename, bytes) for a synthetic resume of the given type"""
+    return f"resume-{seed}.{file_type}", GENERATORS[file_type](target_lines, seed)
@@ -53,6 +53,17 @@ def install_dependencies():
     
     return run_command(pip_command, "Installing dependencies")
 
+def build_static_assets():
+    """Fingerprint and compress the frontend files."""
+    system = platform.system().lower()
+    
+    if system == "windows":
+        python_command = "venv\\Scripts\\python src/build_static.py"
+    else:
+        python_command = "venv/bin/python src/build_static.py"
+    
+    return run_command(python_command, "Building static assets")
+
 def check_env_file():
     """Check if .env file exists and has required variables."""
     if not os.path.exists(".env"):
@@ -94,6 +105,10 @@ def main():
         print("✗ Failed to install dependencies")
         sys.exit(1)
     
+    # Build static assets (the app builds them in memory at startup without this)
+    if not build_static_assets():
+        print("⚠ Static assets will be built when the app starts instead")
+    
     # Check environment file
     env_configured = check_env_file()
     
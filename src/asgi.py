@@ -0,0 +1,256 @@
+"""
+ASGI entry point: serves the app with an async resume analysis path.
+
+    uvicorn src.asgi:app --host 0.0.0.0 --port 5000
+
+POST /api/analyze is handled natively on the event loop: the upload is
+parsed and the resume extracted in a small thread pool, then the Together
+AI calls are awaited on a pooled async client, so an in-flight analysis
+holds no thread while it waits on the model. Every other route runs the
+regular Flask app through asgiref's WSGI adapter.
+"""
+
+import asyncio
+import contextvars
+import functools
+import io
+import os
+import sys
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import jsonify
+from werkzeug.datastructures import EnvironHeaders
+
+from src.main import app as flask_app
+from src.routes import analysis
+from src.services import metrics
+from src.services.async_together_client import async_together_client
+from src.services.llm_scheduler import set_request_tenant
+from src.services.uploads import UPLOAD_SPOOL_BYTES
+
+ASGI_WORKER_THREADS = int(os.getenv('ASGI_WORKER_THREADS', '32'))
+
+_executor = ThreadPoolExecutor(max_workers=ASGI_WORKER_THREADS, thread_name_prefix='asgi-worker')
+_wsgi_app = WsgiToAsgi(flask_app)
+
+
+def run_in_worker(func, *args):
+    """Run func on the worker pool in a copy of the caller's context (for the request's stage timings)"""
+    context_run = functools.partial(contextvars.copy_context().run, func, *args)
+    return asyncio.get_running_loop().run_in_executor(_executor, context_run)
+
+
+async def timed_call(stage, call):
+    with metrics.timed_stage(stage):
+        return await call
+
+
+class PayloadTooLarge(Exception):
+    """Raised when a request body exceeds MAX_CONTENT_LENGTH"""
+
+
+async def read_body(receive, limit):
+    """Read the request body into a file spooled to disk past UPLOAD_SPOOL_BYTES
+
+    Returns (body, size) with body positioned at its start.
+    """
+    body = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES, mode='w+b')
+    size = 0
+    more_body = True
+    try:
+        while more_body:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                raise ConnectionError("Client disconnected")
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if limit is not None and size > limit:
+                raise PayloadTooLarge()
+            body.write(chunk)
+            more_body = message.get('more_body', False)
+    except BaseException:
+        body.close()
+        raise
+    body.seek(0)
+    return body, size
+
+
+def build_environ(scope, body, size):
+    """A WSGI environ for an ASGI HTTP request whose body has been read into a file"""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'CONTENT_LENGTH': str(size),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f'HTTP_{name}'
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def send_response(send, response):
+    """Send a finished Flask response"""
+    body = response.get_data()
+    headers = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+               for name, value in response.headers.items() if name.lower() != 'content-length']
+    headers.append((b'content-length', str(len(body)).encode('latin-1')))
+    await send({'type': 'http.response.start', 'status': response.status_code, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def make_response(rv):
+    """Build a response and run the app's after_request hooks (CORS headers) on it"""
+    return flask_app.process_response(flask_app.make_response(rv))
+
+
+def error_response(environ, message, status):
+    with flask_app.request_context(environ):
+        return make_response((jsonify({'error': message}), status))
+
+
+def begin_analysis(environ):
+    """Validate the upload, extract the resume and check the cache and pre-filter
+
+    Returns (response, state): a finished response, or the state needed to
+    call the AI.
+    """
+    with flask_app.request_context(environ):
+        try:
+            resume_text, job_description, prepared_job, error = analysis.read_analysis_request()
+            if error is not None:
+                return make_response(error), None
+            split, defer_rewrite = analysis.read_analysis_options()
+            cache_key, analysis_result, cache_hit = analysis.lookup_analysis(resume_text, job_description,
+                                                                             prepared_job=prepared_job)
+        except Exception as e:
+            print(f"Analysis error: {str(e)}")
+            return make_response(
+                (jsonify({'error': 'An error occurred during analysis. Please try again.'}), 500)), None
+        if analysis_result is not None:
+            return make_response(analysis.analysis_response(analysis_result, cache_hit)), None
+        return None, {
+            'resume_text': resume_text, 'job_description': job_description,
+            'split': split, 'defer_rewrite': defer_rewrite, 'cache_key': cache_key,
+            'prepared_job': prepared_job
+        }
+
+
+def finish_analysis(environ, state, assessment, rewrite):
+    """Parse the AI responses, cache the result and build the response
+
+    assessment and rewrite are AI response texts or the exceptions raised in
+    their place; rewrite is None unless a concurrent rewrite was requested.
+    """
+    resume_text, job_description, split = state['resume_text'], state['job_description'], state['split']
+    with flask_app.request_context(environ):
+        try:
+            if isinstance(assessment, BaseException):
+                analysis_result, assessment_ok = analysis.settle_assessment(
+                    resume_text, job_description, split, error=assessment)
+            else:
+                analysis_result, assessment_ok = analysis.settle_assessment(
+                    resume_text, job_description, split, assessment)
+
+            rewrite_future = None
+            if rewrite is not None:
+                rewrite_future = Future()
+                if isinstance(rewrite, BaseException):
+                    rewrite_future.set_result(analysis.settle_rewrite(resume_text, job_description, error=rewrite))
+                else:
+                    rewrite_future.set_result(analysis.settle_rewrite(resume_text, job_description, rewrite))
+
+            analysis_result = analysis.finish_analysis(analysis_result, assessment_ok, split, rewrite_future,
+                                                       resume_text, job_description, state['cache_key'],
+                                                       state['prepared_job'])
+            return make_response(analysis.analysis_response(analysis_result, False))
+        except Exception as e:
+            print(f"Analysis error: {str(e)}")
+            return make_response(
+                (jsonify({'error': 'An error occurred during analysis. Please try again.'}), 500))
+
+
+async def analyze(scope, receive, send):
+    """Async POST /api/analyze, equivalent to analysis.analyze_resume"""
+    metrics.start_request_timings()
+    try:
+        body, size = await read_body(receive, flask_app.config.get('MAX_CONTENT_LENGTH'))
+    except PayloadTooLarge:
+        environ = build_environ(scope, io.BytesIO(), 0)
+        await send_response(send, await run_in_worker(error_response, environ, 'File is too large', 413))
+        return
+    except ConnectionError:
+        return
+
+    environ = build_environ(scope, body, size)
+    # The AI calls below run in this task's context, not in a Flask request
+    set_request_tenant(EnvironHeaders(environ), environ['REMOTE_ADDR'])
+    try:
+        response, state = await run_in_worker(begin_analysis, environ)
+    finally:
+        # The form has been parsed (into its own spooled files) by now
+        body.close()
+    if response is not None:
+        await send_response(send, response)
+        return
+
+    resume_text, job_description = state['resume_text'], state['job_description']
+    calls = []
+    if state['split']:
+        calls.append(timed_call('ai', analysis.call_together_ai_async(
+            *analysis.prepare_assessment_prompt(resume_text, job_description))))
+        if not state['defer_rewrite']:
+            calls.append(timed_call('rewrite_ai', analysis.call_together_ai_async(
+                *analysis.prepare_rewrite_prompt(resume_text, job_description))))
+    else:
+        calls.append(timed_call('ai', analysis.call_together_ai_async(
+            *analysis.prepare_analysis_prompt(resume_text, job_description))))
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    assessment = results[0]
+    rewrite = results[1] if len(results) > 1 else None
+
+    response = await run_in_worker(finish_analysis, environ, state, assessment, rewrite)
+    await send_response(send, response)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await async_together_client.aclose()
+            _executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+    elif scope['type'] == 'http' and scope['method'] == 'POST' and scope['path'] == '/api/analyze':
+        await analyze(scope, receive, send)
+    else:
+        await _wsgi_app(scope, receive, send)
@@ -0,0 +1,37 @@
+"""
+Build the static assets for production.
+
+Fingerprints every file in src/static, rewrites index.html and styles.css
+to reference the fingerprinted names, writes gzip (and, with the brotli
+package installed, brotli) copies next to them and records it all in
+manifest.json under STATIC_BUILD_DIR (default src/static_build). The app
+serves from this build whenever it is newer than the source files.
+
+    python src/build_static.py
+"""
+
+import os
+import sys
+# DON'T CHANGE THIS !!!
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.services.static_assets import STATIC_BUILD_DIR, brotli, build_assets, write_build
+
+SOURCE_DIR = os.path.join(os.path.dirname(__file__), 'static')
+
+
+def main():
+    built = build_assets(SOURCE_DIR, STATIC_BUILD_DIR)
+    write_build(built, STATIC_BUILD_DIR)
+    total = sum(len(asset['data']) for asset in built.values())
+    print(f"Built {len(built)} assets ({total} bytes) into {STATIC_BUILD_DIR}")
+    for path in sorted(built):
+        asset = built[path]
+        sizes = ', '.join(f"{coding} {len(body)}" for coding, body in sorted(asset['encodings'].items()))
+        print(f"  {path} -> {asset['path']} ({len(asset['data'])} bytes{'; ' + sizes if sizes else ''})")
+    if brotli is None:
+        print("brotli is not installed; only gzip copies were written (pip install brotli)")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,50 +4,122 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from dotenv import load_dotenv
-from flask import Flask, send_from_directory
+
+# Load environment variables before the modules below read their settings from them
+load_dotenv()
+
+from flask import Flask, request
 from flask_cors import CORS
+from sqlalchemy import event
 from src.models.user import db
 from src.routes.user import user_bp
 from src.routes.analysis import analysis_bp
+from src.routes.batch import batch_bp
+from src.routes.admin import admin_bp
+from src.routes.jobs import jobs_bp
+from src.routes.history import history_bp
+from src.routes.candidates import candidates_bp
+from src.services import metrics
+from src.services.analysis_history import create_search_index
+from src.services.llm_scheduler import set_request_tenant
+from src.services.resume_index import RESUME_INDEX_PRELOAD, start_loading
+from src.services.static_assets import load_static_index, serve_asset
+from src.services.uploads import SpooledRequest
 
-# Load environment variables
-load_dotenv()
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
-
-# Enable CORS for all routes
-CORS(app)
-
-# Configure file upload settings
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(analysis_bp, url_prefix='/api')
-
-# uncomment if you need to use database
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-with app.app_context():
-    db.create_all()
-
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-            return "Static folder not configured", 404
-
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
+def configure_sqlite(dbapi_connection, connection_record):
+    """WAL lets readers run alongside the cache writes of concurrent requests"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA busy_timeout=30000')
+    cursor.close()
+
+
+def init_db(app):
+    """Create missing tables and the history search index; safe to run again"""
+    with app.app_context():
+        db.create_all()
+        create_search_index()
+
+
+def create_app():
+    """Build the Flask app
+
+    Startup does no schema work: run ``python src/main.py init-db`` (or
+    ``flask --app src.main init-db``) once per database, before the first
+    worker starts. Extraction backends and HTTP clients are imported on first
+    use, so a worker answers /api/health as soon as Flask and SQLAlchemy load.
+    """
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.request_class = SpooledRequest
+    app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+
+    # Enable CORS for all routes
+    CORS(app)
+
+    # Configure file upload settings
+    app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(analysis_bp, url_prefix='/api')
+    app.register_blueprint(batch_bp, url_prefix='/api')
+    app.register_blueprint(admin_bp, url_prefix='/api')
+    app.register_blueprint(jobs_bp, url_prefix='/api')
+    app.register_blueprint(history_bp, url_prefix='/api')
+    app.register_blueprint(candidates_bp, url_prefix='/api')
+
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv(
+        'DATABASE_URL', f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}")
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            event.listen(db.engine, 'connect', configure_sqlite)
+
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create the database schema"""
+        init_db(app)
+        print(f"Initialized {app.config['SQLALCHEMY_DATABASE_URI']}")
+
+    # Stored resume texts are indexed on the first /api/candidates/search, unless this process preloads them
+    if RESUME_INDEX_PRELOAD:
+        start_loading(app)
+
+    @app.before_request
+    def attribute_llm_calls():
+        # AI calls are queued fairly between tenants, and at interactive priority unless a route says otherwise
+        set_request_tenant(request.headers, request.remote_addr)
+
+    @app.before_request
+    def reset_request_timings():
+        # A worker thread's previous request must not leak its stage timings into this one
+        metrics.start_request_timings()
+
+    # Static files are read, fingerprinted and compressed once, then served from memory
+    static_index = load_static_index(app.static_folder)
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        # Unknown paths get the single-page app's shell
+        asset = static_index.get(path) or static_index.get('index.html')
+        if asset is None:
             return "index.html not found", 404
+        return serve_asset(asset)
+
+    return app
+
+
+app = create_app()
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    init_db(app)
+    if sys.argv[1:] == ['init-db']:
+        print(f"Initialized {app.config['SQLALCHEMY_DATABASE_URI']}")
+        sys.exit(0)
+    # Static files are served from memory, so restart when they are edited too
+    static_files = [os.path.join(root, name) for root, _, names in os.walk(app.static_folder) for name in names]
+    app.run(host='0.0.0.0', port=5000, debug=True, extra_files=static_files)
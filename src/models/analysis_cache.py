@@ -0,0 +1,14 @@
+from src.models.user import db
+
+
+class AnalysisCacheEntry(db.Model):
+    """Persistent tier of the analysis result cache"""
+    __tablename__ = 'analysis_cache'
+
+    key = db.Column(db.String(64), primary_key=True)
+    result = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.Float, nullable=False)
+    last_accessed_at = db.Column(db.Float, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<AnalysisCacheEntry {self.key[:12]}>'
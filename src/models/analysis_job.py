@@ -0,0 +1,34 @@
+import json
+from datetime import datetime, timezone
+from src.models.user import db
+
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+
+class AnalysisJob(db.Model):
+    """A resume analysis queued for background processing"""
+    __tablename__ = 'analysis_job'
+
+    id = db.Column(db.String(36), primary_key=True)
+    status = db.Column(db.String(16), nullable=False, default='queued', index=True)
+    resume_text = db.Column(db.Text, nullable=False)
+    job_description = db.Column(db.Text, nullable=False)
+    result = db.Column(db.Text)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=utcnow)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False, default=utcnow, onupdate=utcnow, index=True)
+
+    def __repr__(self):
+        return f'<AnalysisJob {self.id} {self.status}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'createdAt': self.created_at.isoformat(),
+            'updatedAt': self.updated_at.isoformat()
+        }
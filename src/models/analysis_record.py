@@ -0,0 +1,40 @@
+import json
+import zlib
+from datetime import datetime, timezone
+from src.models.user import db
+
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+
+class AnalysisRecord(db.Model):
+    """A finished analysis, kept for the history, search and export endpoints"""
+    __tablename__ = 'analysis_record'
+
+    # An integer key is the SQLite rowid, which the full-text index refers to.
+    # Ids are assigned in insert order, so they also order records by created_at.
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=utcnow, index=True)
+    # SHA-256 of the normalized resume text and job description
+    resume_digest = db.Column(db.String(64), nullable=False, index=True)
+    job_digest = db.Column(db.String(64), nullable=False, index=True)
+    match_score = db.Column(db.Integer, nullable=False, index=True)
+    # ai, fallback or prefilter
+    source = db.Column(db.String(16), nullable=False)
+    result_compressed = db.Column(db.LargeBinary, nullable=False)
+
+    def __repr__(self):
+        return f'<AnalysisRecord {self.id}>'
+
+    @staticmethod
+    def decode_result(result_compressed):
+        return json.loads(zlib.decompress(result_compressed))
+
+    @property
+    def result(self):
+        return self.decode_result(self.result_compressed)
+
+    @result.setter
+    def result(self, value):
+        self.result_compressed = zlib.compress(json.dumps(value).encode('utf-8'), 6)
@@ -0,0 +1,26 @@
+import zlib
+from src.models.user import db
+
+
+class ExtractedText(db.Model):
+    """Text extracted from an uploaded file, keyed by the SHA-256 of its bytes"""
+    __tablename__ = 'extracted_text'
+
+    digest = db.Column(db.String(64), primary_key=True)
+    text_compressed = db.Column(db.LargeBinary, nullable=False)
+    source_bytes = db.Column(db.Integer, nullable=False)
+    text_chars = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.Float, nullable=False)
+    last_accessed_at = db.Column(db.Float, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<ExtractedText {self.digest[:12]}>'
+
+    @property
+    def text(self):
+        return zlib.decompress(self.text_compressed).decode('utf-8')
+
+    @text.setter
+    def text(self, value):
+        self.text_compressed = zlib.compress(value.encode('utf-8'), 6)
+        self.text_chars = len(value)
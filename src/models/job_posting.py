@@ -0,0 +1,37 @@
+import json
+from datetime import datetime, timezone
+from src.models.user import db
+
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+
+class JobPosting(db.Model):
+    """A registered job description with its preprocessing stored alongside it"""
+    __tablename__ = 'job_posting'
+
+    id = db.Column(db.String(36), primary_key=True)
+    title = db.Column(db.String(200))
+    description = db.Column(db.Text, nullable=False)
+    # SHA-256 of normalized_text, so registering the same posting twice returns the first
+    digest = db.Column(db.String(64), nullable=False, unique=True)
+    normalized_text = db.Column(db.Text, nullable=False)
+    job_query = db.Column(db.Text, nullable=False)
+    prompt_fragment = db.Column(db.Text, nullable=False)
+    preprocess_version = db.Column(db.String(64), nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=utcnow)
+
+    def __repr__(self):
+        return f'<JobPosting {self.id}>'
+
+    def to_dict(self):
+        job_query = json.loads(self.job_query)
+        return {
+            'id': self.id,
+            'title': self.title,
+            'skills': list(job_query['skills']),
+            'descriptionChars': len(self.description),
+            'promptChars': len(self.prompt_fragment),
+            'createdAt': self.created_at.isoformat()
+        }
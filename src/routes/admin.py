@@ -0,0 +1,19 @@
+from flask import Blueprint, jsonify
+from src.services.llm_scheduler import llm_scheduler
+from src.services.resume_index import resume_index
+from src.services.text_cache import text_cache_stats
+from src.services.together_client import together_client
+from src.services.uploads import upload_memory_budget
+
+admin_bp = Blueprint('admin', __name__)
+
+@admin_bp.route('/admin/stats', methods=['GET'])
+def get_stats():
+    """Operational counters for the analysis pipeline"""
+    return jsonify({
+        'upstream': together_client.stats(),
+        'extraction_cache': text_cache_stats(),
+        'upload_budget': upload_memory_budget.stats(),
+        'resume_index': resume_index.stats(),
+        'scheduler': llm_scheduler.stats()
+    })
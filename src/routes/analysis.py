@@ -1,82 +1,64 @@
 import os
 import json
-import PyPDF2
-import docx
-from flask import Blueprint, request, jsonify
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
-import requests
-import tempfile
 import re
+from src.services.extraction import DocumentRejectedError
+from src.services.extraction_executor import ExtractionTimeoutError
+from src.services.text_cache import extract_upload_cached
+from src.services.uploads import SpooledUpload, UploadRejectedError
+from src.services.analysis_cache import make_cache_key, get_cached_analysis, store_analysis
+from src.services.analysis_history import record_analysis
+from src.services.json_stream import IncrementalJSONFieldParser, extract_json_fields
+from src.services.analysis_schema import ANALYSIS_FIELDS, ASSESSMENT_FIELDS, validate_analysis, validate_field
+from src.services.scoring import get_scoring_engine
+from src.services.job_postings import get_prepared_job, prepare_job
+from src.services.prompt_budget import (
+    ASSESSMENT_MAX_TOKENS, PROMPT_RESUME_TOKENS, RESPONSE_MAX_TOKENS, compact_text, estimate_tokens, fit_to_budget,
+    response_token_budget, rewrite_token_budget
+)
+from src.services.job_queue import QueueFullError, expire_orphaned_job, submit_analysis_job
+from src.services.together_client import LLMOverloadedError, TogetherAPIError, together_client
+from src.services.async_together_client import async_together_client
+from src.services.single_flight import async_single_flight, make_flight_key, single_flight
+from src.services.llm_scheduler import current_priority
+from src.services import metrics
+from src.services.metrics import ANALYSES, FALLBACKS, UPLOAD_BYTES, UPLOADS_REJECTED, record_stage, timed_stage
+from src.models.analysis_job import AnalysisJob
 
 analysis_bp = Blueprint('analysis', __name__)
 
 # Together AI configuration
 TOGETHER_API_KEY = os.getenv('TOGETHER_API_KEY')
-TOGETHER_API_URL = "https://api.together.xyz/v1/chat/completions"
+TOGETHER_API_URL = os.getenv('TOGETHER_API_URL', "https://api.together.xyz/v1/chat/completions")
 MODEL_NAME = "meta-llama/Llama-3.3-70B-Instruct-Turbo-Free"
 
-# Allowed file extensions
-ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'txt'}
+# Bump whenever create_analysis_prompt changes so cached results are invalidated
+PROMPT_VERSION = "2"
 
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+# Local relevance score (0-100) below which the AI call is skipped; 0 disables gating
+PREFILTER_THRESHOLD = float(os.getenv('PREFILTER_THRESHOLD', '0'))
 
-def extract_text_from_file(file):
-    """Extract text from uploaded file based on its type"""
-    filename = secure_filename(file.filename)
-    file_ext = filename.rsplit('.', 1)[1].lower()
-    
-    try:
-        if file_ext == 'pdf':
-            return extract_text_from_pdf(file)
-        elif file_ext in ['doc', 'docx']:
-            return extract_text_from_docx(file)
-        elif file_ext == 'txt':
-            return file.read().decode('utf-8')
-        else:
-            raise ValueError(f"Unsupported file type: {file_ext}")
-    except Exception as e:
-        raise Exception(f"Error extracting text from {file_ext} file: {str(e)}")
+# Split mode issues the assessment and the resume rewrite as two concurrent AI calls
+ANALYSIS_SPLIT = os.getenv('ANALYSIS_SPLIT', 'false').lower() in ('1', 'true', 'yes')
+REWRITE_WORKERS = int(os.getenv('REWRITE_WORKERS', '8'))
 
-def extract_text_from_pdf(file):
-    """Extract text from PDF file"""
-    text = ""
-    try:
-        pdf_reader = PyPDF2.PdfReader(file)
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
-    except Exception as e:
-        raise Exception(f"Error reading PDF: {str(e)}")
+_rewrite_executor = ThreadPoolExecutor(max_workers=REWRITE_WORKERS, thread_name_prefix='resume-rewrite')
 
-def extract_text_from_docx(file):
-    """Extract text from DOCX file"""
-    try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp_file:
-            file.save(tmp_file.name)
-            
-            # Read the document
-            doc = docx.Document(tmp_file.name)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            
-            # Clean up temporary file
-            os.unlink(tmp_file.name)
-            
-            return text.strip()
-    except Exception as e:
-        raise Exception(f"Error reading DOCX: {str(e)}")
+# Allowed file extensions
+ALLOWED_EXTENSIONS = {'pdf', 'docx', 'txt'}
 
-def call_together_ai(prompt):
-    """Call Together AI API with the given prompt"""
-    headers = {
-        "Authorization": f"Bearer {TOGETHER_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
-    data = {
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+def build_together_payload(prompt, stream=False, max_tokens=RESPONSE_MAX_TOKENS):
+    """Build the chat completion request body for Together AI"""
+    return {
         "model": MODEL_NAME,
         "messages": [
             {
@@ -88,22 +70,130 @@ def call_together_ai(prompt):
                 "content": prompt
             }
         ],
-        "max_tokens": 4000,
+        "max_tokens": max_tokens,
         "temperature": 0.7,
         "top_p": 0.9,
-        "stream": False
+        "stream": stream
     }
+
+def together_headers():
+    return {
+        "Authorization": f"Bearer {TOGETHER_API_KEY}",
+        "Content-Type": "application/json"
+    }
+
+def log_token_usage(prompt, content, max_tokens, usage=None):
+    """Log tokens in/out for one completion, preferring the API's own usage counts"""
+    usage = usage or {}
+    tokens_in = usage.get('prompt_tokens', f"~{estimate_tokens(prompt)}")
+    tokens_out = usage.get('completion_tokens', f"~{estimate_tokens(content)}")
+    print(f"Together AI tokens: in={tokens_in} out={tokens_out} max_tokens={max_tokens}")
+
+class CompletionText(str):
+    """Completion message text that also carries the choice's finish_reason"""
+    finish_reason = None
+
+def completion_content(prompt, max_tokens, result):
+    """Return the message text of a chat completion response body, as CompletionText"""
+    try:
+        choice = result['choices'][0]
+        content = CompletionText(choice['message']['content'])
+    except (KeyError, IndexError, TypeError) as e:
+        raise TogetherAPIError(f"Unexpected API response format: {str(e)}")
+    # 'length' means generation stopped at max_tokens
+    content.finish_reason = choice.get('finish_reason')
+    log_token_usage(prompt, content, max_tokens, result.get('usage'))
+    return content
+
+def is_truncated(ai_response):
+    """Whether an AI response was cut off at max_tokens"""
+    return getattr(ai_response, 'finish_reason', None) == 'length'
+
+def call_together_ai(prompt, max_tokens=RESPONSE_MAX_TOKENS):
+    """Call Together AI API with the given prompt
+
+    Concurrent calls with the same model, prompt and max_tokens share one
+    upstream request. The shared call queues at its first caller's priority,
+    so only callers at the same priority share one.
+    """
+    key = make_flight_key(MODEL_NAME, max_tokens, prompt, current_priority())
+    return single_flight.do(key, request_together_ai, prompt, max_tokens)
+
+def request_together_ai(prompt, max_tokens=RESPONSE_MAX_TOKENS):
+    data = build_together_payload(prompt, max_tokens=max_tokens)
     
+    response = together_client.post(TOGETHER_API_URL, together_headers(), data)
     try:
-        response = requests.post(TOGETHER_API_URL, headers=headers, json=data, timeout=60)
-        response.raise_for_status()
-        
         result = response.json()
-        return result['choices'][0]['message']['content']
-    except requests.exceptions.RequestException as e:
-        raise Exception(f"API request failed: {str(e)}")
-    except KeyError as e:
-        raise Exception(f"Unexpected API response format: {str(e)}")
+    except ValueError as e:
+        raise TogetherAPIError(f"Unexpected API response format: {str(e)}")
+    return completion_content(prompt, max_tokens, result)
+
+async def call_together_ai_async(prompt, max_tokens=RESPONSE_MAX_TOKENS):
+    """Call Together AI API from an event loop without holding a thread, coalescing like call_together_ai"""
+    key = make_flight_key(MODEL_NAME, max_tokens, prompt, current_priority())
+    return await async_single_flight.do(key, request_together_ai_async, prompt, max_tokens)
+
+async def request_together_ai_async(prompt, max_tokens=RESPONSE_MAX_TOKENS):
+    data = build_together_payload(prompt, max_tokens=max_tokens)
+    result = await async_together_client.post_json(TOGETHER_API_URL, together_headers(), data)
+    return completion_content(prompt, max_tokens, result)
+
+def call_together_ai_stream(prompt, max_tokens=RESPONSE_MAX_TOKENS):
+    """Call Together AI API with streaming enabled, yielding content deltas"""
+    # Already imported by the client's session; not at module level, to keep it out of startup
+    import requests
+    data = build_together_payload(prompt, stream=True, max_tokens=max_tokens)
+    chunks = []
+    
+    with together_client.post(TOGETHER_API_URL, together_headers(), data, stream=True) as response:
+        try:
+            # Server-sent events are UTF-8 whatever the Content-Type says (requests would assume Latin-1)
+            for raw_line in response.iter_lines():
+                line = raw_line.decode('utf-8')
+                if not line or not line.startswith('data:'):
+                    continue
+                payload = line[len('data:'):].strip()
+                if payload == '[DONE]':
+                    break
+                chunk = json.loads(payload)
+                delta = chunk['choices'][0].get('delta') or {}
+                if delta.get('content'):
+                    chunks.append(delta['content'])
+                    yield delta['content']
+        except requests.exceptions.RequestException as e:
+            raise TogetherAPIError(f"API request failed: {str(e)}")
+        except (KeyError, IndexError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise TogetherAPIError(f"Unexpected API response format: {str(e)}")
+    log_token_usage(prompt, ''.join(chunks), max_tokens)
+
+def compact_prompt_inputs(resume_text, job_description):
+    """Compact the resume and job description to their prompt token budgets"""
+    resume_part = fit_to_budget(compact_text(resume_text), PROMPT_RESUME_TOKENS)
+    job_part = prepare_job(job_description).prompt_fragment
+    return resume_part, job_part
+
+def prepare_analysis_prompt(resume_text, job_description):
+    """Compact the inputs to the prompt budget and size the response
+    
+    Returns a (prompt, max_tokens) tuple.
+    """
+    with timed_stage('prompt'):
+        resume_part, job_part = compact_prompt_inputs(resume_text, job_description)
+        prompt = create_analysis_prompt(resume_part, job_part)
+    return prompt, response_token_budget(estimate_tokens(resume_part))
+
+def prepare_assessment_prompt(resume_text, job_description):
+    """Like prepare_analysis_prompt, for the assessment-only half of a split analysis"""
+    with timed_stage('prompt'):
+        resume_part, job_part = compact_prompt_inputs(resume_text, job_description)
+        return create_assessment_prompt(resume_part, job_part), ASSESSMENT_MAX_TOKENS
+
+def prepare_rewrite_prompt(resume_text, job_description):
+    """Like prepare_analysis_prompt, for the rewrite-only half of a split analysis"""
+    with timed_stage('rewrite_prompt'):
+        resume_part, job_part = compact_prompt_inputs(resume_text, job_description)
+        return create_rewrite_prompt(resume_part, job_part), rewrite_token_budget(estimate_tokens(resume_part))
 
 def create_analysis_prompt(resume_text, job_description):
     """Create a comprehensive prompt for AI analysis"""
@@ -169,122 +259,586 @@ Ensure the response is valid JSON that can be parsed programmatically.
 """
     return prompt
 
-def parse_ai_response(response_text):
-    """Parse and validate AI response"""
+def create_assessment_prompt(resume_text, job_description):
+    """Create a prompt for the assessment fields only, without the resume rewrite"""
+    prompt = f"""
+Please analyze the following resume against the provided job description and provide a concise assessment.
+
+RESUME:
+{resume_text}
+
+JOB DESCRIPTION:
+{job_description}
+
+Please provide your analysis in the following JSON format (ensure valid JSON syntax):
+
+{{
+    "matchScore": <number between 0-100>,
+    "suitability": {{
+        "overall": "<overall assessment in 1-2 sentences>",
+        "strengths": ["<strength 1>", "<strength 2>", "<strength 3>"],
+        "concerns": ["<concern 1>", "<concern 2>"]
+    }},
+    "skillGaps": {{
+        "missing": ["<missing skill 1>", "<missing skill 2>", "<missing skill 3>"],
+        "weak": ["<weak area 1>", "<weak area 2>"]
+    }},
+    "recommendations": [
+        "<recommendation 1>",
+        "<recommendation 2>",
+        "<recommendation 3>",
+        "<recommendation 4>",
+        "<recommendation 5>"
+    ]
+}}
+
+Analysis Guidelines:
+1. Match Score: Calculate based on skills alignment, experience relevance, and qualification match
+2. Suitability: Assess overall fit, highlighting key strengths and potential concerns
+3. Skill Gaps: Identify missing skills and areas needing improvement
+4. Recommendations: Provide 5 specific, actionable suggestions
+
+Ensure the response is valid JSON that can be parsed programmatically.
+"""
+    return prompt
+
+def create_rewrite_prompt(resume_text, job_description):
+    """Create a prompt for the optimized resume HTML only"""
+    prompt = f"""
+Rewrite the following resume as ATS-friendly HTML optimized for the provided job description.
+
+RESUME:
+{resume_text}
+
+JOB DESCRIPTION:
+{job_description}
+
+The rewritten resume should:
+- Use relevant keywords from the job description naturally
+- Highlight matching skills and experiences
+- Follow ATS-friendly formatting
+- Include all original information but reorganized/rewritten for better impact
+- Use strong action verbs and quantifiable achievements where possible
+
+Respond with the HTML fragment only (no <html> or <body> tags, no markdown code fences, no commentary).
+"""
+    return prompt
+
+def parse_ai_response(response_text, expected_fields=ANALYSIS_FIELDS):
+    """Parse and validate AI response
+    
+    Returns (analysis_fields, missing_fields, complete): the schema-valid
+    fields that could be recovered from the response, the expected ones that
+    could not, and whether the response was whole (nothing missing or cut
+    off). Raises ValueError if nothing usable was found.
+    """
+    fields, truncated = extract_json_fields(response_text)
+    return validate_ai_fields(fields, truncated, expected_fields)
+
+def validate_ai_fields(fields, truncated, expected_fields=ANALYSIS_FIELDS):
+    """Validate fields from IncrementalJSONFieldParser; see parse_ai_response"""
+    analysis_fields, missing_fields = validate_analysis(fields, expected_fields)
+    if not analysis_fields:
+        raise ValueError("No usable analysis fields in AI response")
+    if missing_fields or truncated:
+        print(f"AI response was incomplete (truncated={truncated}); missing fields: {', '.join(missing_fields) or 'none'}")
+    return analysis_fields, missing_fields, not (missing_fields or truncated)
+
+def complete_analysis(analysis_fields, missing_fields, resume_text, job_description):
+    """Fill fields the AI response lacked from the local analysis"""
+    ANALYSES.inc(source='ai')
+    if missing_fields:
+        FALLBACKS.inc(reason='missing_fields')
+        local_result = create_mock_analysis_result(resume_text, job_description)
+        for key in missing_fields:
+            analysis_fields[key] = local_result[key]
+    return analysis_fields
+
+def parse_rewrite_response(response_text):
+    """Extract the optimized resume HTML from a rewrite response"""
+    # Strip code fences, including an opening one whose closing fence was cut off
+    html = re.sub(r"^```[a-zA-Z]*\s*", "", response_text.strip())
+    html = re.sub(r"\s*```$", "", html)
+    if not html:
+        raise ValueError("Empty rewrite response")
+    return html
+
+def settle_rewrite(resume_text, job_description, ai_response=None, error=None):
+    """Turn a rewrite AI response (or the error that replaced it) into HTML
+    
+    Returns an (optimized_resume_html, complete) tuple: complete only for a
+    whole AI rewrite, the only kind cached. One cut off at max_tokens is
+    still returned, as browsers close its open tags; on AI failure the local
+    template is used.
+    """
+    if error is None:
+        try:
+            optimized_resume = parse_rewrite_response(ai_response)
+        except ValueError as e:
+            error = e
+        else:
+            if is_truncated(ai_response):
+                print("AI rewrite was incomplete (stopped at max_tokens)")
+                return optimized_resume, False
+            return optimized_resume, True
+    print(f"AI API Error: {str(error)}")
+    FALLBACKS.inc(reason='rewrite_error')
+    engine = get_scoring_engine()
+    matched_skills = engine.score(prepare_job(job_description).query, resume_text).matched_skills
+    return generate_optimized_resume_html(resume_text, job_description, matched_skills), False
+
+def run_rewrite(resume_text, job_description, llm_call=None):
+    """Generate the optimized resume on its own; see settle_rewrite"""
+    prompt, max_tokens = prepare_rewrite_prompt(resume_text, job_description)
     try:
-        # Try to extract JSON from the response
-        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group()
-            return json.loads(json_str)
+        with timed_stage('rewrite_ai'):
+            ai_response = (llm_call or call_together_ai)(prompt, max_tokens)
+    except Exception as e:
+        return settle_rewrite(resume_text, job_description, error=e)
+    return settle_rewrite(resume_text, job_description, ai_response)
+
+def run_rewrite_job(assessment, resume_text, job_description):
+    """Job queue runner for a deferred rewrite
+    
+    assessment is the AI assessment it completes, or None if the assessment
+    fell back to the local result; only complete AI results are cached.
+    """
+    optimized_resume, complete = run_rewrite(resume_text, job_description)
+    if assessment is not None and complete:
+        cache_key = make_cache_key(resume_text, job_description, MODEL_NAME, PROMPT_VERSION)
+        store_analysis(cache_key, dict(assessment, optimizedResume=optimized_resume))
+    return {'optimizedResume': optimized_resume}
+
+def start_rewrite(resume_text, job_description, defer_rewrite, llm_call=None):
+    """Start the rewrite half of a split analysis
+    
+    Returns a future for the concurrent rewrite, or None when the rewrite is
+    deferred to a background job by finish_split_analysis.
+    """
+    if defer_rewrite:
+        return None
+    # Run in a copy of this context so the rewrite's stages reach the request's Server-Timing
+    return _rewrite_executor.submit(contextvars.copy_context().run, run_rewrite,
+                                    resume_text, job_description, llm_call)
+
+def finish_split_analysis(analysis_result, assessment_ok, rewrite_future, resume_text, job_description, cache_key):
+    """Attach the rewrite to a split analysis's assessment, caching the merged result
+    
+    Without a rewrite_future the rewrite is queued as an analysis job and the
+    result carries its rewriteJobId with optimizedResume set to None.
+    """
+    analysis_result.pop('optimizedResume', None)
+    if rewrite_future is None:
+        try:
+            job = submit_analysis_job(current_app._get_current_object(), resume_text, job_description,
+                                      partial(run_rewrite_job, dict(analysis_result) if assessment_ok else None))
+        except QueueFullError:
+            # No room to defer; finish the rewrite in this request instead
+            rewrite_future = start_rewrite(resume_text, job_description, False)
         else:
-            raise ValueError("No JSON found in response")
-    except json.JSONDecodeError as e:
-        # If JSON parsing fails, create a fallback response
-        return create_fallback_response(response_text)
+            analysis_result['optimizedResume'] = None
+            analysis_result['rewriteJobId'] = job.id
+            return analysis_result
+    
+    optimized_resume, complete = rewrite_future.result()
+    analysis_result['optimizedResume'] = optimized_resume
+    if assessment_ok and complete:
+        with timed_stage('cache_write'):
+            store_analysis(cache_key, analysis_result)
+    return analysis_result
+
+def read_analysis_options():
+    """Return (split, defer_rewrite) from the request's mode/deferRewrite fields"""
+    defer_rewrite = request.form.get('deferRewrite', '').lower() in ('1', 'true', 'yes')
+    mode = request.form.get('mode', 'split' if ANALYSIS_SPLIT else 'single')
+    return mode == 'split' or defer_rewrite, defer_rewrite
+
+def validate_job_description(job_description):
+    """Return an error message if the job description is unusable, else None"""
+    if len(job_description.strip()) < 50:
+        return 'Job description is too short. Please provide a detailed job description.'
+    return None
+
+def read_job_description():
+    """Return (job_description, prepared_job, error_response) from the form's jobPostingId or jobDescription
 
-def create_fallback_response(response_text):
-    """Create a fallback response if AI response parsing fails"""
+    A registered posting (see /api/jobs) was validated and preprocessed when
+    it was created, so only its id needs to be sent; prepared_job is its
+    PreparedJob, or None for a description sent as text.
+    """
+    posting_id = request.form.get('jobPostingId')
+    if posting_id:
+        prepared_job = get_prepared_job(posting_id)
+        if prepared_job is None:
+            return None, None, (jsonify({'error': 'Job posting not found'}), 404)
+        return prepared_job.description, prepared_job, None
+    
+    if 'jobDescription' not in request.form:
+        return None, None, (jsonify({'error': 'No job description provided'}), 400)
+    
+    job_description = request.form['jobDescription']
+    job_description_error = validate_job_description(job_description)
+    if job_description_error:
+        return None, None, (jsonify({'error': job_description_error}), 400)
+    return job_description, None, None
+
+def read_analysis_request():
+    """Validate the analysis form and extract the resume text
+    
+    Returns a (resume_text, job_description, prepared_job, error_response)
+    tuple where error_response is None when the request is valid and
+    prepared_job is as for read_job_description.
+    """
+    # Refuse oversized bodies before the form is parsed
+    try:
+        request.files
+    except RequestEntityTooLarge:
+        UPLOADS_REJECTED.inc(reason='too_large')
+        return None, None, None, (jsonify({'error': 'File is too large'}), 413)
+    
+    # Check if files are present
+    if 'resume' not in request.files:
+        return None, None, None, (jsonify({'error': 'No resume file provided'}), 400)
+    
+    if 'jobDescription' not in request.form and not request.form.get('jobPostingId'):
+        return None, None, None, (jsonify({'error': 'No job description provided'}), 400)
+    
+    resume_file = request.files['resume']
+    
+    # Validate file
+    if resume_file.filename == '':
+        return None, None, None, (jsonify({'error': 'No file selected'}), 400)
+    
+    if not allowed_file(resume_file.filename):
+        return None, None, None, (jsonify({'error': 'File type not allowed. Please upload PDF, DOCX, or TXT files.'}), 400)
+    
+    # Validate job description, or look up the registered posting
+    job_description, prepared_job, error_response = read_job_description()
+    if error_response is not None:
+        return None, None, None, error_response
+    
+    # Extract text from resume in a worker process, reusing earlier identical uploads.
+    # The parser is picked from the file's content, not its extension.
+    try:
+        upload = SpooledUpload(secure_filename(resume_file.filename), resume_file.stream)
+        UPLOAD_BYTES.observe(upload.size, type=upload.file_type)
+        with timed_stage('extract'):
+            resume_text, _ = extract_upload_cached(upload)
+        if len(resume_text.strip()) < 100:
+            return None, None, None, (jsonify({'error': 'Resume content is too short or could not be extracted properly.'}), 400)
+    except UploadRejectedError as e:
+        UPLOADS_REJECTED.inc(reason=e.reason)
+        response = jsonify({'error': str(e)})
+        if e.status_code == 429:
+            response.headers['Retry-After'] = '1'
+        return None, None, None, (response, e.status_code)
+    except DocumentRejectedError as e:
+        UPLOADS_REJECTED.inc(reason='too_many_pages')
+        return None, None, None, (jsonify({'error': str(e)}), 413)
+    except ExtractionTimeoutError as e:
+        return None, None, None, (jsonify({'error': f'Resume file is too complex to process: {str(e)}'}), 422)
+    except Exception as e:
+        return None, None, None, (jsonify({'error': f'Error processing resume file: {str(e)}'}), 400)
+    
+    return resume_text, job_description, prepared_job, None
+
+def prefilter_analysis(resume_text, job_description, threshold, job_query=None):
+    """Return a local analysis if the resume scores below threshold, else None
+    
+    Resumes with almost no overlap with the job description are answered
+    from the local scoring engine instead of spending an AI call on them.
+    """
+    if threshold <= 0:
+        return None
+    
+    with timed_stage('prefilter'):
+        engine = get_scoring_engine()
+        if job_query is None:
+            job_query = prepare_job(job_description).query
+        score_result = engine.score(job_query, resume_text)
+    if score_result.score >= threshold:
+        return None
+    
+    analysis_result = create_gated_analysis_result(resume_text, job_description, score_result)
+    analysis_result['analysisSource'] = 'local-prefilter'
+    return analysis_result
+
+def create_gated_analysis_result(resume_text, job_description, score_result):
+    """Analysis for a resume the pre-filter screened out, worded from its local score"""
+    matched = score_result.matched_skills
+    missing = score_result.missing_skills
+    overall = (f"Screened out without AI review: this resume matches little of the job description "
+               f"(local match score {score_result.score}/100).")
+    if matched:
+        strengths = [f"Mentions {len(matched)} of the job's skills: {', '.join(matched[:5])}"]
+    else:
+        strengths = []
+    concerns = ["Few of the job description's skills and keywords appear in the resume"]
+    if missing:
+        concerns.append(f"Key skills not found: {', '.join(missing[:5])}")
+    recommendations = ["Check that this resume is meant for this role before investing in a full review"]
+    if missing:
+        recommendations.append(f"Add any experience with {', '.join(missing[:3])} to the resume")
+    recommendations.append("Re-run the analysis after updating the resume to get an AI review")
     return {
-        "matchScore": 75,
+        "matchScore": score_result.score,
         "suitability": {
-            "overall": "Analysis completed but response format needs adjustment.",
-            "strengths": [
-                "Resume contains relevant experience",
-                "Educational background is appropriate",
-                "Skills section includes required technologies"
-            ],
-            "concerns": [
-                "Some specific requirements may need more emphasis",
-                "Consider adding more quantifiable achievements"
-            ]
+            "overall": overall,
+            "strengths": strengths,
+            "concerns": concerns
         },
         "skillGaps": {
-            "missing": [
-                "Specific certifications mentioned in job description",
-                "Industry-specific tools or technologies",
-                "Leadership or management experience"
-            ],
-            "weak": [
-                "Quantifiable achievements",
-                "Industry-specific keywords",
-                "Professional development activities"
-            ]
+            "missing": missing[:5],
+            "weak": []
         },
-        "recommendations": [
-            "Add specific keywords from the job description naturally throughout your resume",
-            "Include quantifiable achievements and metrics where possible",
-            "Highlight relevant certifications or training",
-            "Emphasize experience with technologies mentioned in the job posting",
-            "Consider adding a professional summary section at the top"
-        ],
-        "optimizedResume": f"<div class='ai-response'><h3>AI Analysis Response</h3><p>The AI provided detailed feedback but in a format that needs processing. Here's the raw response:</p><pre>{response_text[:1000]}...</pre></div>"
+        "recommendations": recommendations,
+        "optimizedResume": generate_optimized_resume_html(resume_text, job_description, matched)
     }
 
+def is_gated(analysis_result):
+    return analysis_result.get('analysisSource') == 'local-prefilter'
+
+def lookup_analysis(resume_text, job_description, prefilter_threshold=None, prepared_job=None):
+    """Resolve an analysis without the AI, from the cache or the pre-filter
+    
+    prepared_job, the description's PreparedJob when the caller has it,
+    supplies its normalized text, digest and compiled query, which a
+    registered posting has stored. Returns a (cache_key, analysis_result,
+    cache_hit) tuple; analysis_result is None when the AI is needed.
+    """
+    # Serve repeated resume/job description pairs from the cache
+    normalized_job_description = prepared_job.normalized_text if prepared_job is not None else None
+    cache_key = make_cache_key(resume_text, job_description, MODEL_NAME, PROMPT_VERSION, normalized_job_description)
+    with timed_stage('cache_lookup'):
+        cached_result = get_cached_analysis(cache_key)
+    if cached_result is not None:
+        ANALYSES.inc(source='cache')
+        return cache_key, cached_result, True
+    
+    # Skip the AI entirely for clearly non-matching resumes
+    if prefilter_threshold is None:
+        prefilter_threshold = PREFILTER_THRESHOLD
+    job_query = prepared_job.query if prepared_job is not None else None
+    gated_result = prefilter_analysis(resume_text, job_description, prefilter_threshold, job_query)
+    if gated_result is not None:
+        ANALYSES.inc(source='prefilter')
+        with timed_stage('history_write'):
+            record_analysis(resume_text, job_description, gated_result, 'prefilter', job_digest(prepared_job))
+    return cache_key, gated_result, False
+
+def settle_assessment(resume_text, job_description, split, ai_response=None, error=None):
+    """Turn an AI response (or the error that replaced it) into an analysis
+    
+    Returns an (analysis_result, complete) tuple; only complete AI results
+    are cached, partial ones are topped up from the local analysis.
+    """
+    if error is None:
+        try:
+            with timed_stage('parse'):
+                analysis_result, missing_fields, complete = parse_ai_response(
+                    ai_response, ASSESSMENT_FIELDS if split else ANALYSIS_FIELDS)
+        except ValueError as e:
+            error = e
+        else:
+            return complete_analysis(analysis_result, missing_fields, resume_text, job_description), complete
+    
+    # If AI call fails, return a mock response for demo purposes
+    print(f"AI API Error: {str(error)}")
+    ANALYSES.inc(source='fallback')
+    FALLBACKS.inc(reason='shed' if isinstance(error, LLMOverloadedError) else 'ai_error')
+    return create_mock_analysis_result(resume_text, job_description), False
+
+def job_digest(prepared_job):
+    return prepared_job.digest if prepared_job is not None else None
+
+def finish_analysis(analysis_result, assessment_ok, split, rewrite_future, resume_text, job_description, cache_key,
+                    prepared_job=None):
+    """Cache a complete analysis, attaching the rewrite first in split mode, and record it in the history"""
+    if split:
+        analysis_result = finish_split_analysis(analysis_result, assessment_ok, rewrite_future,
+                                                resume_text, job_description, cache_key)
+    elif assessment_ok:
+        with timed_stage('cache_write'):
+            store_analysis(cache_key, analysis_result)
+    with timed_stage('history_write'):
+        record_analysis(resume_text, job_description, analysis_result, 'ai' if assessment_ok else 'fallback',
+                        job_digest(prepared_job))
+    return analysis_result
+
+def run_analysis(resume_text, job_description, llm_call=None, prefilter_threshold=None, prepared_job=None,
+                 split=False, defer_rewrite=False):
+    """Run the cached prompt -> LLM -> parse pipeline
+    
+    llm_call(prompt, max_tokens) defaults to call_together_ai and prefilter_threshold to
+    PREFILTER_THRESHOLD. prepared_job may carry the job description's
+    PreparedJob (see lookup_analysis). With split, the assessment and resume
+    rewrite are two concurrent AI calls, and defer_rewrite moves the rewrite
+    to a background job. Returns an (analysis_result, cache_hit) tuple.
+    """
+    cache_key, analysis_result, cache_hit = lookup_analysis(resume_text, job_description,
+                                                            prefilter_threshold, prepared_job)
+    if analysis_result is not None:
+        return analysis_result, cache_hit
+    
+    # Create analysis prompt within the token budget
+    rewrite_future = None
+    if split:
+        rewrite_future = start_rewrite(resume_text, job_description, defer_rewrite, llm_call)
+        prompt, max_tokens = prepare_assessment_prompt(resume_text, job_description)
+    else:
+        prompt, max_tokens = prepare_analysis_prompt(resume_text, job_description)
+    
+    # Call AI for analysis
+    try:
+        with timed_stage('ai'):
+            ai_response = (llm_call or call_together_ai)(prompt, max_tokens)
+    except Exception as e:
+        analysis_result, assessment_ok = settle_assessment(resume_text, job_description, split, error=e)
+    else:
+        analysis_result, assessment_ok = settle_assessment(resume_text, job_description, split, ai_response)
+    
+    analysis_result = finish_analysis(analysis_result, assessment_ok, split, rewrite_future,
+                                      resume_text, job_description, cache_key, prepared_job)
+    return analysis_result, False
+
+def run_analysis_job(resume_text, job_description):
+    """Job queue runner: the analysis result without cache metadata"""
+    analysis_result, _ = run_analysis(resume_text, job_description, split=ANALYSIS_SPLIT)
+    return analysis_result
+
+def analysis_response(analysis_result, cache_hit):
+    """JSON response for an analysis, with cache and pre-filter headers"""
+    response = jsonify(analysis_result)
+    response.headers['X-Analysis-Cache'] = 'HIT' if cache_hit else 'MISS'
+    response.headers['X-Analysis-Gated'] = '1' if is_gated(analysis_result) else '0'
+    add_server_timing(response)
+    return response
+
+def add_server_timing(response):
+    """Report the current request's stage timings in a Server-Timing header"""
+    timings = metrics.current_request_timings()
+    if timings is not None and timings.stages:
+        response.headers['Server-Timing'] = timings.header()
+
 @analysis_bp.route('/analyze', methods=['POST'])
 def analyze_resume():
     """Main endpoint for resume analysis"""
     try:
-        # Check if files are present
-        if 'resume' not in request.files:
-            return jsonify({'error': 'No resume file provided'}), 400
-        
-        if 'jobDescription' not in request.form:
-            return jsonify({'error': 'No job description provided'}), 400
-        
-        resume_file = request.files['resume']
-        job_description = request.form['jobDescription']
-        
-        # Validate file
-        if resume_file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
+        resume_text, job_description, prepared_job, error_response = read_analysis_request()
+        if error_response is not None:
+            return error_response
         
-        if not allowed_file(resume_file.filename):
-            return jsonify({'error': 'File type not allowed. Please upload PDF, DOC, DOCX, or TXT files.'}), 400
+        split, defer_rewrite = read_analysis_options()
+        analysis_result, cache_hit = run_analysis(resume_text, job_description, prepared_job=prepared_job,
+                                                  split=split, defer_rewrite=defer_rewrite)
         
-        # Validate job description
-        if len(job_description.strip()) < 50:
-            return jsonify({'error': 'Job description is too short. Please provide a detailed job description.'}), 400
-        
-        # Extract text from resume
-        try:
-            resume_text = extract_text_from_file(resume_file)
-            if len(resume_text.strip()) < 100:
-                return jsonify({'error': 'Resume content is too short or could not be extracted properly.'}), 400
-        except Exception as e:
-            return jsonify({'error': f'Error processing resume file: {str(e)}'}), 400
-        
-        # Create analysis prompt
-        prompt = create_analysis_prompt(resume_text, job_description)
-        
-        # Call AI for analysis
-        try:
-            ai_response = call_together_ai(prompt)
-            analysis_result = parse_ai_response(ai_response)
-        except Exception as e:
-            # If AI call fails, return a mock response for demo purposes
-            print(f"AI API Error: {str(e)}")
-            analysis_result = create_mock_analysis_result(resume_text, job_description)
+        return analysis_response(analysis_result, cache_hit)
         
-        return jsonify(analysis_result)
+    except Exception as e:
+        print(f"Analysis error: {str(e)}")
+        return jsonify({'error': 'An error occurred during analysis. Please try again.'}), 500
+
+@analysis_bp.route('/analyze/jobs', methods=['POST'])
+def submit_analysis():
+    """Queue a resume analysis and return its job id without waiting for the AI"""
+    try:
+        resume_text, job_description, _, error_response = read_analysis_request()
+        if error_response is not None:
+            return error_response
         
+        job = submit_analysis_job(current_app._get_current_object(), resume_text,
+                                  job_description, run_analysis_job)
+    except QueueFullError:
+        return jsonify({'error': 'Too many analyses in progress. Please try again shortly.'}), 503
     except Exception as e:
         print(f"Analysis error: {str(e)}")
         return jsonify({'error': 'An error occurred during analysis. Please try again.'}), 500
+    
+    response = jsonify({'jobId': job.id, 'status': job.status})
+    response.headers['Location'] = f"{request.path}/{job.id}"
+    return response, 202
 
-def create_mock_analysis_result(resume_text, job_description):
-    """Create a mock analysis result for demo purposes when AI API is not available"""
+@analysis_bp.route('/analyze/jobs/<job_id>', methods=['GET'])
+def get_analysis_job(job_id):
+    """Return the status, and once finished the result, of a queued analysis"""
+    job = expire_orphaned_job(AnalysisJob.query.get_or_404(job_id))
+    return jsonify(job.to_dict())
+
+def format_sse(event, data):
+    """Format a single Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@analysis_bp.route('/analyze/stream', methods=['POST'])
+def analyze_resume_stream():
+    """Resume analysis endpoint that streams progress as Server-Sent Events
+    
+    Emits ``token`` events with raw completion text, a ``field`` event as
+    each top-level field of the analysis JSON completes, and a final
+    ``result`` event with the full parsed analysis. In split mode only the
+    assessment is streamed while the rewrite runs alongside it.
+    """
+    try:
+        resume_text, job_description, prepared_job, error_response = read_analysis_request()
+        if error_response is not None:
+            return error_response
+        split, defer_rewrite = read_analysis_options()
+    except Exception as e:
+        print(f"Analysis error: {str(e)}")
+        return jsonify({'error': 'An error occurred during analysis. Please try again.'}), 500
     
-    # Simple keyword matching for demo
-    resume_lower = resume_text.lower()
-    job_lower = job_description.lower()
+    cache_key, ready_result, cache_hit = lookup_analysis(resume_text, job_description, prepared_job=prepared_job)
     
-    # Extract some common keywords
-    tech_keywords = ['python', 'javascript', 'react', 'node', 'sql', 'aws', 'docker', 'git']
-    found_keywords = [kw for kw in tech_keywords if kw in resume_lower and kw in job_lower]
+    def generate():
+        if ready_result is not None:
+            yield format_sse('result', ready_result)
+            return
+        
+        rewrite_future = None
+        if split:
+            rewrite_future = start_rewrite(resume_text, job_description, defer_rewrite)
+            prompt, max_tokens = prepare_assessment_prompt(resume_text, job_description)
+        else:
+            prompt, max_tokens = prepare_analysis_prompt(resume_text, job_description)
+        field_parser = IncrementalJSONFieldParser()
+        assessment_ok = False
+        started = time.perf_counter()
+        try:
+            for token in call_together_ai_stream(prompt, max_tokens):
+                yield format_sse('token', {'text': token})
+                for key, value in field_parser.feed(token):
+                    value = validate_field(key, value)
+                    if value is not None:
+                        yield format_sse('field', {'key': key, 'value': value})
+            record_stage('ai', time.perf_counter() - started)
+            analysis_result, missing_fields, assessment_ok = validate_ai_fields(
+                field_parser.close(), field_parser.truncated, ASSESSMENT_FIELDS if split else ANALYSIS_FIELDS)
+        except Exception as e:
+            analysis_result, assessment_ok = settle_assessment(resume_text, job_description, split, error=e)
+        else:
+            complete_analysis(analysis_result, missing_fields, resume_text, job_description)
+        
+        analysis_result = finish_analysis(analysis_result, assessment_ok, split, rewrite_future,
+                                          resume_text, job_description, cache_key, prepared_job)
+        yield format_sse('result', analysis_result)
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.headers['X-Analysis-Cache'] = 'HIT' if cache_hit else 'MISS'
+    response.headers['X-Analysis-Gated'] = '1' if ready_result is not None and is_gated(ready_result) else '0'
+    # Only the stages before the stream starts; the rest are in /api/metrics
+    add_server_timing(response)
+    return response
+
+def create_mock_analysis_result(resume_text, job_description, score_result=None):
+    """Create a mock analysis result for demo purposes when AI API is not available"""
     
-    # Calculate a simple match score
-    match_score = min(95, max(60, len(found_keywords) * 10 + 50))
+    # Score locally against the job description's weighted skills and keywords
+    if score_result is None:
+        engine = get_scoring_engine()
+        score_result = engine.score(prepare_job(job_description).query, resume_text)
+    found_keywords = score_result.matched_skills
+    match_score = score_result.score
     
     return {
         "matchScore": match_score,
@@ -301,7 +855,7 @@ def create_mock_analysis_result(resume_text, job_description):
             ]
         },
         "skillGaps": {
-            "missing": [
+            "missing": score_result.missing_skills[:5] or [
                 "Specific certifications mentioned in job posting",
                 "Advanced experience with certain technologies",
                 "Industry-specific domain knowledge"
@@ -414,3 +968,10 @@ def health_check():
     """Health check endpoint"""
     return jsonify({'status': 'healthy', 'service': 'resume-analyzer-api'})
 
+@analysis_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Pipeline metrics in the Prometheus text exposition format"""
+    if not metrics.METRICS_ENABLED:
+        return jsonify({'error': 'Metrics are disabled'}), 404
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
+
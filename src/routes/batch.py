@@ -0,0 +1,141 @@
+import io
+import os
+import json
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from werkzeug.utils import secure_filename
+from src.routes.analysis import allowed_file, is_gated, read_job_description, run_analysis
+from src.services.job_postings import prepare_job
+from src.services.llm_scheduler import current_tenant, llm_context
+from src.services.text_cache import extract_text_cached
+from src.services.uploads import sniff_file_type
+
+batch_bp = Blueprint('batch', __name__)
+
+# Batch screening configuration
+BATCH_MAX_FILES = int(os.getenv('BATCH_MAX_FILES', '2000'))
+BATCH_MAX_ARCHIVE_BYTES = int(os.getenv('BATCH_MAX_ARCHIVE_BYTES', str(512 * 1024 * 1024)))
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '8'))
+BATCH_PREFILTER_THRESHOLD = float(os.getenv('BATCH_PREFILTER_THRESHOLD', '15'))
+
+
+def iter_batch_uploads():
+    """Yield (filename, bytes) for every resume in the request, including zip members"""
+    count = 0
+    for upload in request.files.getlist('resumes'):
+        if not upload.filename:
+            continue
+        count += 1
+        if count > BATCH_MAX_FILES:
+            raise ValueError(f"A batch may contain at most {BATCH_MAX_FILES} resumes")
+        yield secure_filename(upload.filename), upload.read()
+
+    archive = request.files.get('archive')
+    if archive is None or not archive.filename:
+        return
+
+    with zipfile.ZipFile(archive.stream) as zf:
+        members = [info for info in zf.infolist() if not info.is_dir()]
+        if sum(info.file_size for info in members) > BATCH_MAX_ARCHIVE_BYTES:
+            raise ValueError("Archive is too large once extracted")
+        for info in members:
+            count += 1
+            if count > BATCH_MAX_FILES:
+                raise ValueError(f"A batch may contain at most {BATCH_MAX_FILES} resumes")
+            yield secure_filename(os.path.basename(info.filename)), zf.read(info)
+
+
+@batch_bp.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """Screen many resumes against one job description
+
+    Accepts any number of ``resumes`` files and/or a zip ``archive`` plus a
+    single ``jobDescription`` or registered ``jobPostingId``. Responds with NDJSON: one ``result`` or
+    ``error`` line per resume as it completes, followed by a ``summary``
+    line ranking all resumes by match score.
+    """
+    job_description, prepared_job, error_response = read_job_description()
+    if error_response is not None:
+        return error_response
+
+    if 'resumes' not in request.files and 'archive' not in request.files:
+        return jsonify({'error': 'No resume files provided'}), 400
+
+    app = current_app._get_current_object()
+    tenant = current_tenant()
+    # Prepare the job description once for every resume's cache key and pre-filter score
+    prepared_job = prepared_job or prepare_job(job_description)
+
+    def process_one(filename, data):
+        with app.app_context(), llm_context('bulk', tenant):
+            # Extraction runs in the shared process pool; this thread then waits on the AI
+            resume_text, _ = extract_text_cached(filename, data, sniff_file_type(io.BytesIO(data)))
+            if len(resume_text.strip()) < 100:
+                raise ValueError('Resume content is too short or could not be extracted properly.')
+            # The client retries transient failures and the scheduler holds every call back after a 429,
+            # so an open circuit or a shed call falls back to the local result at once
+            analysis_result, _ = run_analysis(resume_text, job_description,
+                                              prefilter_threshold=BATCH_PREFILTER_THRESHOLD,
+                                              prepared_job=prepared_job)
+            return analysis_result
+
+    def generate():
+        ranking = []
+        failed = 0
+        gated = 0
+        pending = {}
+
+        def line(payload):
+            return json.dumps(payload) + "\n"
+
+        with ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY) as pool:
+            uploads = iter_batch_uploads()
+            exhausted = False
+            while True:
+                # Keep a bounded window of files in flight so large batches
+                # don't hold every upload in memory at once
+                while not exhausted and len(pending) < BATCH_CONCURRENCY * 2:
+                    try:
+                        filename, data = next(uploads)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    except (ValueError, zipfile.BadZipFile) as e:
+                        exhausted = True
+                        yield line({'type': 'error', 'filename': None, 'error': str(e)})
+                        break
+                    if not allowed_file(filename):
+                        failed += 1
+                        yield line({'type': 'error', 'filename': filename,
+                                    'error': 'File type not allowed. Please upload PDF, DOCX, or TXT files.'})
+                        continue
+                    pending[pool.submit(process_one, filename, data)] = filename
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    filename = pending.pop(future)
+                    try:
+                        analysis_result = future.result()
+                    except Exception as e:
+                        failed += 1
+                        yield line({'type': 'error', 'filename': filename, 'error': str(e)})
+                        continue
+
+                    if is_gated(analysis_result):
+                        gated += 1
+                    ranking.append({'filename': filename, 'matchScore': analysis_result.get('matchScore')})
+                    yield line({'type': 'result', 'filename': filename,
+                                'matchScore': analysis_result.get('matchScore'),
+                                'gated': is_gated(analysis_result), 'result': analysis_result})
+
+        ranking.sort(key=lambda item: item['matchScore'] or 0, reverse=True)
+        yield line({'type': 'summary', 'total': len(ranking) + failed, 'succeeded': len(ranking),
+                    'failed': failed, 'gated': gated, 'ranking': ranking})
+
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
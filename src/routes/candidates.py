@@ -0,0 +1,119 @@
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from src.models.extracted_text import ExtractedText
+from src.models.user import db
+from src.routes.analysis import is_gated, read_job_description, run_analysis
+from src.routes.batch import BATCH_CONCURRENCY, BATCH_PREFILTER_THRESHOLD
+from src.services.job_postings import prepare_job
+from src.services.llm_scheduler import current_tenant, llm_context
+from src.services.metrics import timed_stage
+from src.services.resume_index import IndexLoadingError, find_candidates, resume_index
+
+candidates_bp = Blueprint('candidates', __name__)
+
+# Candidate search configuration
+CANDIDATE_SEARCH_K = int(os.getenv('CANDIDATE_SEARCH_K', '20'))
+CANDIDATE_SEARCH_MAX_K = int(os.getenv('CANDIDATE_SEARCH_MAX_K', '200'))
+# The most candidates one search may send on to the AI analysis
+CANDIDATE_ANALYZE_MAX = int(os.getenv('CANDIDATE_ANALYZE_MAX', '25'))
+
+
+def read_k():
+    value = request.form.get('k')
+    if value is None:
+        return CANDIDATE_SEARCH_K
+    try:
+        k = int(value)
+    except ValueError:
+        k = 0
+    if not 1 <= k <= CANDIDATE_SEARCH_MAX_K:
+        raise ValueError(f'k must be between 1 and {CANDIDATE_SEARCH_MAX_K}')
+    return k
+
+
+@candidates_bp.route('/candidates/search', methods=['POST'])
+def search_candidates():
+    """Rank previously uploaded resumes for a job description
+
+    Takes a ``jobDescription`` or registered ``jobPostingId``, ``k`` and
+    ``analyze``. Candidates come from the local resume index in milliseconds,
+    without calling the AI. With ``analyze=true`` only the top k are sent on
+    to the full analysis and the response is NDJSON: a ``candidates`` line,
+    then a ``result`` or ``error`` line per candidate as it completes and a
+    ``summary`` line, as for batch screening.
+    """
+    job_description, prepared_job, error_response = read_job_description()
+    if error_response is not None:
+        return error_response
+    try:
+        k = read_k()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    analyze = request.form.get('analyze', 'false').lower() in ('1', 'true', 'yes')
+    if analyze and k > CANDIDATE_ANALYZE_MAX:
+        return jsonify({'error': f'At most {CANDIDATE_ANALYZE_MAX} candidates can be analyzed at once'}), 400
+
+    prepared_job = prepared_job or prepare_job(job_description)
+    job_query = prepared_job.query
+    started = time.perf_counter()
+    try:
+        with timed_stage('candidate_search'):
+            ranked = find_candidates(job_query, k)
+    except IndexLoadingError as e:
+        response = jsonify({'error': str(e), 'indexed': len(resume_index)})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    candidates = [{'resumeDigest': digest, 'score': score} for digest, score in ranked]
+
+    if not analyze:
+        return jsonify({'candidates': candidates, 'indexed': len(resume_index),
+                        'tookMs': round((time.perf_counter() - started) * 1000, 2)})
+
+    app = current_app._get_current_object()
+    tenant = current_tenant()
+
+    def analyze_one(digest):
+        with app.app_context(), llm_context('bulk', tenant):
+            entry = db.session.get(ExtractedText, digest)
+            if entry is None:
+                raise ValueError('Resume is no longer stored')
+            analysis_result, _ = run_analysis(entry.text, job_description,
+                                              prefilter_threshold=BATCH_PREFILTER_THRESHOLD,
+                                              prepared_job=prepared_job)
+            return analysis_result
+
+    def generate():
+        def line(payload):
+            return json.dumps(payload) + "\n"
+
+        yield line({'type': 'candidates', 'candidates': candidates})
+        ranking = []
+        failed = 0
+        with ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY) as pool:
+            pending = {pool.submit(analyze_one, candidate['resumeDigest']): candidate['resumeDigest']
+                       for candidate in candidates}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    digest = pending.pop(future)
+                    try:
+                        analysis_result = future.result()
+                    except Exception as e:
+                        failed += 1
+                        yield line({'type': 'error', 'resumeDigest': digest, 'error': str(e)})
+                        continue
+                    ranking.append({'resumeDigest': digest, 'matchScore': analysis_result.get('matchScore')})
+                    yield line({'type': 'result', 'resumeDigest': digest,
+                                'matchScore': analysis_result.get('matchScore'),
+                                'gated': is_gated(analysis_result), 'result': analysis_result})
+
+        ranking.sort(key=lambda item: item['matchScore'] or 0, reverse=True)
+        yield line({'type': 'summary', 'total': len(candidates), 'succeeded': len(ranking),
+                    'failed': failed, 'ranking': ranking})
+
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,192 @@
+import csv
+import io
+import json
+import os
+import zlib
+from datetime import datetime, timezone
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+from src.models.analysis_record import AnalysisRecord
+from src.models.job_posting import JobPosting
+from src.models.user import db
+from src.services.analysis_history import (
+    SORTS, SUMMARY_COLUMNS, history_query, search_available, sort_key, summarize
+)
+from src.services.pagination import decode_cursor, encode_cursor, read_page_size, stream_json_page
+
+history_bp = Blueprint('history', __name__)
+
+HISTORY_PAGE_SIZE = int(os.getenv('HISTORY_PAGE_SIZE', '50'))
+HISTORY_MAX_PAGE_SIZE = int(os.getenv('HISTORY_MAX_PAGE_SIZE', '500'))
+# Rows fetched from the database at a time while exporting
+EXPORT_FETCH_SIZE = 1000
+
+CSV_COLUMNS = ('id', 'createdAt', 'matchScore', 'source', 'resumeDigest', 'jobDigest',
+               'suitability', 'missingSkills', 'recommendations')
+
+
+class NotFoundError(Exception):
+    """Raised for a filter naming something that doesn't exist"""
+
+
+def read_score(name):
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        score = int(value)
+    except ValueError:
+        score = -1
+    if not 0 <= score <= 100:
+        raise ValueError(f'{name} must be an integer from 0 to 100')
+    return score
+
+
+def read_date(name):
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an ISO 8601 date or date and time')
+    # Times without an offset are UTC, as created_at is stored
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def read_filters():
+    """Parse the search and filter parameters shared by listing and export
+
+    Raises ValueError for an invalid parameter and NotFoundError for an
+    unknown jobPostingId.
+    """
+    filters = {
+        'min_score': read_score('minScore'),
+        'max_score': read_score('maxScore'),
+        'created_from': read_date('from'),
+        'created_to': read_date('to'),
+        'source': request.args.get('source'),
+        'job_digest': request.args.get('jobDigest'),
+        'resume_digest': request.args.get('resumeDigest'),
+        'search': request.args.get('q', '').strip() or None,
+    }
+    posting_id = request.args.get('jobPostingId')
+    if posting_id:
+        posting = db.session.get(JobPosting, posting_id)
+        if posting is None:
+            raise NotFoundError('Job posting not found')
+        filters['job_digest'] = posting.digest
+    if filters['search'] and not search_available():
+        raise ValueError('Full-text search is not available on this database')
+    return filters
+
+
+def read_after(value, sort):
+    """Return the keyset position a cursor points past, or None for the first page"""
+    if not value:
+        return None
+    cursor = decode_cursor(value)
+    size = 3 if sort == 'score' else 2
+    if len(cursor) != size or cursor[0] != sort or not all(type(part) is int for part in cursor[1:]):
+        raise ValueError('Invalid cursor for this sort order')
+    return cursor[1:]
+
+
+def read_sort():
+    sort = request.args.get('sort', 'newest')
+    if sort not in SORTS:
+        raise ValueError(f"sort must be one of {', '.join(SORTS)}")
+    return sort
+
+
+@history_bp.route('/analyses', methods=['GET'])
+def list_analyses():
+    """Search and filter past analyses, a page at a time, newest or best scoring first"""
+    try:
+        limit = read_page_size(request.args.get('limit'), HISTORY_PAGE_SIZE, HISTORY_MAX_PAGE_SIZE)
+        sort = read_sort()
+        after = read_after(request.args.get('after'), sort)
+        filters = read_filters()
+        query = history_query(SUMMARY_COLUMNS, filters, sort, after).limit(limit)
+    except NotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    last = {'key': None, 'count': 0}
+
+    def rows():
+        for row in query:
+            last['key'] = sort_key(row, sort)
+            last['count'] += 1
+            yield summarize(row)
+
+    def next_cursor():
+        return encode_cursor([sort] + last['key']) if last['count'] == limit else None
+
+    return Response(stream_with_context(stream_json_page('analyses', rows(), next_cursor)),
+                    mimetype='application/json')
+
+
+@history_bp.route('/analyses/<int:record_id>', methods=['GET'])
+def get_analysis(record_id):
+    record = AnalysisRecord.query.get_or_404(record_id)
+    return jsonify(dict(summarize(record), result=record.result))
+
+
+def csv_row(summary, result):
+    suitability = result.get('suitability') or {}
+    skill_gaps = result.get('skillGaps') or {}
+    return [summary['id'], summary['createdAt'], summary['matchScore'], summary['source'],
+            summary['resumeDigest'], summary['jobDigest'], suitability.get('overall', ''),
+            '; '.join(skill_gaps.get('missing') or []), '; '.join(result.get('recommendations') or [])]
+
+
+@history_bp.route('/analyses/export', methods=['GET'])
+def export_analyses():
+    """Stream every analysis matching the filters as CSV or NDJSON
+
+    Rows are fetched EXPORT_FETCH_SIZE at a time and written out as they
+    arrive, so memory use doesn't grow with the size of the export.
+    """
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+    try:
+        sort = read_sort()
+        query = history_query(SUMMARY_COLUMNS + (AnalysisRecord.result_compressed,), read_filters(), sort)
+    except NotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    rows = query.yield_per(EXPORT_FETCH_SIZE)
+
+    def generate_ndjson():
+        for row in rows:
+            # The stored result is already JSON, so it is spliced in rather than re-encoded
+            result = zlib.decompress(row.result_compressed).decode('utf-8')
+            yield json.dumps(summarize(row))[:-1] + ', "result": ' + result + "}\n"
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_COLUMNS)
+        for row in rows:
+            writer.writerow(csv_row(summarize(row), AnalysisRecord.decode_result(row.result_compressed)))
+            # Flushed every few KB rather than per row
+            if buffer.tell() > 16384:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    if export_format == 'csv':
+        response = Response(stream_with_context(generate_csv()), mimetype='text/csv')
+    else:
+        response = Response(stream_with_context(generate_ndjson()), mimetype='application/x-ndjson')
+    response.headers['Content-Disposition'] = f'attachment; filename=analyses.{export_format}'
+    return response
@@ -0,0 +1,37 @@
+from flask import Blueprint, jsonify, request
+from src.models.job_posting import JobPosting
+from src.routes.analysis import validate_job_description
+from src.services.job_postings import delete_job_posting, register_job_posting
+
+jobs_bp = Blueprint('jobs', __name__)
+
+@jobs_bp.route('/jobs', methods=['POST'])
+def create_job_posting():
+    """Register a job description once so analyses can reference it by id
+
+    Accepts JSON or form fields ``description`` and optional ``title``.
+    """
+    data = request.get_json(silent=True) or request.form
+    description = data.get('description')
+    if not isinstance(description, str):
+        return jsonify({'error': 'No job description provided'}), 400
+
+    job_description_error = validate_job_description(description)
+    if job_description_error:
+        return jsonify({'error': job_description_error}), 400
+
+    posting, created = register_job_posting(description, data.get('title'))
+    response = jsonify(posting.to_dict())
+    response.headers['Location'] = f"{request.path}/{posting.id}"
+    return response, 201 if created else 200
+
+@jobs_bp.route('/jobs/<posting_id>', methods=['GET'])
+def get_job_posting(posting_id):
+    posting = JobPosting.query.get_or_404(posting_id)
+    return jsonify(dict(posting.to_dict(), description=posting.description))
+
+@jobs_bp.route('/jobs/<posting_id>', methods=['DELETE'])
+def remove_job_posting(posting_id):
+    posting = JobPosting.query.get_or_404(posting_id)
+    delete_job_posting(posting)
+    return '', 204
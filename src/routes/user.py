@@ -1,22 +1,190 @@
-from flask import Blueprint, jsonify, request
+import importlib
+import os
+from flask import Blueprint, Response, jsonify, request, stream_with_context, url_for
+from sqlalchemy.exc import IntegrityError
 from src.models.user import User, db
+from src.services.pagination import decode_cursor, encode_cursor, read_page_size, stream_json_array
 
 user_bp = Blueprint('user', __name__)
 
+# User listing and bulk import limits
+USERS_PAGE_SIZE = int(os.getenv('USERS_PAGE_SIZE', '100'))
+USERS_MAX_PAGE_SIZE = int(os.getenv('USERS_MAX_PAGE_SIZE', '1000'))
+USERS_BULK_MAX = int(os.getenv('USERS_BULK_MAX', '10000'))
+USERS_BULK_BATCH_SIZE = int(os.getenv('USERS_BULK_BATCH_SIZE', '500'))
+
+USER_FIELDS = ('id', 'username', 'email')
+# Each is the primary key or unique (and so indexed), so one column is an exact keyset
+SORT_KEYS = ('id', 'username', 'email')
+
+def read_fields(value):
+    if not value:
+        return USER_FIELDS
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in USER_FIELDS]
+    if unknown or not fields:
+        raise ValueError(f"fields must be a comma-separated subset of {', '.join(USER_FIELDS)}")
+    return fields
+
+def read_after(value, sort):
+    """Return the sort key value a cursor points past, or None for the first page"""
+    if not value:
+        return None
+    cursor = decode_cursor(value)
+    expected_type = int if sort == 'id' else str
+    if len(cursor) != 2 or cursor[0] != sort or type(cursor[1]) is not expected_type:
+        raise ValueError('Invalid cursor for this sort order')
+    return cursor[1]
+
 @user_bp.route('/users', methods=['GET'])
 def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    """List users a page at a time
+
+    ?sort= orders by id (default), username or email; ?limit= sets the page
+    size; ?after= takes the previous page's X-Next-Cursor header; ?fields=
+    picks the returned fields. The body stays a JSON array of users. Pages
+    are found through the sort key's index, so any page costs the same, and
+    are streamed as they are read.
+    """
+    try:
+        limit = read_page_size(request.args.get('limit'), USERS_PAGE_SIZE, USERS_MAX_PAGE_SIZE)
+        sort = request.args.get('sort', 'id')
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+        fields = read_fields(request.args.get('fields'))
+        after = read_after(request.args.get('after'), sort)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    sort_column = getattr(User, sort)
+    page_filter = [sort_column > after] if after is not None else []
+    # The headers go out before the streamed rows, so read the page's last
+    # key first, from the index alone; a short page is the last one
+    last_key = db.session.query(sort_column).filter(*page_filter).order_by(sort_column) \
+        .offset(limit - 1).limit(1).scalar()
+
+    columns = [getattr(User, field) for field in fields]
+    query = db.session.query(*columns).filter(*page_filter).order_by(sort_column)
+    if last_key is not None:
+        # Rows inserted meanwhile wait for the next page rather than move its cursor
+        query = query.filter(sort_column <= last_key)
+    query = query.limit(limit)
+
+    def rows():
+        for row in query.yield_per(200):
+            yield dict(row._mapping)
+
+    response = Response(stream_with_context(stream_json_array(rows())), mimetype='application/json')
+    if last_key is not None:
+        cursor = encode_cursor([sort, last_key])
+        next_url = url_for('user.get_users', **{**request.args.to_dict(), 'after': cursor})
+        response.headers['X-Next-Cursor'] = cursor
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+    return response
 
 @user_bp.route('/users', methods=['POST'])
 def create_user():
-    
+
     data = request.json
     user = User(username=data['username'], email=data['email'])
     db.session.add(user)
     db.session.commit()
     return jsonify(user.to_dict()), 201
 
+def validate_user_fields(item):
+    """Return an error message for an invalid bulk user entry, else None"""
+    if not isinstance(item, dict):
+        return 'Expected an object with username and email'
+    for field, max_length in (('username', 80), ('email', 120)):
+        value = item.get(field)
+        if not isinstance(value, str) or not value.strip():
+            return f'{field} is required'
+        if len(value) > max_length:
+            return f'{field} must be at most {max_length} characters'
+    return None
+
+def upsert_users(rows):
+    """Insert rows, or update the email of existing usernames, in one transaction
+
+    Returns (created, updated). Raises IntegrityError (after which the
+    session must be rolled back) if an email belongs to another user.
+    """
+    usernames = [row['username'] for row in rows]
+    existing = {username for (username,) in
+                db.session.query(User.username).filter(User.username.in_(usernames))}
+
+    dialect = db.engine.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        # Only the dialect in use is imported
+        insert = importlib.import_module(f'sqlalchemy.dialects.{dialect}').insert
+        statement = insert(User).values(rows)
+        statement = statement.on_conflict_do_update(index_elements=[User.username],
+                                                    set_={'email': statement.excluded.email})
+        db.session.execute(statement)
+    else:
+        users = {user.username: user for user in User.query.filter(User.username.in_(usernames))}
+        for row in rows:
+            user = users.get(row['username'])
+            if user is None:
+                db.session.add(User(**row))
+            else:
+                user.email = row['email']
+    db.session.commit()
+    return len(rows) - len(existing), len(existing)
+
+@user_bp.route('/users/bulk', methods=['POST'])
+def bulk_upsert_users():
+    """Create or update many users by username in batched transactions
+
+    Takes a JSON array (or {"users": [...]}) of {"username", "email"}.
+    Every USERS_BULK_BATCH_SIZE rows commit together; a batch that hits a
+    constraint (an email already used by another user) is retried row by
+    row, so only the offending rows fail.
+    """
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('users')
+    if not isinstance(data, list):
+        return jsonify({'error': 'Expected a JSON array of users'}), 400
+    if len(data) > USERS_BULK_MAX:
+        return jsonify({'error': f'At most {USERS_BULK_MAX} users may be sent at once'}), 413
+
+    failed = []
+    valid = []
+    seen = set()
+    for index, item in enumerate(data):
+        error = validate_user_fields(item)
+        if error is None and item['username'] in seen:
+            error = 'Duplicate username in this request'
+        if error is not None:
+            failed.append({'index': index, 'error': error})
+            continue
+        seen.add(item['username'])
+        valid.append((index, {'username': item['username'], 'email': item['email']}))
+
+    created = updated = 0
+    for start in range(0, len(valid), USERS_BULK_BATCH_SIZE):
+        batch = valid[start:start + USERS_BULK_BATCH_SIZE]
+        try:
+            batch_created, batch_updated = upsert_users([row for _, row in batch])
+        except IntegrityError:
+            db.session.rollback()
+            batch_created = batch_updated = 0
+            for index, row in batch:
+                try:
+                    row_created, row_updated = upsert_users([row])
+                except IntegrityError:
+                    db.session.rollback()
+                    failed.append({'index': index, 'error': 'email is already used by another user'})
+                    continue
+                batch_created += row_created
+                batch_updated += row_updated
+        created += batch_created
+        updated += batch_updated
+
+    failed.sort(key=lambda failure: failure['index'])
+    return jsonify({'created': created, 'updated': updated, 'failed': failed})
+
 @user_bp.route('/users/<int:user_id>', methods=['GET'])
 def get_user(user_id):
     user = User.query.get_or_404(user_id)
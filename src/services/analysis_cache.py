@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import re
+import time
+import unicodedata
+
+from sqlalchemy.exc import IntegrityError
+
+from src.models.analysis_cache import AnalysisCacheEntry
+from src.models.user import db
+from src.services.lru_cache import LRUCache
+
+# Cache configuration
+ANALYSIS_CACHE_SIZE = int(os.getenv('ANALYSIS_CACHE_SIZE', '256'))
+ANALYSIS_CACHE_TTL = int(os.getenv('ANALYSIS_CACHE_TTL', str(7 * 24 * 3600)))
+ANALYSIS_CACHE_MAX_ROWS = int(os.getenv('ANALYSIS_CACHE_MAX_ROWS', '10000'))
+
+_memory_cache = LRUCache(max_size=ANALYSIS_CACHE_SIZE, ttl=ANALYSIS_CACHE_TTL)
+
+
+def normalize_text(text):
+    """Normalize text so cosmetic whitespace/unicode differences share a cache key"""
+    text = unicodedata.normalize('NFKC', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def make_cache_key(resume_text, job_description, model, prompt_version, normalized_job_description=None):
+    """Build a content-addressed key for an analysis request
+
+    normalized_job_description, when the caller already has it (a registered
+    job posting stores it), saves normalizing the description again.
+    """
+    if normalized_job_description is None:
+        normalized_job_description = normalize_text(job_description)
+    digest = hashlib.sha256()
+    for part in (normalize_text(resume_text), normalized_job_description, model, prompt_version):
+        encoded = part.encode('utf-8')
+        # Length-prefix each part so field boundaries can't collide
+        digest.update(len(encoded).to_bytes(8, 'big'))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+def get_cached_analysis(key):
+    """Look up an analysis result, checking memory first and then the database"""
+    result = _memory_cache.get(key)
+    if result is not None:
+        return result
+
+    entry = db.session.get(AnalysisCacheEntry, key)
+    if entry is None:
+        return None
+
+    now = time.time()
+    if now - entry.created_at > ANALYSIS_CACHE_TTL:
+        db.session.delete(entry)
+        db.session.commit()
+        return None
+
+    entry.last_accessed_at = now
+    db.session.commit()
+    result = json.loads(entry.result)
+    # Expire from memory when the row would, not a full TTL after this read
+    _memory_cache.set(key, result, stored_at=entry.created_at)
+    return result
+
+
+def store_analysis(key, result):
+    """Store an analysis result in both cache tiers"""
+    _memory_cache.set(key, result)
+
+    now = time.time()
+    entry = db.session.get(AnalysisCacheEntry, key)
+    if entry is None:
+        entry = AnalysisCacheEntry(key=key, created_at=now, last_accessed_at=now, result='')
+        db.session.add(entry)
+    entry.result = json.dumps(result)
+    entry.created_at = now
+    entry.last_accessed_at = now
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent identical analysis stored its result first
+        db.session.rollback()
+        return
+    prune_analysis_cache()
+
+
+def prune_analysis_cache():
+    """Drop expired rows and trim the table to ANALYSIS_CACHE_MAX_ROWS"""
+    AnalysisCacheEntry.query.filter(
+        AnalysisCacheEntry.created_at < time.time() - ANALYSIS_CACHE_TTL
+    ).delete(synchronize_session=False)
+
+    excess = AnalysisCacheEntry.query.count() - ANALYSIS_CACHE_MAX_ROWS
+    if excess > 0:
+        stale_keys = db.session.query(AnalysisCacheEntry.key).order_by(
+            AnalysisCacheEntry.last_accessed_at.asc()
+        ).limit(excess).subquery()
+        AnalysisCacheEntry.query.filter(
+            AnalysisCacheEntry.key.in_(db.select(stale_keys.c.key))
+        ).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def clear_memory_cache():
+    _memory_cache.clear()
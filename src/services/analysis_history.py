@@ -0,0 +1,177 @@
+import hashlib
+import os
+import re
+
+from sqlalchemy import column, false, literal_column, table, text, tuple_
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+
+from src.models.analysis_record import AnalysisRecord
+from src.models.user import db
+from src.services.analysis_cache import normalize_text
+
+# Record every finished analysis for /api/analyses
+ANALYSIS_HISTORY_ENABLED = os.getenv('ANALYSIS_HISTORY_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+SEARCH_TABLE = 'analysis_record_fts'
+SORTS = ('newest', 'score')
+SUMMARY_COLUMNS = (AnalysisRecord.id, AnalysisRecord.created_at, AnalysisRecord.match_score,
+                   AnalysisRecord.source, AnalysisRecord.resume_digest, AnalysisRecord.job_digest)
+
+_search_table = table(SEARCH_TABLE, column('rowid'))
+# None until checked; a missing table is looked for again, in case init-db runs later
+_search_available = None
+
+
+def create_search_index():
+    """Create the SQLite FTS5 index over resume text and recommendations
+
+    The index is contentless: it stores the terms, not another copy of every
+    resume. Returns whether full-text search is available.
+    """
+    global _search_available
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+                "resume_text, recommendations, content='', tokenize='porter unicode61')"))
+    except OperationalError as e:
+        print(f"Full-text search is unavailable: {str(e)}")
+        return False
+    _search_available = True
+    return True
+
+
+def search_available():
+    """Whether the full-text index exists; must run inside an app context
+
+    init-db creates it, so a worker finds it with one catalog lookup on first use.
+    """
+    global _search_available
+    if _search_available is None:
+        if db.engine.dialect.name != 'sqlite':
+            _search_available = False
+            return False
+        try:
+            with db.engine.connect() as connection:
+                found = connection.execute(text("SELECT 1 FROM sqlite_master WHERE name = :name"),
+                                           {'name': SEARCH_TABLE}).first() is not None
+        except SQLAlchemyError:
+            return False
+        if not found:
+            return False
+        _search_available = True
+    return _search_available
+
+
+def digest_text(value):
+    """SHA-256 of normalized text; for a job description it equals JobPosting.digest"""
+    return hashlib.sha256(normalize_text(value).encode('utf-8')).hexdigest()
+
+
+def record_analysis(resume_text, job_description, analysis_result, source, job_digest=None):
+    """Add a finished analysis to the history and search index
+
+    job_digest is digest_text(job_description) when the caller already has
+    it, as a registered job posting does. Returns the record id, or None if
+    the history is disabled or the write failed; a failure is logged rather
+    than failing the analysis.
+    """
+    if not ANALYSIS_HISTORY_ENABLED:
+        return None
+    try:
+        record = AnalysisRecord(resume_digest=digest_text(resume_text),
+                                job_digest=job_digest or digest_text(job_description),
+                                match_score=int(analysis_result.get('matchScore') or 0), source=source)
+        record.result = analysis_result
+        db.session.add(record)
+        db.session.flush()
+        if search_available():
+            db.session.execute(
+                text(f"INSERT INTO {SEARCH_TABLE}(rowid, resume_text, recommendations) VALUES (:id, :resume, :recommendations)"),
+                {'id': record.id, 'resume': resume_text,
+                 'recommendations': '\n'.join(analysis_result.get('recommendations') or [])})
+        db.session.commit()
+        return record.id
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        print(f"Analysis history error: {str(e)}")
+        return None
+
+
+def build_search_query(value):
+    """Turn free text into an FTS5 query matching every word (word* matches a prefix)
+
+    Words are quoted, so FTS5 operators and punctuation in the input are
+    matched literally instead of raising syntax errors.
+    """
+    terms = re.findall(r'\w+\*?', value)
+    if not terms:
+        raise ValueError('Search text must contain at least one word')
+    return ' '.join(f'"{term.rstrip("*")}"' + ('*' if term.endswith('*') else '') for term in terms)
+
+
+def _first_id_created_since(moment):
+    return db.session.query(AnalysisRecord.id).filter(AnalysisRecord.created_at >= moment).order_by(
+        AnalysisRecord.created_at, AnalysisRecord.id).limit(1).scalar()
+
+
+def history_query(columns, filters, sort='newest', after=None):
+    """Query records matching filters in sort order, starting after a keyset position
+
+    filters may hold min_score, max_score, created_from, created_to, source,
+    job_digest, resume_digest and search (free text). after is the sort key
+    of the previous page's last row: (id,) for newest, (match_score, id) for
+    score.
+    """
+    query = db.session.query(*columns)
+    id_column = AnalysisRecord.id
+    if filters.get('search'):
+        # Joined so the full-text index drives the scan, in rowid order, and
+        # a page stops after its last match
+        id_column = _search_table.c.rowid
+        query = query.join(_search_table, _search_table.c.rowid == AnalysisRecord.id).filter(
+            literal_column(SEARCH_TABLE).op('MATCH')(build_search_query(filters['search'])))
+
+    # Ids increase with created_at, so a date range is an id range; finding
+    # its ends takes two index lookups, and pages then walk the primary key
+    if filters.get('created_from') is not None:
+        low = _first_id_created_since(filters['created_from'])
+        query = query.filter(false() if low is None else id_column >= low)
+    if filters.get('created_to') is not None:
+        high = _first_id_created_since(filters['created_to'])
+        if high is not None:
+            query = query.filter(id_column < high)
+
+    if filters.get('min_score') is not None:
+        query = query.filter(AnalysisRecord.match_score >= filters['min_score'])
+    if filters.get('max_score') is not None:
+        query = query.filter(AnalysisRecord.match_score <= filters['max_score'])
+    for name in ('source', 'job_digest', 'resume_digest'):
+        if filters.get(name):
+            query = query.filter(getattr(AnalysisRecord, name) == filters[name])
+
+    if sort == 'score':
+        if after is not None:
+            query = query.filter(tuple_(AnalysisRecord.match_score, AnalysisRecord.id) < tuple_(*after))
+        return query.order_by(AnalysisRecord.match_score.desc(), AnalysisRecord.id.desc())
+    if after is not None:
+        query = query.filter(id_column < after[0])
+    return query.order_by(id_column.desc())
+
+
+def sort_key(row, sort):
+    """The keyset position of a row, for the next page's cursor"""
+    return [row.match_score, row.id] if sort == 'score' else [row.id]
+
+
+def summarize(row):
+    return {
+        'id': row.id,
+        'createdAt': row.created_at.isoformat(),
+        'matchScore': row.match_score,
+        'source': row.source,
+        'resumeDigest': row.resume_digest,
+        'jobDigest': row.job_digest
+    }
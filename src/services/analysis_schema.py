@@ -0,0 +1,99 @@
+import re
+
+# Top-level fields of an analysis result, in the order the prompt asks for them
+ASSESSMENT_FIELDS = ('matchScore', 'suitability', 'skillGaps', 'recommendations')
+ANALYSIS_FIELDS = ASSESSMENT_FIELDS + ('optimizedResume',)
+
+NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def _string(value):
+    if isinstance(value, str) and value.strip():
+        return value.strip()
+    return None
+
+
+def _string_list(value):
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return None
+    items = [item.strip() for item in value if isinstance(item, str) and item.strip()]
+    return items or None
+
+
+def _match_score(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        # "82", "82%", "82/100"
+        number = NUMBER_PATTERN.search(value)
+        if not number:
+            return None
+        value = float(number.group())
+    if not isinstance(value, (int, float)):
+        return None
+    if isinstance(value, float) and 0 < value < 1:
+        # A 0-1 fraction
+        value *= 100
+    return int(round(min(100, max(0, value))))
+
+
+def _object(required, lists):
+    """Validator for an object with required string members and optional string lists"""
+    def validate(value):
+        if not isinstance(value, dict):
+            return None
+        result = {}
+        for name in required:
+            member = _string(value.get(name))
+            if member is None:
+                return None
+            result[name] = member
+        for name in lists:
+            result[name] = _string_list(value.get(name)) or []
+        if not required and not any(result.values()):
+            return None
+        return result
+    return validate
+
+
+FIELD_VALIDATORS = {
+    'matchScore': _match_score,
+    'suitability': _object(required=('overall',), lists=('strengths', 'concerns')),
+    'skillGaps': _object(required=(), lists=('missing', 'weak')),
+    'recommendations': _string_list,
+    'optimizedResume': _string,
+}
+
+
+def validate_field(key, value):
+    """Return the normalized value of an analysis field, or None if it is unusable"""
+    validator = FIELD_VALIDATORS.get(key)
+    if validator is None:
+        return None
+    return validator(value)
+
+
+def validate_analysis(fields, expected_fields=ANALYSIS_FIELDS):
+    """Validate parsed fields against the analysis schema
+
+    Returns (valid_fields, missing_fields). If none of the expected fields
+    are at the top level, a single nested object that holds them (e.g.
+    {"analysis": {...}}) is used instead.
+    """
+    if not any(key in fields for key in expected_fields):
+        for value in fields.values():
+            if isinstance(value, dict) and any(key in value for key in expected_fields):
+                fields = value
+                break
+
+    valid = {}
+    missing = []
+    for key in expected_fields:
+        value = validate_field(key, fields.get(key))
+        if value is None:
+            missing.append(key)
+        else:
+            valid[key] = value
+    return valid, missing
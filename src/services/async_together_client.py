@@ -0,0 +1,123 @@
+import asyncio
+import os
+import random
+import threading
+import time
+
+from src.services.llm_scheduler import QueueDeadlineError, llm_scheduler
+from src.services.metrics import UPSTREAM_SHORT_CIRCUITED, record_upstream
+from src.services.together_client import (
+    RETRYABLE_STATUS_CODES, TOGETHER_BACKOFF_BASE, TOGETHER_BACKOFF_MAX, TOGETHER_CONNECT_TIMEOUT,
+    TOGETHER_MAX_RETRIES, TOGETHER_READ_TIMEOUT, CircuitOpenError, TogetherAPIError, estimate_request_tokens,
+    parse_retry_after, shed_error, together_client, usage_tokens
+)
+
+# The async client holds many more idle connections than the thread-bound sync pool
+TOGETHER_ASYNC_POOL_SIZE = int(os.getenv('TOGETHER_ASYNC_POOL_SIZE', '256'))
+
+
+class AsyncTogetherClient:
+    """Pooled asyncio HTTP client for the Together AI API
+
+    Mirrors TogetherClient.post (retries, backoff, Retry-After) and shares
+    its circuit breaker and the scheduler's rate limits, so sync and async
+    traffic see the same upstream health and budget. The httpx client is
+    created (and httpx imported) on first use, bound to that event loop.
+    """
+
+    def __init__(self, pool_size=TOGETHER_ASYNC_POOL_SIZE, max_retries=TOGETHER_MAX_RETRIES,
+                 breaker=together_client.breaker):
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.breaker = breaker
+        self._client = None
+        self._counters = {'requests': 0, 'retries': 0, 'failures': 0, 'short_circuited': 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _get_client(self):
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+                timeout=httpx.Timeout(TOGETHER_READ_TIMEOUT, connect=TOGETHER_CONNECT_TIMEOUT)
+            )
+        return self._client
+
+    async def post_json(self, url, headers, payload):
+        """POST a JSON payload and return the decoded JSON response
+
+        Raises TogetherAPIError (or CircuitOpenError) like TogetherClient.post.
+        """
+        import httpx
+        attempt = 0
+        estimated_tokens = estimate_request_tokens(payload)
+        while True:
+            try:
+                ticket = await llm_scheduler.acquire_async(estimated_tokens)
+            except QueueDeadlineError as e:
+                raise shed_error(e)
+
+            if not self.breaker.allow_request():
+                ticket.cancel()
+                self._count('short_circuited')
+                UPSTREAM_SHORT_CIRCUITED.inc()
+                raise CircuitOpenError("API request failed: circuit breaker is open",
+                                       retry_after=self.breaker.reset_timeout)
+
+            self._count('requests')
+            response = None
+            started = time.perf_counter()
+            try:
+                response = await self._get_client().post(url, headers=headers, json=payload)
+                response.raise_for_status()
+                record_upstream(response.status_code, time.perf_counter() - started)
+                self.breaker.record_success()
+                result = response.json()
+                actual_tokens = usage_tokens(result)
+                if actual_tokens is not None:
+                    ticket.settle(actual_tokens)
+                return result
+            except (httpx.HTTPError, ValueError) as e:
+                status_code = response.status_code if response is not None else None
+                record_upstream(status_code, time.perf_counter() - started)
+                retry_after = parse_retry_after(response)
+
+                self.breaker.record_error(status_code, isinstance(
+                    e, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)))
+
+                retryable = status_code is None or status_code in RETRYABLE_STATUS_CODES
+                if not retryable or attempt >= self.max_retries:
+                    self._count('failures')
+                    raise TogetherAPIError(f"API request failed: {str(e)}", status_code=status_code,
+                                           retry_after=retry_after)
+            finally:
+                # Cancellation included, a half-open trial must not stay taken
+                self.breaker.release_trial()
+
+            delay = retry_after
+            if delay is None:
+                delay = TOGETHER_BACKOFF_BASE * (2 ** attempt) * random.uniform(0.5, 1.5)
+            attempt += 1
+            self._count('retries')
+            if status_code == 429:
+                llm_scheduler.pause(min(delay, TOGETHER_BACKOFF_MAX))
+            else:
+                await asyncio.sleep(min(delay, TOGETHER_BACKOFF_MAX))
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        counters['circuit_state'] = self.breaker.state
+        return counters
+
+
+async_together_client = AsyncTogetherClient()
@@ -0,0 +1,158 @@
+import io
+import os
+
+from werkzeug.datastructures import FileStorage
+from werkzeug.utils import secure_filename
+
+# Extraction limits for pathological uploads
+MAX_PDF_PAGES = int(os.getenv('MAX_PDF_PAGES', '50'))
+MAX_EXTRACTED_CHARS = int(os.getenv('MAX_EXTRACTED_CHARS', '200000'))
+# PDFs with more pages than this are rejected before any text is extracted
+MAX_UPLOAD_PAGES = int(os.getenv('MAX_UPLOAD_PAGES', '200'))
+
+# WordprocessingML tags, as docx.oxml.ns.qn spells them
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+W_P, W_TBL, W_TR, W_TC = W_NS + 'p', W_NS + 'tbl', W_NS + 'tr', W_NS + 'tc'
+W_T, W_TAB, W_BR, W_CR = W_NS + 't', W_NS + 'tab', W_NS + 'br', W_NS + 'cr'
+
+
+class DocumentRejectedError(Exception):
+    """Raised when a document is refused before its text is extracted"""
+
+
+def extract_text_from_file(file, stats=None, file_type=None):
+    """Extract text from uploaded file based on its type
+
+    file_type (as sniffed from the content) overrides the filename's
+    extension. If a stats dict is given, document details found while
+    parsing (the PDF page count) are stored in it.
+    """
+    file_ext = file_type or secure_filename(file.filename).rsplit('.', 1)[1].lower()
+
+    try:
+        if file_ext == 'pdf':
+            return extract_text_from_pdf(file.stream, stats)
+        elif file_ext == 'docx':
+            return extract_text_from_docx(file.stream)
+        elif file_ext == 'txt':
+            return file.stream.read().decode('utf-8')[:MAX_EXTRACTED_CHARS]
+        else:
+            raise ValueError(f"Unsupported file type: {file_ext}")
+    except DocumentRejectedError:
+        raise
+    except Exception as e:
+        raise Exception(f"Error extracting text from {file_ext} file: {str(e)}")
+
+
+def extract_text_from_upload(filename, data):
+    """Extract text from raw upload bytes (picklable entry point for worker processes)"""
+    return extract_text_from_file(FileStorage(stream=io.BytesIO(data), filename=filename))
+
+
+def extract_upload_with_stats(filename, data, file_type=None):
+    """Like extract_text_from_upload, but returns (text, stats) for the upload metrics"""
+    stats = {}
+    text = extract_text_from_file(FileStorage(stream=io.BytesIO(data), filename=filename), stats, file_type)
+    return text, stats
+
+
+def extract_text_from_pdf(stream, stats=None):
+    """Extract text from a PDF stream, stopping at MAX_PDF_PAGES or MAX_EXTRACTED_CHARS"""
+    # Imported on the first PDF, so processes that never parse one skip it
+    import PyPDF2
+    try:
+        pdf_reader = PyPDF2.PdfReader(stream)
+        page_count = len(pdf_reader.pages)
+        if stats is not None:
+            stats['pages'] = page_count
+        if page_count > MAX_UPLOAD_PAGES:
+            raise DocumentRejectedError(
+                f"Resume has {page_count} pages; at most {MAX_UPLOAD_PAGES} are accepted.")
+        parts = []
+        total_chars = 0
+        for page_number, page in enumerate(pdf_reader.pages):
+            if page_number >= MAX_PDF_PAGES or total_chars >= MAX_EXTRACTED_CHARS:
+                break
+            page_text = page.extract_text() or ''
+            parts.append(page_text)
+            total_chars += len(page_text)
+        return '\n'.join(parts).strip()[:MAX_EXTRACTED_CHARS]
+    except DocumentRejectedError:
+        raise
+    except Exception as e:
+        raise Exception(f"Error reading PDF: {str(e)}")
+
+
+def extract_text_from_docx(stream):
+    """Extract text from a DOCX stream: body paragraphs, tables, headers and footers"""
+    # Imported on the first DOCX: python-docx and lxml are the slowest imports at startup
+    import docx
+    try:
+        document = docx.Document(stream)
+        lines = []
+
+        # Headers and footers usually repeat across sections, so keep each once
+        seen_header_lines = set()
+        for section in document.sections:
+            for part in (section.header, section.footer):
+                if part.is_linked_to_previous:
+                    continue
+                for line in _iter_block_lines(part._element):
+                    if line not in seen_header_lines:
+                        seen_header_lines.add(line)
+                        lines.append(line)
+
+        total_chars = 0
+        for line in _iter_block_lines(document.element.body):
+            lines.append(line)
+            total_chars += len(line)
+            if total_chars >= MAX_EXTRACTED_CHARS:
+                break
+        return '\n'.join(lines).strip()[:MAX_EXTRACTED_CHARS]
+    except Exception as e:
+        raise Exception(f"Error reading DOCX: {str(e)}")
+
+
+def _paragraph_text(paragraph):
+    """Text of a w:p element, read straight from the XML without per-run xpath queries"""
+    parts = []
+    for node in paragraph.iter(W_T, W_TAB, W_BR, W_CR):
+        if node.tag == W_T:
+            parts.append(node.text or '')
+        elif node.tag == W_TAB:
+            parts.append('\t')
+        else:
+            parts.append('\n')
+    return ''.join(parts)
+
+
+def _iter_block_lines(container):
+    """Yield text lines from the paragraphs and tables of a block container in document order"""
+    for child in container.iterchildren(W_P, W_TBL):
+        if child.tag == W_TBL:
+            yield from _iter_table_lines(child)
+        else:
+            text = _paragraph_text(child)
+            if text:
+                yield text
+
+
+def _iter_table_lines(table):
+    """Yield one line per table row, with nested tables flattened after it"""
+    for row in table.iterchildren(W_TR):
+        cells = []
+        nested_lines = []
+        for cell in row.iterchildren(W_TC):
+            cell_lines = []
+            for child in cell.iterchildren(W_P, W_TBL):
+                if child.tag == W_TBL:
+                    nested_lines.extend(_iter_table_lines(child))
+                else:
+                    text = _paragraph_text(child)
+                    if text:
+                        cell_lines.append(text)
+            if cell_lines:
+                cells.append(' '.join(cell_lines))
+        if cells:
+            yield ' | '.join(cells)
+        yield from nested_lines
@@ -0,0 +1,105 @@
+import os
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from src.services.extraction import extract_upload_with_stats
+from src.services.metrics import UPLOAD_PAGES
+
+# Extraction worker configuration (EXTRACTION_WORKERS=0 extracts in the request thread)
+EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', str(min(4, os.cpu_count() or 1))))
+EXTRACTION_TIMEOUT = float(os.getenv('EXTRACTION_TIMEOUT', '20'))
+
+
+def _reset_worker_signals():
+    """Drop signal handlers inherited from the server process
+
+    A worker forked after uvicorn starts would otherwise run uvicorn's
+    SIGTERM handler, which only flags the (absent) server loop to stop.
+    """
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    # Ctrl+C reaches the whole process group; let the server shut the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class ExtractionTimeoutError(Exception):
+    """Raised when a file takes longer than EXTRACTION_TIMEOUT to parse"""
+
+
+class ExtractionExecutor:
+    """Runs CPU-bound text extraction in worker processes with a per-file timeout
+
+    Parsing in a separate process keeps large PDFs from holding the GIL in
+    the web worker. At most one file per worker is submitted at a time, the
+    rest wait for a free worker in the calling thread, so the timeout covers
+    parsing only and never time spent queued. A file that exceeds it has its
+    worker killed: the whole pool is torn down and rebuilt, and any other
+    extraction caught in the teardown is retried once on the fresh pool.
+    """
+
+    def __init__(self, max_workers=EXTRACTION_WORKERS, timeout=EXTRACTION_TIMEOUT):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._pool = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(1, max_workers))
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_reset_worker_signals)
+            return self._pool
+
+    def _kill_pool(self, pool):
+        with self._lock:
+            if self._pool is not pool:
+                # Another thread already replaced it
+                return
+            self._pool = None
+        for process in list((pool._processes or {}).values()):
+            process.kill()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def extract(self, filename, data, file_type=None):
+        """Extract text from raw upload bytes, raising ExtractionTimeoutError on timeout"""
+        text, stats = self._extract(filename, data, file_type)
+        if 'pages' in stats:
+            UPLOAD_PAGES.observe(stats['pages'])
+        return text
+
+    def _extract(self, filename, data, file_type):
+        if self.max_workers <= 0:
+            return extract_upload_with_stats(filename, data, file_type)
+
+        with self._slots:
+            return self._extract_in_pool(filename, data, file_type)
+
+    def _extract_in_pool(self, filename, data, file_type):
+        # Holding a slot, the submitted file starts on an idle worker right away
+        for attempt in range(2):
+            pool = self._get_pool()
+            try:
+                try:
+                    future = pool.submit(extract_upload_with_stats, filename, data, file_type)
+                except RuntimeError:
+                    # The pool was shut down by a concurrent timeout; treat it as broken
+                    raise BrokenProcessPool("Extraction pool was shut down")
+                return future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                self._kill_pool(pool)
+                raise ExtractionTimeoutError(
+                    f"Processing {filename} took longer than {self.timeout:g} seconds")
+            except BrokenProcessPool:
+                self._kill_pool(pool)
+                if attempt == 1:
+                    raise Exception(f"Extraction worker crashed while processing {filename}")
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+extraction_executor = ExtractionExecutor()
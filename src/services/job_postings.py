@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import uuid
+
+from sqlalchemy.exc import IntegrityError
+
+from src.models.job_posting import JobPosting
+from src.models.user import db
+from src.services.analysis_cache import normalize_text
+from src.services.lru_cache import LRUCache
+from src.services.prompt_budget import PROMPT_JOB_TOKENS, compact_job_description, fit_to_budget
+from src.services.scoring import SKILL_WEIGHT, JobQuery, get_scoring_engine
+
+# Prepared job descriptions kept in memory, by description text and by posting id
+JOB_CACHE_SIZE = int(os.getenv('JOB_CACHE_SIZE', '256'))
+
+# Bump whenever compile_job or compact_job_description change; stored postings
+# with another version are reprocessed when next used
+PREPROCESS_VERSION = f"1:{PROMPT_JOB_TOKENS}:{SKILL_WEIGHT}"
+
+
+class PreparedJob:
+    """Everything about a job description that doesn't depend on the resume"""
+
+    __slots__ = ('description', 'normalized_text', 'query', 'prompt_fragment', 'digest')
+
+    def __init__(self, description, normalized_text, query, prompt_fragment, digest=None):
+        self.description = description
+        self.normalized_text = normalized_text
+        self.query = query
+        self.prompt_fragment = prompt_fragment
+        # SHA-256 of normalized_text; a stored posting passes the one it was saved with
+        self.digest = digest or hashlib.sha256(normalized_text.encode('utf-8')).hexdigest()
+
+
+_by_description = LRUCache(max_size=JOB_CACHE_SIZE)
+_by_id = LRUCache(max_size=JOB_CACHE_SIZE)
+
+
+def preprocess_job(description):
+    """Normalize, compile and compact a job description"""
+    return PreparedJob(
+        description,
+        normalize_text(description),
+        get_scoring_engine().compile_job(description),
+        fit_to_budget(compact_job_description(description), PROMPT_JOB_TOKENS)
+    )
+
+
+def prepare_job(description):
+    """Return the PreparedJob for a job description, preprocessing it on first use"""
+    job = _by_description.get(description)
+    if job is None:
+        job = preprocess_job(description)
+        _by_description.set(description, job)
+    return job
+
+
+def _apply(posting, job):
+    posting.normalized_text = job.normalized_text
+    posting.job_query = json.dumps(job.query.to_dict())
+    posting.prompt_fragment = job.prompt_fragment
+    posting.preprocess_version = PREPROCESS_VERSION
+
+
+def register_job_posting(description, title=None):
+    """Store a job description with its preprocessing
+
+    Returns (posting, created); registering a description that normalizes to
+    an already registered one returns the existing posting.
+    """
+    job = prepare_job(description)
+    digest = job.digest
+    posting = JobPosting.query.filter_by(digest=digest).first()
+    if posting is not None:
+        return posting, False
+
+    posting = JobPosting(id=str(uuid.uuid4()), title=title, description=description, digest=digest)
+    _apply(posting, job)
+    db.session.add(posting)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Registered concurrently by another request
+        db.session.rollback()
+        return JobPosting.query.filter_by(digest=digest).one(), False
+    _by_id.set(posting.id, job)
+    return posting, True
+
+
+def get_prepared_job(posting_id):
+    """Return the PreparedJob of a registered posting, or None if there is none"""
+    job = _by_id.get(posting_id)
+    if job is not None:
+        return job
+
+    posting = db.session.get(JobPosting, posting_id)
+    if posting is None:
+        return None
+    if posting.preprocess_version == PREPROCESS_VERSION:
+        job = PreparedJob(posting.description, posting.normalized_text,
+                          JobQuery.from_dict(json.loads(posting.job_query)), posting.prompt_fragment,
+                          posting.digest)
+    else:
+        job = preprocess_job(posting.description)
+        _apply(posting, job)
+        db.session.commit()
+    _by_id.set(posting_id, job)
+    _by_description.set(posting.description, job)
+    return job
+
+
+def delete_job_posting(posting):
+    db.session.delete(posting)
+    db.session.commit()
+    _by_id.delete(posting.id)
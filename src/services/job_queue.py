@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from src.models.analysis_job import AnalysisJob, utcnow
+from src.models.user import db
+from src.services.llm_scheduler import current_tenant, llm_context
+
+# Background worker configuration
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', '4'))
+ANALYSIS_QUEUE_LIMIT = int(os.getenv('ANALYSIS_QUEUE_LIMIT', '100'))
+# A queued or running job untouched this long was lost with the process running it
+ANALYSIS_JOB_STALE_SECONDS = int(os.getenv('ANALYSIS_JOB_STALE_SECONDS', '900'))
+# Jobs are deleted this long after their last update, finished or not
+ANALYSIS_JOB_RETENTION_SECONDS = int(os.getenv('ANALYSIS_JOB_RETENTION_SECONDS', str(24 * 3600)))
+
+ORPHANED_JOB_ERROR = 'The analysis was interrupted. Please try again.'
+
+_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix='analysis-job')
+_slots = threading.BoundedSemaphore(ANALYSIS_QUEUE_LIMIT)
+# Ids of the jobs this process's executor holds, queued or running; never expired here
+_held_jobs = set()
+_held_lock = threading.Lock()
+
+
+class QueueFullError(Exception):
+    """Raised when the analysis queue has no room for another job"""
+
+
+def submit_analysis_job(app, resume_text, job_description, runner):
+    """Persist a new job and schedule runner(resume_text, job_description) for it
+    
+    runner must return the analysis result dict. Returns the created job.
+    """
+    if not _slots.acquire(blocking=False):
+        raise QueueFullError("Analysis queue is full")
+
+    job_id = str(uuid.uuid4())
+    try:
+        job = AnalysisJob(id=job_id, status='queued', resume_text=resume_text, job_description=job_description)
+        db.session.add(job)
+        db.session.commit()
+        with _held_lock:
+            _held_jobs.add(job_id)
+        _executor.submit(_run_job, app, job_id, runner, current_tenant())
+    except Exception:
+        with _held_lock:
+            _held_jobs.discard(job_id)
+        _slots.release()
+        raise
+    prune_analysis_jobs()
+    return job
+
+
+def as_utc(moment):
+    # SQLite hands back naive datetimes for the UTC values stored
+    return moment if moment.tzinfo is not None else moment.replace(tzinfo=utcnow().tzinfo)
+
+
+def held_job_ids():
+    with _held_lock:
+        return set(_held_jobs)
+
+
+def expire_orphaned_job(job):
+    """Mark a queued or running job failed once it is too stale to still be worked on
+
+    Jobs only run in the process that accepted them, so a restart leaves its
+    unfinished jobs behind; this process's own jobs are never expired. Should
+    another process expire a job it still queues, the job won't start (see
+    _run_job). Returns the job.
+    """
+    stale_before = utcnow() - timedelta(seconds=ANALYSIS_JOB_STALE_SECONDS)
+    if (job.status in ('queued', 'running') and job.id not in held_job_ids()
+            and as_utc(job.updated_at) < stale_before):
+        job.status = 'failed'
+        job.error = ORPHANED_JOB_ERROR
+        job.resume_text = job.job_description = ''
+        db.session.commit()
+    return job
+
+
+def prune_analysis_jobs():
+    """Delete jobs past ANALYSIS_JOB_RETENTION_SECONDS and fail orphaned ones"""
+    now = utcnow()
+    AnalysisJob.query.filter(
+        AnalysisJob.updated_at < now - timedelta(seconds=ANALYSIS_JOB_RETENTION_SECONDS)
+    ).delete(synchronize_session=False)
+    AnalysisJob.query.filter(
+        AnalysisJob.status.in_(('queued', 'running')),
+        AnalysisJob.updated_at < now - timedelta(seconds=ANALYSIS_JOB_STALE_SECONDS),
+        AnalysisJob.id.not_in(held_job_ids())
+    ).update({'status': 'failed', 'error': ORPHANED_JOB_ERROR, 'resume_text': '', 'job_description': '',
+              'updated_at': now}, synchronize_session=False)
+    db.session.commit()
+
+
+def _run_job(app, job_id, runner, tenant):
+    try:
+        # Nobody is waiting on a job's AI calls, so they give way to interactive ones
+        with app.app_context(), llm_context('background', tenant):
+            # Start only a job still queued: one expired or deleted meanwhile has lost its inputs
+            started = AnalysisJob.query.filter_by(id=job_id, status='queued').update(
+                {'status': 'running', 'updated_at': utcnow()}, synchronize_session=False)
+            db.session.commit()
+            if not started:
+                print(f"Analysis job {job_id} was no longer queued; skipped")
+                return
+            job = db.session.get(AnalysisJob, job_id)
+
+            try:
+                result = runner(job.resume_text, job.job_description)
+            except Exception as e:
+                print(f"Analysis job {job_id} failed: {str(e)}")
+                outcome = {'status': 'failed', 'error': 'An error occurred during analysis. Please try again.'}
+            else:
+                outcome = {'status': 'completed', 'result': json.dumps(result)}
+            # Only the result is read from here on; don't keep the resume around
+            outcome.update(resume_text='', job_description='', updated_at=utcnow())
+            AnalysisJob.query.filter_by(id=job_id, status='running').update(outcome, synchronize_session=False)
+            db.session.commit()
+    finally:
+        with _held_lock:
+            _held_jobs.discard(job_id)
+        _slots.release()
@@ -0,0 +1,225 @@
+import json
+import re
+
+CLOSERS = {'{': '}', '[': ']'}
+OPENERS = {'}': '{', ']': '['}
+# Characters inside a string that need more than a plain copy
+STRING_SPECIAL = re.compile(r'["\\\x00-\x1f]')
+VALID_ESCAPES = frozenset('"\\/bfnrtu')
+CONTROL_ESCAPES = {'\n': '\\n', '\r': '\\r', '\t': '\\t', '\b': '\\b', '\f': '\\f'}
+
+
+class IncrementalJSONFieldParser:
+    """Parse the top-level fields of a JSON object as its text streams in
+
+    Text is fed in arbitrary chunks (e.g. LLM tokens). Each call to ``feed``
+    returns the ``(key, value)`` pairs whose values became complete in that
+    chunk, so small fields such as ``matchScore`` are available long before
+    the object's closing brace arrives. Every character is scanned once.
+
+    Anything before the first ``{`` (prose, code fences) is skipped, and the
+    common defects in model-written JSON are repaired on the fly: raw
+    newlines and tabs inside strings, unescaped double quotes inside strings
+    (e.g. HTML attributes), invalid backslash escapes and trailing commas.
+    A field whose value still cannot be parsed is dropped without affecting
+    the others, and ``close`` salvages the last field of a truncated object.
+    """
+
+    def __init__(self):
+        self._started = False
+        self._finished = False
+        self._stack = []
+        self._in_string = False
+        self._escaped = False
+        # A quote inside a string is only known to close it once the next
+        # non-whitespace character is seen
+        self._pending_quote = False
+        self._pending_space = []
+        self._trailing_comma = None
+        self._key_chars = None
+        self._current_key = None
+        self._value_chars = None
+        self.fields = {}
+        self.truncated = False
+
+    @property
+    def finished(self):
+        return self._finished
+
+    def feed(self, chunk):
+        """Consume a chunk of text and return newly completed top-level fields"""
+        completed = []
+        i = 0
+        n = len(chunk)
+        while i < n:
+            if self._finished:
+                break
+            char = chunk[i]
+            i += 1
+
+            if not self._started:
+                if char == '{':
+                    self._started = True
+                    self._stack.append(char)
+                continue
+
+            if self._pending_quote:
+                if char.isspace():
+                    self._pending_space.append(char)
+                    continue
+                self._pending_quote = False
+                if char in ',:}]':
+                    self._close_string()
+                    for space in self._pending_space:
+                        self._append(space)
+                    self._pending_space = []
+                else:
+                    # The quote was part of the text, e.g. <div class="x">
+                    self._append('\\"')
+                    for space in self._pending_space:
+                        self._append_string_char(space)
+                    self._pending_space = []
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                    self._append('\\' + char if char in VALID_ESCAPES else '\\\\' + char)
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._pending_quote = True
+                else:
+                    self._append_string_char(char)
+                    # Copy the plain run that follows in one step
+                    match = STRING_SPECIAL.search(chunk, i)
+                    end = match.start() if match else n
+                    if end > i:
+                        self._append(chunk[i:end])
+                        i = end
+                continue
+
+            depth = len(self._stack)
+            if char == '"':
+                self._in_string = True
+                self._trailing_comma = None
+                if depth == 1 and self._current_key is None and self._value_chars is None:
+                    self._key_chars = [char]
+                    continue
+            elif char == ':' and depth == 1 and self._value_chars is None:
+                if self._current_key is not None:
+                    self._value_chars = []
+                continue
+            elif char in '{[':
+                self._stack.append(char)
+                self._trailing_comma = None
+            elif char in '}]':
+                opener = OPENERS[char]
+                if opener not in self._stack[1:] and not (opener == '{' and depth == 1):
+                    # A stray closer; ignore it rather than end the object early
+                    continue
+                self._drop_trailing_comma()
+                # Close any brackets the model left open inside this one
+                while self._stack[-1] != opener:
+                    self._append(CLOSERS[self._stack.pop()])
+                self._stack.pop()
+                if not self._stack:
+                    self._complete_field(completed)
+                    self._finished = True
+                    continue
+            elif char == ',':
+                if depth == 1:
+                    self._complete_field(completed)
+                    continue
+                if self._value_chars is not None:
+                    self._trailing_comma = len(self._value_chars)
+            elif not char.isspace():
+                self._trailing_comma = None
+            self._append(char)
+        return completed
+
+    def close(self):
+        """Finish parsing at end of input and return all fields
+
+        If the object was cut off (e.g. the model hit max_tokens), the field
+        in progress is completed by closing its open strings and brackets.
+        """
+        if self._finished or not self._started:
+            return self.fields
+
+        self.truncated = True
+        if self._pending_quote:
+            self._pending_quote = False
+            self._close_string()
+        completed = []
+        if self._key_chars is None and self._value_chars is not None:
+            if self._in_string:
+                self._escaped = False
+                self._close_string()
+            self._drop_trailing_comma()
+            for opener in reversed(self._stack[1:]):
+                self._append(CLOSERS[opener])
+            self._complete_field(completed)
+        self._finished = True
+        return self.fields
+
+    def _append(self, text):
+        if self._key_chars is not None:
+            self._key_chars.append(text)
+        elif self._value_chars is not None:
+            self._value_chars.append(text)
+
+    def _append_string_char(self, char):
+        if char < ' ':
+            self._append(CONTROL_ESCAPES.get(char, f"\\u{ord(char):04x}"))
+        else:
+            self._append(char)
+
+    def _close_string(self):
+        self._in_string = False
+        if self._key_chars is not None:
+            self._key_chars.append('"')
+            try:
+                self._current_key = json.loads(''.join(self._key_chars))
+            except json.JSONDecodeError:
+                self._current_key = ''.join(self._key_chars)[1:-1]
+            self._key_chars = None
+        else:
+            self._append('"')
+
+    def _drop_trailing_comma(self):
+        if self._trailing_comma is not None and self._value_chars is not None:
+            del self._value_chars[self._trailing_comma]
+        self._trailing_comma = None
+
+    def _complete_field(self, completed):
+        if self._current_key is not None and self._value_chars is not None:
+            text = ''.join(self._value_chars).strip()
+            try:
+                value = json.loads(text)
+            except json.JSONDecodeError:
+                # Keep bare scalars such as 82% for the schema to coerce
+                value = text if text and text[0] not in '"{[' else None
+            if value is not None:
+                self.fields[self._current_key] = value
+                completed.append((self._current_key, value))
+        self._current_key = None
+        self._value_chars = None
+        self._trailing_comma = None
+
+
+def extract_json_fields(text):
+    """Return (fields, truncated) for the first JSON object in text, with repairs"""
+    start = text.find('{')
+    if start == -1:
+        return {}, False
+    # Well-formed output (the common case) parses at C speed
+    try:
+        value, _ = json.JSONDecoder().raw_decode(text, start)
+    except json.JSONDecodeError:
+        pass
+    else:
+        return value, False
+
+    parser = IncrementalJSONFieldParser()
+    parser.feed(text)
+    return parser.close(), parser.truncated
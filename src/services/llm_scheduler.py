@@ -0,0 +1,352 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from src.services.metrics import LLM_QUEUE_DEPTH, LLM_QUEUE_WAIT, LLM_SHED
+
+# AI call scheduling configuration; a rate of 0 leaves that limit off
+LLM_RATE_LIMIT_RPM = float(os.getenv('LLM_RATE_LIMIT_RPM', '0'))
+LLM_RATE_LIMIT_TPM = float(os.getenv('LLM_RATE_LIMIT_TPM', '0'))
+# Bucket capacity, in seconds of the rate: how large a burst may go out at once
+LLM_BURST_SECONDS = float(os.getenv('LLM_BURST_SECONDS', '10'))
+# Share of each bucket that background and bulk calls leave for interactive ones
+LLM_RESERVE_FRACTION = float(os.getenv('LLM_RESERVE_FRACTION', '0.25'))
+# Longest queue wait per priority before a call is shed instead
+LLM_QUEUE_DEADLINES = {
+    'interactive': float(os.getenv('LLM_DEADLINE_INTERACTIVE', '20')),
+    'background': float(os.getenv('LLM_DEADLINE_BACKGROUND', '120')),
+    'bulk': float(os.getenv('LLM_DEADLINE_BULK', '600')),
+}
+LLM_TENANT_HEADER = os.getenv('LLM_TENANT_HEADER', 'X-Tenant-ID')
+
+# Highest priority first
+PRIORITIES = ('interactive', 'background', 'bulk')
+
+_priority = ContextVar('llm_priority', default='interactive')
+_tenant = ContextVar('llm_tenant', default='default')
+
+
+class QueueDeadlineError(Exception):
+    """Raised when a call would wait longer than its priority's deadline"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@contextmanager
+def llm_context(priority=None, tenant=None):
+    """Run AI calls made inside the block at a priority and/or on behalf of a tenant"""
+    tokens = []
+    if priority is not None:
+        tokens.append((_priority, _priority.set(priority)))
+    if tenant is not None:
+        tokens.append((_tenant, _tenant.set(tenant)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def set_request_tenant(headers, remote_addr):
+    """Attribute the current request's AI calls to the tenant header, or the client address"""
+    _priority.set('interactive')
+    _tenant.set(headers.get(LLM_TENANT_HEADER) or remote_addr or 'default')
+
+
+def current_tenant():
+    return _tenant.get()
+
+
+def current_priority():
+    return _priority.get()
+
+
+class TokenBucket:
+    """A rate per minute with a burst capacity; a rate of 0 never limits"""
+
+    def __init__(self, rate_per_minute, burst_seconds):
+        self.rate = rate_per_minute / 60
+        self.capacity = max(1.0, self.rate * burst_seconds) if self.rate else float('inf')
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def refill(self, now):
+        if self.rate:
+            self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount, reserve=0.0):
+        """Seconds until amount can be taken leaving reserve (a fraction of capacity) behind
+
+        An amount larger than the bucket goes out once the bucket is full.
+        """
+        if not self.rate:
+            return 0.0
+        needed = min(self.capacity, amount + reserve * self.capacity)
+        return max(0.0, (needed - self.level) / self.rate)
+
+    def take(self, amount):
+        if self.rate:
+            self.level -= amount
+
+
+class Ticket:
+    """Permission for one AI call, holding the tokens charged for it"""
+
+    def __init__(self, scheduler, tokens):
+        self.scheduler = scheduler
+        self.tokens = tokens
+
+    def settle(self, actual_tokens):
+        """Correct the charge to the tokens the call really used"""
+        self.scheduler._refund(0, self.tokens - actual_tokens)
+        self.tokens = actual_tokens
+
+    def cancel(self):
+        """Return the whole charge, for a call that was never sent"""
+        self.scheduler._refund(1, self.tokens)
+        self.tokens = 0
+
+
+class _Waiter:
+    __slots__ = ('priority', 'tenant', 'tokens', 'enqueued_at', 'deadline', 'event', 'loop', 'future',
+                 'ticket', 'shed')
+
+    def __init__(self, priority, tenant, tokens, now, loop=None):
+        self.priority = priority
+        self.tenant = tenant
+        self.tokens = tokens
+        self.enqueued_at = now
+        self.deadline = now + LLM_QUEUE_DEADLINES[PRIORITIES[priority]]
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+        self.ticket = None
+        self.shed = False
+
+    def wake(self):
+        if self.loop is None:
+            self.event.set()
+        elif not self.future.done():
+            self.loop.call_soon_threadsafe(lambda: self.future.done() or self.future.set_result(None))
+
+
+class LLMScheduler:
+    """Admits AI calls under request and token rate limits, by priority and tenant
+
+    Every call takes one request and its estimated tokens (prompt plus
+    max_tokens, settled to the real usage afterwards) from two token
+    buckets. Calls that can't go at once wait in a queue per priority
+    (interactive, then background, then bulk); within a priority, tenants
+    take turns, one call each. Lower priorities only draw on the part of
+    each bucket above LLM_RESERVE_FRACTION, so an interactive call finds
+    capacity even during a large batch. A call whose expected wait is past
+    its priority's deadline, or that reaches the deadline while queued, is
+    shed with QueueDeadlineError rather than left to time out. A 429 from
+    upstream pauses every queue for its Retry-After.
+    """
+
+    def __init__(self, rpm=LLM_RATE_LIMIT_RPM, tpm=LLM_RATE_LIMIT_TPM, burst_seconds=LLM_BURST_SECONDS,
+                 reserve=LLM_RESERVE_FRACTION):
+        self.requests = TokenBucket(rpm, burst_seconds)
+        self.tokens = TokenBucket(tpm, burst_seconds)
+        self.reserve = reserve
+        self._cond = threading.Condition()
+        # Per priority: tenant -> deque of waiters, in turn order
+        self._queues = [OrderedDict() for _ in PRIORITIES]
+        self._depth = [0] * len(PRIORITIES)
+        self._paused_until = 0.0
+        self._dispatcher = None
+        self._counters = {name: {'granted': 0, 'queued': 0, 'shed': 0} for name in PRIORITIES}
+
+    def acquire(self, estimated_tokens):
+        """Block until the current context's call may go; returns a Ticket
+
+        Raises QueueDeadlineError when the call is shed.
+        """
+        ticket, waiter = self._admit(estimated_tokens)
+        if ticket is not None:
+            return ticket
+        waiter.event.wait()
+        return self._outcome(waiter)
+
+    async def acquire_async(self, estimated_tokens):
+        """acquire for a coroutine: waits on the event loop instead of a thread"""
+        ticket, waiter = self._admit(estimated_tokens, asyncio.get_running_loop())
+        if ticket is not None:
+            return ticket
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        return self._outcome(waiter)
+
+    def pause(self, seconds):
+        """Hold every queue for seconds, after upstream signalled its rate limit"""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _admit(self, estimated_tokens, loop=None):
+        priority = PRIORITIES.index(_priority.get())
+        name = PRIORITIES[priority]
+        with self._cond:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            waiter = _Waiter(priority, _tenant.get(), estimated_tokens, now, loop)
+            # Calls of the same or a higher priority that are already waiting go first
+            ahead = [w for queue in self._queues[:priority + 1] for waiters in queue.values() for w in waiters]
+            if not ahead and self._delay(waiter, now) <= 0:
+                self._counters[name]['granted'] += 1
+                LLM_QUEUE_WAIT.observe(0.0, priority=name)
+                return self._charge(waiter), None
+
+            expected = self._expected_wait(waiter, ahead, now)
+            if expected > LLM_QUEUE_DEADLINES[name]:
+                self._counters[name]['shed'] += 1
+                LLM_SHED.inc(priority=name)
+                raise QueueDeadlineError(f"AI calls are queued for about {expected:.0f}s, past the "
+                                         f"{name} deadline", retry_after=expected)
+
+            queue = self._queues[priority]
+            queue.setdefault(waiter.tenant, deque()).append(waiter)
+            self._depth[priority] += 1
+            self._counters[name]['queued'] += 1
+            LLM_QUEUE_DEPTH.set(self._depth[priority], priority=name)
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch, name='llm-scheduler', daemon=True)
+                self._dispatcher.start()
+            self._cond.notify_all()
+            return None, waiter
+
+    def _outcome(self, waiter):
+        if waiter.shed:
+            raise QueueDeadlineError(f"AI call waited {LLM_QUEUE_DEADLINES[PRIORITIES[waiter.priority]]:.0f}s "
+                                     f"without capacity", retry_after=self.requests_wait())
+        return waiter.ticket
+
+    def requests_wait(self):
+        with self._cond:
+            return max(0.0, self._paused_until - time.monotonic(), self.requests.wait_time(1))
+
+    def _reserve_for(self, priority):
+        return 0.0 if priority == 0 else self.reserve
+
+    def _delay(self, waiter, now):
+        reserve = self._reserve_for(waiter.priority)
+        return max(self._paused_until - now, self.requests.wait_time(1, reserve),
+                   self.tokens.wait_time(waiter.tokens, reserve))
+
+    def _expected_wait(self, waiter, ahead, now):
+        """Time for the buckets to refill enough for every call ahead and this one"""
+        wait = self._paused_until - now
+        reserve = self._reserve_for(waiter.priority)
+        for bucket, amount in ((self.requests, len(ahead) + 1),
+                               (self.tokens, sum(w.tokens for w in ahead) + waiter.tokens)):
+            if bucket.rate:
+                wait = max(wait, (amount + reserve * bucket.capacity - bucket.level) / bucket.rate)
+        return wait
+
+    def _charge(self, waiter):
+        self.requests.take(1)
+        self.tokens.take(waiter.tokens)
+        return Ticket(self, waiter.tokens)
+
+    def _refund(self, requests, tokens):
+        with self._cond:
+            self.requests.level = min(self.requests.capacity, self.requests.level + requests)
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level + tokens)
+            self._cond.notify_all()
+
+    def _head(self):
+        for queue in self._queues:
+            if queue:
+                return next(iter(queue.values()))[0]
+        return None
+
+    def _remove(self, waiter):
+        queue = self._queues[waiter.priority]
+        waiters = queue[waiter.tenant]
+        waiters.remove(waiter)
+        if not waiters:
+            del queue[waiter.tenant]
+        self._depth[waiter.priority] -= 1
+        LLM_QUEUE_DEPTH.set(self._depth[waiter.priority], priority=PRIORITIES[waiter.priority])
+
+    def _abandon(self, waiter):
+        """Drop a waiter whose caller went away, returning its charge if it was granted"""
+        with self._cond:
+            if waiter.ticket is None and not waiter.shed:
+                self._remove(waiter)
+                waiter.shed = True
+                return
+        if waiter.ticket is not None:
+            waiter.ticket.cancel()
+
+    def _dispatch(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                next_deadline = self._shed_expired(now)
+                waiter = self._head()
+                if waiter is None:
+                    self._cond.wait()
+                    continue
+                self.requests.refill(now)
+                self.tokens.refill(now)
+                delay = self._delay(waiter, now)
+                if delay > 0:
+                    self._cond.wait(max(0.001, min(delay, next_deadline - now)))
+                    continue
+                self._remove(waiter)
+                queue = self._queues[waiter.priority]
+                if waiter.tenant in queue:
+                    # The tenant's next call waits for the other tenants' turns
+                    queue.move_to_end(waiter.tenant)
+                name = PRIORITIES[waiter.priority]
+                self._counters[name]['granted'] += 1
+                LLM_QUEUE_WAIT.observe(now - waiter.enqueued_at, priority=name)
+                waiter.ticket = self._charge(waiter)
+                waiter.wake()
+
+    def _shed_expired(self, now):
+        """Shed waiters past their deadline; returns the nearest remaining deadline"""
+        nearest = float('inf')
+        for queue in self._queues:
+            for waiters in list(queue.values()):
+                for waiter in list(waiters):
+                    if waiter.deadline <= now:
+                        self._remove(waiter)
+                        waiter.shed = True
+                        name = PRIORITIES[waiter.priority]
+                        self._counters[name]['shed'] += 1
+                        LLM_SHED.inc(priority=name)
+                        waiter.wake()
+                    else:
+                        nearest = min(nearest, waiter.deadline)
+        return nearest
+
+    def stats(self):
+        with self._cond:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            return {
+                'rpm_limit': self.requests.rate * 60,
+                'tpm_limit': self.tokens.rate * 60,
+                'requests_available': round(self.requests.level, 1) if self.requests.rate else None,
+                'tokens_available': round(self.tokens.level) if self.tokens.rate else None,
+                'paused_for': round(max(0.0, self._paused_until - now), 1),
+                'priorities': {name: dict(self._counters[name], waiting=self._depth[i])
+                               for i, name in enumerate(PRIORITIES)}
+            }
+
+
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,231 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# METRICS_ENABLED=false turns every counter and histogram update into a no-op
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+PAGE_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """A monotonically increasing count, optionally split by label values"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_number(value)}" for key, value in values]
+
+
+class Gauge(Counter):
+    """A value that goes up and down, optionally split by label values"""
+
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    """Observations counted into fixed cumulative buckets, optionally split by label values"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = tuple(labels.get(name, '') for name in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, **labels):
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with self._lock:
+            series = self._values.get(key)
+            return sum(series[0]) if series else 0
+
+    def render(self):
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labels, key, [('le', _format_number(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_number(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds the process's metrics and renders them in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, help_text, labels=()):
+        return self._register(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=()):
+        return self._register(Gauge(name, help_text, labels))
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS, labels=()):
+        return self._register(Histogram(name, help_text, buckets, labels))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    'analysis_stage_seconds', 'Time spent in each analysis pipeline stage', labels=('stage',))
+ANALYSES = registry.counter(
+    'analysis_results_total', 'Analyses served, by where the result came from', labels=('source',))
+FALLBACKS = registry.counter(
+    'analysis_fallbacks_total', 'Local substitutes used in place of AI output', labels=('reason',))
+UPSTREAM_REQUESTS = registry.counter(
+    'together_requests_total', 'Together AI request attempts by HTTP status ("error" if none)',
+    labels=('status',))
+UPSTREAM_SECONDS = registry.histogram(
+    'together_request_seconds', 'Together AI request attempt latency', labels=('status',))
+UPSTREAM_SHORT_CIRCUITED = registry.counter(
+    'together_short_circuited_total', 'Together AI calls refused by the open circuit breaker')
+COALESCED = registry.counter(
+    'together_coalesced_total', 'Callers of an identical in-flight AI call: shared its result, timed out '
+    'waiting, or called anyway because too many were waiting', labels=('outcome',))
+UPLOAD_BYTES = registry.histogram(
+    'upload_bytes', 'Size of uploaded resumes', buckets=SIZE_BUCKETS, labels=('type',))
+UPLOADS_REJECTED = registry.counter(
+    'uploads_rejected_total', 'Uploads refused before extraction', labels=('reason',))
+UPLOAD_PAGES = registry.histogram(
+    'upload_pages', 'Pages in extracted PDF resumes', buckets=PAGE_BUCKETS)
+LLM_QUEUE_DEPTH = registry.gauge(
+    'llm_queue_depth', 'AI calls waiting for the rate limiter, by priority', labels=('priority',))
+LLM_QUEUE_WAIT = registry.histogram(
+    'llm_queue_wait_seconds', 'Time AI calls waited for the rate limiter', labels=('priority',))
+LLM_SHED = registry.counter(
+    'llm_requests_shed_total', 'AI calls refused because their queue wait would pass the deadline',
+    labels=('priority',))
+
+
+def record_upstream(status_code, seconds):
+    """Count one Together AI request attempt; status_code is None when no response arrived"""
+    status = 'error' if status_code is None else str(status_code)
+    UPSTREAM_REQUESTS.inc(status=status)
+    UPSTREAM_SECONDS.observe(seconds, status=status)
+
+
+class RequestTimings:
+    """Stage durations of one request, reported in its Server-Timing header"""
+
+    def __init__(self):
+        self.stages = []
+
+    def add(self, stage, seconds):
+        self.stages.append((stage, seconds))
+
+    def header(self):
+        return ', '.join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self.stages)
+
+
+_request_timings = ContextVar('request_timings', default=None)
+
+
+def start_request_timings():
+    """Collect the stage timings of the current request (thread or task) from here on"""
+    timings = RequestTimings()
+    _request_timings.set(timings)
+    return timings
+
+
+def current_request_timings():
+    return _request_timings.get()
+
+
+def record_stage(stage, seconds):
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+@contextmanager
+def timed_stage(stage):
+    """Time a pipeline stage into the stage histogram and the request's Server-Timing"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
@@ -0,0 +1,55 @@
+import base64
+import binascii
+import json
+
+
+class InvalidCursorError(ValueError):
+    """Raised for a pagination cursor that wasn't issued by encode_cursor"""
+
+
+def encode_cursor(values):
+    """An opaque, URL-safe cursor holding the sort key of the last row of a page"""
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(',', ':')).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (UnicodeEncodeError, binascii.Error, ValueError):
+        raise InvalidCursorError('Invalid cursor')
+    if not isinstance(values, list):
+        raise InvalidCursorError('Invalid cursor')
+    return values
+
+
+def read_page_size(value, default, maximum):
+    """Parse a ?limit= value, raising ValueError unless it is 1..maximum"""
+    if value is None:
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= maximum:
+        raise ValueError(f'limit must be between 1 and {maximum}')
+    return limit
+
+
+def stream_json_array(rows):
+    """Yield a JSON array of rows (an iterable of dicts) a row at a time"""
+    yield '['
+    for index, row in enumerate(rows):
+        yield (',' if index else '') + json.dumps(row)
+    yield ']'
+
+
+def stream_json_page(key, rows, next_cursor):
+    """Yield a {key: [rows...], "nextCursor": ...} document a row at a time
+
+    rows is an iterable of dicts; next_cursor is called once they are
+    exhausted, so it can depend on the last row.
+    """
+    yield f'{{{json.dumps(key)}:['
+    for index, row in enumerate(rows):
+        yield (',' if index else '') + json.dumps(row)
+    yield f'],"nextCursor":{json.dumps(next_cursor())}}}'
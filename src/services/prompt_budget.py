@@ -0,0 +1,136 @@
+import os
+import re
+from collections import Counter
+
+# Prompt budget configuration (in estimated tokens)
+PROMPT_RESUME_TOKENS = int(os.getenv('PROMPT_RESUME_TOKENS', '3000'))
+PROMPT_JOB_TOKENS = int(os.getenv('PROMPT_JOB_TOKENS', '1200'))
+RESPONSE_MIN_TOKENS = int(os.getenv('RESPONSE_MIN_TOKENS', '1500'))
+RESPONSE_MAX_TOKENS = int(os.getenv('RESPONSE_MAX_TOKENS', '4000'))
+# The assessment fields (score, suitability, gaps, recommendations) run to a few hundred tokens
+ASSESSMENT_TOKENS = 700
+ASSESSMENT_MAX_TOKENS = int(os.getenv('ASSESSMENT_MAX_TOKENS', '1000'))
+# The rewritten HTML resume is about as long as the source plus markup
+REWRITE_TOKEN_RATIO = 1.4
+
+TRUNCATION_MARKER = "[...]"
+
+PAGE_NUMBER_PATTERN = re.compile(r"^(?:page\s*)?\d{1,3}(?:\s*(?:/|of)\s*\d{1,3})?$", re.IGNORECASE)
+INLINE_SPACE_PATTERN = re.compile(r"[ \t\f\v\u00a0]+")
+WORD_PATTERN = re.compile(r"\S+")
+SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+# Sentences in a job posting that say nothing about the role itself
+BOILERPLATE_PATTERNS = re.compile(
+    r"equal (?:employment )?opportunity|affirmative action|without regard to|regardless of (?:race|age|gender)"
+    r"|race, (?:color|colour)|sexual orientation|gender identity|protected veteran|veteran status"
+    r"|reasonable accommodation|e-verify|value diversity|diverse and inclusive|drug[- ]free workplace"
+    r"|background check|privacy (?:policy|notice)|recruitment agencies|unsolicited resumes",
+    re.IGNORECASE
+)
+
+# Lines this short that repeat this often are page headers/footers from PDF extraction
+REPEATED_LINE_MAX_CHARS = 120
+REPEATED_LINE_MIN_COUNT = 3
+
+
+def estimate_tokens(text):
+    """Estimate the Llama token count of text without a tokenizer
+
+    English prose averages about four characters per token; short words and
+    punctuation push the count up, so the larger of the two estimates is used.
+    """
+    if not text:
+        return 0
+    return max(len(text) // 4, len(WORD_PATTERN.findall(text)) * 4 // 3)
+
+
+def compact_text(text):
+    """Collapse whitespace, drop page numbers and de-duplicate repeated headers/footers"""
+    lines = [INLINE_SPACE_PATTERN.sub(' ', line).strip() for line in text.splitlines()]
+    counts = Counter(line for line in lines if line and len(line) <= REPEATED_LINE_MAX_CHARS)
+
+    compacted = []
+    seen_repeated = set()
+    for line in lines:
+        if not line:
+            # Keep single blank lines; they separate sections
+            if compacted and compacted[-1]:
+                compacted.append('')
+            continue
+        if PAGE_NUMBER_PATTERN.match(line):
+            continue
+        if counts[line] >= REPEATED_LINE_MIN_COUNT:
+            if line in seen_repeated:
+                continue
+            seen_repeated.add(line)
+        compacted.append(line)
+    return '\n'.join(compacted).strip()
+
+
+def compact_job_description(job_description):
+    """Compact a job description and strip EEO and other legal boilerplate sentences"""
+    kept_lines = []
+    for line in compact_text(job_description).split('\n'):
+        sentences = [s for s in SENTENCE_SPLIT_PATTERN.split(line) if not BOILERPLATE_PATTERNS.search(s)]
+        if sentences or not line:
+            kept_lines.append(' '.join(sentences))
+    return '\n'.join(kept_lines).strip()
+
+
+def fit_to_budget(text, max_tokens):
+    """Trim text to about max_tokens, shortening the longest sections first
+
+    Sections are runs of lines separated by blank lines. Every section keeps
+    its leading lines (heading, most recent role) up to a common cap chosen
+    so the total fits, so a long project list cannot crowd out education or
+    skills further down.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    sections = [section.split('\n') for section in text.split('\n\n')]
+    line_tokens = [[estimate_tokens(line) + 1 for line in section] for section in sections]
+    sizes = [sum(tokens) for tokens in line_tokens]
+
+    # Find the largest per-section cap whose total fits in the budget
+    low, high = 0, max(sizes)
+    while low < high:
+        cap = (low + high + 1) // 2
+        if sum(min(size, cap) for size in sizes) <= max_tokens:
+            low = cap
+        else:
+            high = cap - 1
+
+    trimmed = []
+    for section, tokens, size in zip(sections, line_tokens, sizes):
+        if size <= low:
+            trimmed.append('\n'.join(section))
+            continue
+        kept = []
+        used = 0
+        for line, cost in zip(section, tokens):
+            if used + cost > low:
+                # Cut an overlong line by characters rather than dropping it whole
+                remaining_chars = (low - used) * 3
+                if remaining_chars > 40:
+                    kept.append(line[:remaining_chars])
+                break
+            kept.append(line)
+            used += cost
+        if kept:
+            kept.append(TRUNCATION_MARKER)
+            trimmed.append('\n'.join(kept))
+    return '\n\n'.join(trimmed)
+
+
+def response_token_budget(resume_tokens):
+    """max_tokens for an analysis response, sized to the resume being rewritten"""
+    needed = ASSESSMENT_TOKENS + int(resume_tokens * REWRITE_TOKEN_RATIO)
+    return max(RESPONSE_MIN_TOKENS, min(RESPONSE_MAX_TOKENS, needed))
+
+
+def rewrite_token_budget(resume_tokens):
+    """max_tokens for a standalone resume rewrite (HTML only, no assessment)"""
+    needed = 200 + int(resume_tokens * REWRITE_TOKEN_RATIO)
+    return max(RESPONSE_MIN_TOKENS - ASSESSMENT_TOKENS, min(RESPONSE_MAX_TOKENS, needed))
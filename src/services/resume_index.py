@@ -0,0 +1,330 @@
+import heapq
+import math
+import os
+import threading
+import time
+import zlib
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.models.extracted_text import ExtractedText
+from src.models.user import db
+from src.services.scoring import AVERAGE_RESUME_TOKENS, BM25_B, BM25_K1, get_scoring_engine, is_keyword
+
+# Resume index configuration
+RESUME_INDEX_ENABLED = os.getenv('RESUME_INDEX_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+# Width of the hashed term vectors blended into scores; 0 turns them off, and they need NumPy
+RESUME_INDEX_VECTOR_DIM = int(os.getenv('RESUME_INDEX_VECTOR_DIM', '0'))
+RESUME_INDEX_VECTOR_WEIGHT = float(os.getenv('RESUME_INDEX_VECTOR_WEIGHT', '0.3'))
+# Read the stored texts at startup rather than on the first search, e.g. in one designated process
+RESUME_INDEX_PRELOAD = os.getenv('RESUME_INDEX_PRELOAD', 'false').lower() in ('1', 'true', 'yes')
+# How long the search that starts the load waits for it before answering 503
+RESUME_INDEX_LOAD_WAIT_SECONDS = float(os.getenv('RESUME_INDEX_LOAD_WAIT_SECONDS', '2'))
+# How often a search picks up texts stored by other processes
+RESUME_INDEX_REFRESH_SECONDS = float(os.getenv('RESUME_INDEX_REFRESH_SECONDS', '30'))
+# Rows stored this long before the last refresh are read again, for commits that landed late
+REFRESH_OVERLAP_SECONDS = 60
+LOAD_FETCH_SIZE = 500
+SKILL_PREFIX = 'skill:'
+
+
+class IndexLoadingError(Exception):
+    """Raised when searching before the index has read the stored texts"""
+
+
+def index_terms(text):
+    """Term frequencies indexed for a resume, and its length in tokens
+
+    The terms are content keywords and dictionary skills, the two kinds of
+    term a compiled JobQuery weighs.
+    """
+    profile = get_scoring_engine().profile(text)
+    terms = {term: tf for term, tf in profile.terms.items() if is_keyword(term)}
+    for skill, tf in profile.skills.items():
+        terms[SKILL_PREFIX + skill] = tf
+    return terms, profile.length
+
+
+def query_terms(job_query):
+    """The (term, weight) pairs of a compiled JobQuery, keyed as index_terms keys them"""
+    terms = [(SKILL_PREFIX + skill, weight) for skill, weight in job_query.skill_weights.items()]
+    terms += job_query.term_weights.items()
+    return [(term, weight) for term, weight in terms if weight > 0]
+
+
+def hashed_vector(values, dim):
+    """Signed feature hashing of per-term values, L2-normalized"""
+    vector = [0.0] * dim
+    for term, value in values.items():
+        h = zlib.crc32(term.encode('utf-8'))
+        vector[h % dim] += value if h & 0x80000000 else -value
+    norm = math.sqrt(sum(value * value for value in vector))
+    return [value / norm for value in vector] if norm else vector
+
+
+class ResumeIndex:
+    """In-memory inverted index over extracted resume texts, ranked with BM25
+
+    Each term keeps two parallel arrays: document ids and the document's
+    impact for the term, its saturated, length-normalized term frequency as
+    ScoringEngine.score_profile computes it. A search adds up job weight
+    times impact over the postings of the job's terms only, so a resume's
+    score is the local pre-filter score it would get from /api/analyze.
+
+    Documents are appended as texts are extracted; removed ones are skipped
+    until enough pile up to compact the postings. With NumPy, postings are
+    scored as vectors, and documents can also keep a hashed term vector
+    whose cosine similarity with the job is blended into the score.
+    """
+
+    def __init__(self, vector_dim=RESUME_INDEX_VECTOR_DIM, vector_weight=RESUME_INDEX_VECTOR_WEIGHT):
+        self.vector_dim = vector_dim if np is not None else 0
+        self.vector_weight = vector_weight if self.vector_dim else 0.0
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self.loaded = False
+        self.load_failed = False
+        self._refreshed_at = 0.0
+        self._watermark = 0.0
+        self._digests = []
+        self._doc_ids = {}
+        self._postings = {}
+        self._removed = set()
+        self._vectors = array('f')
+
+    def __len__(self):
+        return len(self._doc_ids)
+
+    def __contains__(self, digest):
+        return digest in self._doc_ids
+
+    def add(self, digest, text):
+        """Index a text under its digest; returns False if it is already indexed"""
+        if digest in self._doc_ids:
+            return False
+        terms, length = index_terms(text)
+        # As ScoringEngine.score_profile weighs a term's frequency
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * length / AVERAGE_RESUME_TOKENS)
+        impacts = [(term, min(1.0, tf * (BM25_K1 + 1) / (tf + length_norm))) for term, tf in terms.items()]
+        vector = None
+        if self.vector_dim:
+            vector = hashed_vector({term: 1.0 + math.log(tf) for term, tf in terms.items()}, self.vector_dim)
+        with self._lock:
+            if digest in self._doc_ids:
+                return False
+            doc = len(self._digests)
+            self._digests.append(digest)
+            self._doc_ids[digest] = doc
+            for term, impact in impacts:
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = (array('I'), array('f'))
+                postings[0].append(doc)
+                postings[1].append(impact)
+            if vector is not None:
+                self._vectors.extend(vector)
+        return True
+
+    def remove(self, digest):
+        with self._lock:
+            doc = self._doc_ids.pop(digest, None)
+            if doc is None:
+                return False
+            self._digests[doc] = None
+            self._removed.add(doc)
+            if len(self._removed) > len(self._digests) // 4:
+                self._compact()
+            return True
+
+    def _compact(self):
+        """Rebuild the postings without removed documents"""
+        keep = [doc for doc in range(len(self._digests)) if doc not in self._removed]
+        new_ids = {doc: new for new, doc in enumerate(keep)}
+        postings = {}
+        for term, (docs, impacts) in self._postings.items():
+            pairs = [(new_ids[doc], impact) for doc, impact in zip(docs, impacts) if doc in new_ids]
+            if pairs:
+                postings[term] = (array('I', [doc for doc, _ in pairs]), array('f', [impact for _, impact in pairs]))
+        self._postings = postings
+        self._digests = [self._digests[doc] for doc in keep]
+        self._doc_ids = {digest: doc for doc, digest in enumerate(self._digests)}
+        if self.vector_dim:
+            dim = self.vector_dim
+            vectors = array('f')
+            for doc in keep:
+                vectors.extend(self._vectors[doc * dim:(doc + 1) * dim])
+            self._vectors = vectors
+        self._removed = set()
+
+    def search(self, job_query, k):
+        """Return up to k (digest, score) pairs, best first; scores run from 0 to 100"""
+        with self._lock:
+            if not self._doc_ids or k < 1 or not job_query.total_weight:
+                return []
+            weighted = [(term, weight) for term, weight in query_terms(job_query) if term in self._postings]
+            if not weighted:
+                return []
+            if np is not None:
+                return self._search_numpy(weighted, job_query, k)
+            return self._search_python(weighted, job_query, k)
+
+    def _search_python(self, weighted, job_query, k):
+        scores = [0.0] * len(self._digests)
+        for term, weight in weighted:
+            docs, impacts = self._postings[term]
+            for doc, impact in zip(docs, impacts):
+                scores[doc] += weight * impact
+        for doc in self._removed:
+            scores[doc] = -1.0
+        best = heapq.nlargest(k, range(len(scores)), key=scores.__getitem__)
+        scale = 100 / job_query.total_weight
+        return [(self._digests[doc], round(scores[doc] * scale, 2)) for doc in best if scores[doc] > 0]
+
+    def _search_numpy(self, weighted, job_query, k):
+        scores = np.zeros(len(self._digests), dtype=np.float32)
+        for term, weight in weighted:
+            docs, impacts = self._postings[term]
+            # A term lists each document once, so fancy-index addition is safe
+            scores[np.frombuffer(docs, dtype=np.uintc)] += np.float32(weight) * np.frombuffer(impacts, dtype=np.float32)
+        scores *= np.float32(1 / job_query.total_weight)
+        if self.vector_weight:
+            query_vector = np.array(hashed_vector(dict(weighted), self.vector_dim), dtype=np.float32)
+            vectors = np.frombuffer(self._vectors, dtype=np.float32).reshape(len(scores), self.vector_dim)
+            similarity = np.clip(vectors @ query_vector, 0, 1)
+            scores = (1 - self.vector_weight) * scores + self.vector_weight * similarity
+        if self._removed:
+            scores[np.fromiter(self._removed, dtype=np.intp)] = -1
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(self._digests[doc], round(float(scores[doc]) * 100, 2)) for doc in best.tolist() if scores[doc] > 0]
+
+    def refresh(self):
+        """Index stored texts added since the last refresh (every stored text the first time)
+
+        Other processes' uploads reach this process's index this way. Returns
+        the number of texts added; 0 if another thread is already refreshing.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return 0
+        try:
+            started = time.time()
+            query = db.session.query(ExtractedText.digest, ExtractedText.text_compressed)
+            if self._watermark:
+                query = query.filter(ExtractedText.created_at >= self._watermark - REFRESH_OVERLAP_SECONDS)
+            added = 0
+            for digest, text_compressed in query.yield_per(LOAD_FETCH_SIZE):
+                if digest not in self._doc_ids:
+                    added += self.add(digest, zlib.decompress(text_compressed).decode('utf-8'))
+            self._watermark = started
+            self._refreshed_at = time.monotonic()
+            self.loaded = True
+            return added
+        finally:
+            self._refresh_lock.release()
+
+    def refresh_if_due(self):
+        if time.monotonic() - self._refreshed_at >= RESUME_INDEX_REFRESH_SECONDS:
+            self.refresh()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': RESUME_INDEX_ENABLED,
+                'loaded': self.loaded,
+                'documents': len(self._doc_ids),
+                'removed_pending_compaction': len(self._removed),
+                'terms': len(self._postings),
+                'postings': sum(len(docs) for docs, _ in self._postings.values()),
+                'vector_dim': self.vector_dim,
+                'numpy': np is not None
+            }
+
+
+resume_index = ResumeIndex()
+
+
+_load_lock = threading.Lock()
+_load_thread = None
+
+
+def start_loading(app):
+    """Read every stored text into the index in a background thread
+
+    Runs once per process: on the first search, or at startup with
+    RESUME_INDEX_PRELOAD, and again after a failed load. Profiling takes
+    about half a millisecond per resume, so a large store takes a while;
+    searches meanwhile get IndexLoadingError. Returns the loading thread.
+    """
+    global _load_thread
+    if not RESUME_INDEX_ENABLED:
+        return None
+
+    def load():
+        with app.app_context():
+            started = time.perf_counter()
+            try:
+                added = resume_index.refresh()
+            except SQLAlchemyError as e:
+                print(f"Resume index not loaded: {str(e).splitlines()[0]}")
+                resume_index.load_failed = True
+                return
+            finally:
+                db.session.remove()
+            print(f"Resume index loaded {added} texts in {time.perf_counter() - started:.1f}s")
+
+    with _load_lock:
+        if _load_thread is None or resume_index.load_failed:
+            resume_index.load_failed = False
+            _load_thread = threading.Thread(target=load, name='resume-index-load', daemon=True)
+            _load_thread.start()
+        return _load_thread
+
+
+def index_text(digest, text):
+    """Add a newly extracted text to this process's index once it is in use
+
+    Until the first search nothing is indexed; the load reads the text from
+    the table, where it is already committed.
+    """
+    if RESUME_INDEX_ENABLED and (_load_thread is not None or resume_index.loaded):
+        resume_index.add(digest, text)
+
+
+def unindex_texts(digests):
+    if RESUME_INDEX_ENABLED:
+        for digest in digests:
+            resume_index.remove(digest)
+
+
+def find_candidates(job_query, k):
+    """Rank stored resumes for a compiled job; returns up to k (digest, score) pairs
+
+    Results are checked against the table, since another process may have
+    pruned a text this process still indexes. Must run inside an app context.
+    """
+    if not RESUME_INDEX_ENABLED:
+        raise IndexLoadingError('The resume index is disabled')
+    if not resume_index.loaded:
+        # The first search starts the load and waits a little; a small store is ready by then
+        previous = _load_thread
+        thread = start_loading(current_app._get_current_object())
+        if thread is not previous:
+            thread.join(RESUME_INDEX_LOAD_WAIT_SECONDS)
+        if not resume_index.loaded:
+            raise IndexLoadingError('The resume index is still loading')
+    resume_index.refresh_if_due()
+    ranked = resume_index.search(job_query, k * 2)
+    stored = {digest for (digest,) in db.session.query(ExtractedText.digest).filter(
+        ExtractedText.digest.in_([digest for digest, _ in ranked]))}
+    for digest, _ in ranked:
+        if digest not in stored:
+            resume_index.remove(digest)
+    return [(digest, score) for digest, score in ranked if digest in stored][:k]
@@ -0,0 +1,240 @@
+import math
+import os
+import re
+import threading
+from collections import Counter
+
+# Scoring configuration
+SKILLS_DICTIONARY_PATH = os.getenv(
+    'SKILLS_DICTIONARY_PATH', os.path.join(os.path.dirname(__file__), 'data', 'skills.txt'))
+SKILL_WEIGHT = float(os.getenv('SCORING_SKILL_WEIGHT', '3.0'))
+BM25_K1 = 1.2
+BM25_B = 0.75
+AVERAGE_RESUME_TOKENS = 600
+
+# Tokens keep inner punctuation used by tech names: c++, c#, node.js, ci/cd, .net
+TOKEN_PATTERN = re.compile(r"\.?[A-Za-z0-9+#]+(?:[./\-][A-Za-z0-9+#]+)*")
+SENTENCE_PATTERN = re.compile(r"[.!?;]\s+|\n+")
+
+STOPWORDS = frozenset("""
+a about above across after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each either etc every few for from
+further had has have having he her here hers him his how i if in into is it its itself just least less
+let like may me might more most must my no nor not now of off on once only or other our ours out over
+own per plus same she should so some such than that the their theirs them then there these they this
+those through to too under until up upon us very via was we well were what when where which while who
+whom why will with within without would yet you your yours
+ability able apply applicant applicants candidate candidates company including job looking new opportunity
+position preferred qualifications required requirements responsibilities responsible role skills strong
+team work working year years experience experienced knowledge understanding excellent good great
+""".split())
+
+
+def tokenize(text):
+    """Split text into tokens, keeping the original casing"""
+    return TOKEN_PATTERN.findall(text)
+
+
+class SkillDictionary:
+    """Token trie over skill phrases for single-pass, longest-match skill extraction"""
+
+    def __init__(self):
+        self.root = {}
+        self.size = 0
+        self.max_phrase_tokens = 0
+
+    def add(self, pattern, skill):
+        case_sensitive = pattern.startswith('=')
+        surface = tokenize(pattern[1:] if case_sensitive else pattern)
+        if not surface:
+            return
+        node = self.root
+        for token in surface:
+            node = node.setdefault(token.lower(), {})
+        # None marks a phrase end; case-sensitive variants keep their exact surface
+        node.setdefault(None, []).append((skill, tuple(surface) if case_sensitive else None))
+        self.size += 1
+        self.max_phrase_tokens = max(self.max_phrase_tokens, len(surface))
+
+    @classmethod
+    def load(cls, path):
+        dictionary = cls()
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                patterns = line.split('|')
+                skill = patterns[0].lstrip('=')
+                for pattern in patterns:
+                    dictionary.add(pattern, skill)
+        return dictionary
+
+    def find(self, tokens, lowered=None):
+        """Return a Counter of skills found in a token list (longest match wins)"""
+        if lowered is None:
+            lowered = list(map(str.lower, tokens))
+        found = Counter()
+        root = self.root
+        n = len(lowered)
+        skip_until = 0
+        for i, token in enumerate(lowered):
+            if i < skip_until:
+                continue
+            node = root.get(token)
+            if node is None:
+                continue
+            match_skill = None
+            j = i
+            while node is not None:
+                j += 1
+                for skill, surface in node.get(None, ()):
+                    if surface is None or tuple(tokens[i:j]) == surface:
+                        match_skill, skip_until = skill, j
+                        break
+                node = node.get(lowered[j]) if j < n else None
+            if match_skill is not None:
+                found[match_skill] += 1
+        return found
+
+
+class TextProfile:
+    """Skill and keyword term frequencies for one document"""
+
+    __slots__ = ('skills', 'terms', 'length')
+
+    def __init__(self, skills, terms, length):
+        self.skills = skills
+        self.terms = terms
+        self.length = length
+
+
+class JobQuery:
+    """A compiled job description: weighted skill and keyword terms"""
+
+    def __init__(self, skill_weights, term_weights):
+        self.skill_weights = skill_weights
+        self.term_weights = term_weights
+        self.total_weight = sum(skill_weights.values()) + sum(term_weights.values())
+
+    @property
+    def skills(self):
+        return list(self.skill_weights)
+
+    def to_dict(self):
+        return {'skills': self.skill_weights, 'terms': self.term_weights}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(dict(data['skills']), dict(data['terms']))
+
+
+class ScoreResult:
+    """Outcome of scoring one resume against a JobQuery"""
+
+    __slots__ = ('score', 'matched_skills', 'missing_skills')
+
+    def __init__(self, score, matched_skills, missing_skills):
+        self.score = score
+        self.matched_skills = matched_skills
+        self.missing_skills = missing_skills
+
+
+class ScoringEngine:
+    """Deterministic local resume/job-description relevance scoring
+
+    Job descriptions are compiled once into a JobQuery whose terms (skills
+    from the dictionary plus content keywords) carry BM25-saturated term
+    frequency times an inverse sentence frequency, so wording repeated in
+    every sentence of a posting (boilerplate) counts for little. A resume is
+    profiled in one pass and scored as the weighted, length-normalized
+    coverage of the query terms on a 0-100 scale.
+    """
+
+    def __init__(self, dictionary):
+        self.dictionary = dictionary
+
+    def profile(self, text):
+        tokens = tokenize(text)
+        lowered = list(map(str.lower, tokens))
+        skills = self.dictionary.find(tokens, lowered)
+        # Raw counts; stopwords and numbers are dropped when a job is compiled
+        return TextProfile(skills, Counter(lowered), len(tokens))
+
+    def compile_job(self, job_description):
+        """Compile a job description into weighted query terms"""
+        sentences = [s for s in SENTENCE_PATTERN.split(job_description) if s.strip()] or [job_description]
+        sentence_count = len(sentences)
+        skill_df = Counter()
+        term_df = Counter()
+        for sentence in sentences:
+            profile = self.profile(sentence)
+            skill_df.update(profile.skills.keys())
+            term_df.update(profile.terms.keys())
+
+        job_profile = self.profile(job_description)
+        skill_weights = {
+            skill: round(SKILL_WEIGHT * _saturate(tf) * _idf(skill_df[skill], sentence_count), 4)
+            for skill, tf in job_profile.skills.items()
+        }
+        term_weights = {
+            term: round(_saturate(tf) * _idf(term_df[term], sentence_count), 4)
+            for term, tf in job_profile.terms.items()
+            if is_keyword(term)
+        }
+        return JobQuery(skill_weights, term_weights)
+
+    def score_profile(self, query, profile):
+        if not query.total_weight:
+            return ScoreResult(0, [], [])
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * profile.length / AVERAGE_RESUME_TOKENS)
+        matched = 0.0
+        matched_skills = []
+        missing_skills = []
+        for skill, weight in query.skill_weights.items():
+            tf = profile.skills.get(skill, 0)
+            if tf:
+                matched += weight * min(1.0, tf * (BM25_K1 + 1) / (tf + length_norm))
+                matched_skills.append(skill)
+            else:
+                missing_skills.append(skill)
+        terms = profile.terms
+        for term, weight in query.term_weights.items():
+            tf = terms.get(term, 0)
+            if tf:
+                matched += weight * min(1.0, tf * (BM25_K1 + 1) / (tf + length_norm))
+        score = round(100 * matched / query.total_weight)
+        missing_skills.sort(key=lambda skill: -query.skill_weights[skill])
+        return ScoreResult(score, matched_skills, missing_skills)
+
+    def score(self, query, resume_text):
+        """Score one resume against a compiled JobQuery"""
+        return self.score_profile(query, self.profile(resume_text))
+
+    def score_many(self, query, resume_texts):
+        return [self.score(query, text) for text in resume_texts]
+
+
+def is_keyword(term):
+    return len(term) > 1 and not term[0].isdigit() and term not in STOPWORDS
+
+
+def _saturate(tf):
+    return tf * (BM25_K1 + 1) / (tf + BM25_K1)
+
+
+def _idf(df, n):
+    return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_scoring_engine():
+    """Return the shared ScoringEngine, loading the skills dictionary on first use"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = ScoringEngine(SkillDictionary.load(SKILLS_DICTIONARY_PATH))
+        return _engine
@@ -0,0 +1,152 @@
+import asyncio
+import hashlib
+import os
+import threading
+
+from src.services.metrics import COALESCED
+
+# Callers that may wait on one in-flight AI call (0 disables coalescing)
+COALESCE_MAX_WAITERS = int(os.getenv('COALESCE_MAX_WAITERS', '32'))
+# Seconds a caller waits on someone else's call before giving up
+COALESCE_TIMEOUT = float(os.getenv('COALESCE_TIMEOUT', '180'))
+
+
+class CoalescingTimeoutError(Exception):
+    """Raised when a shared in-flight call does not finish within COALESCE_TIMEOUT"""
+
+
+def make_flight_key(*parts):
+    """A hash of everything that determines the call's result"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.waiters = 0
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers with the same key share its outcome
+
+    The first caller (the leader) runs the function. Later callers block
+    until it finishes and get its result, or its exception re-raised. Once
+    max_waiters callers are waiting, further ones run the function
+    themselves rather than pile onto one call.
+    """
+
+    def __init__(self, max_waiters=COALESCE_MAX_WAITERS, timeout=COALESCE_TIMEOUT):
+        self.max_waiters = max_waiters
+        self.timeout = timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args):
+        if self.max_waiters <= 0:
+            return func(*args)
+
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            elif call.waiters >= self.max_waiters:
+                call = None
+                leader = False
+            else:
+                call.waiters += 1
+                leader = False
+
+        if call is None:
+            COALESCED.inc(outcome='overflow')
+            return func(*args)
+
+        if not leader:
+            finished = call.done.wait(self.timeout)
+            with self._lock:
+                call.waiters -= 1
+            if not finished:
+                COALESCED.inc(outcome='timeout')
+                raise CoalescingTimeoutError(f"Shared AI call did not finish within {self.timeout:g} seconds")
+            COALESCED.inc(outcome='shared')
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines running on one event loop"""
+
+    def __init__(self, max_waiters=COALESCE_MAX_WAITERS, timeout=COALESCE_TIMEOUT):
+        self.max_waiters = max_waiters
+        self.timeout = timeout
+        # key -> [future, waiter count]
+        self._calls = {}
+
+    async def do(self, key, func, *args):
+        if self.max_waiters <= 0:
+            return await func(*args)
+
+        call = self._calls.get(key)
+        if call is not None:
+            if call[1] >= self.max_waiters:
+                COALESCED.inc(outcome='overflow')
+                return await func(*args)
+            future = call[0]
+            call[1] += 1
+            try:
+                # shield: a waiter that times out or disconnects must not cancel the leader's call
+                result = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+            except asyncio.TimeoutError:
+                COALESCED.inc(outcome='timeout')
+                raise CoalescingTimeoutError(f"Shared AI call did not finish within {self.timeout:g} seconds")
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leader was cancelled, not this caller: make the call after all
+                return await func(*args)
+            except Exception:
+                COALESCED.inc(outcome='shared')
+                raise
+            finally:
+                call[1] -= 1
+            COALESCED.inc(outcome='shared')
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = [future, 0]
+        try:
+            result = await func(*args)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark it retrieved so a failure nobody waited on isn't logged by asyncio
+            future.exception()
+            raise
+        finally:
+            del self._calls[key]
+
+
+single_flight = SingleFlight()
+async_single_flight = AsyncSingleFlight()
@@ -0,0 +1,235 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Output of src/build_static.py; without a current build there, assets are built in memory at startup
+STATIC_BUILD_DIR = os.getenv('STATIC_BUILD_DIR', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static_build'))
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+FINGERPRINT_LENGTH = 10
+# Fingerprinted files never change, so browsers may keep them for a year without asking
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Unfingerprinted paths (index.html, favicon.ico) are revalidated with their ETag
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+# Already compressed formats; gzip or brotli would only add CPU time
+INCOMPRESSIBLE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.woff', '.woff2', '.gz', '.br', '.zip'}
+MIN_COMPRESS_BYTES = 256
+# An encoded copy is only kept if it is at most this fraction of the original
+MAX_COMPRESSED_RATIO = 0.9
+# Files whose references to other assets are rewritten to the fingerprinted names
+REWRITTEN_EXTENSIONS = ('.css', '.html')
+# Served under their own names, since other sites and browsers ask for them by name
+UNFINGERPRINTED = {'index.html', 'favicon.ico', 'robots.txt'}
+
+
+class StaticAsset:
+    """One static file as served: its body, ETag and response headers by content coding"""
+
+    __slots__ = ('path', 'bodies', 'etags', 'headers')
+
+    def __init__(self, path, content_type, etag, bodies, cache_control):
+        self.path = path
+        self.bodies = bodies
+        # Each encoding is a distinct representation and needs its own validator
+        self.etags = {coding: etag if coding == 'identity' else f"{etag}-{coding}" for coding in bodies}
+        # Built once here rather than per request
+        self.headers = {}
+        for coding in bodies:
+            headers = [('Content-Type', content_type), ('ETag', f'"{self.etags[coding]}"'),
+                       ('Cache-Control', cache_control)]
+            if len(bodies) > 1:
+                headers.append(('Vary', 'Accept-Encoding'))
+            if coding != 'identity':
+                headers.append(('Content-Encoding', coding))
+            self.headers[coding] = headers
+
+
+def fingerprinted_name(path, data):
+    root, extension = posixpath.splitext(path)
+    return f"{root}.{hashlib.sha256(data).hexdigest()[:FINGERPRINT_LENGTH]}{extension}"
+
+
+def compress(path, data):
+    """Return {coding: bytes} for the encodings worth serving for this file"""
+    encodings = {}
+    if len(data) < MIN_COMPRESS_BYTES or posixpath.splitext(path)[1].lower() in INCOMPRESSIBLE_EXTENSIONS:
+        return encodings
+    # mtime=0 keeps the output, and so the build, reproducible
+    candidates = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        candidates['br'] = brotli.compress(data, quality=11)
+    for coding, body in candidates.items():
+        if len(body) <= len(data) * MAX_COMPRESSED_RATIO:
+            encodings[coding] = body
+    return encodings
+
+
+def rewrite_references(path, data, names):
+    """Point quoted or url()'d references to other assets at their fingerprinted names"""
+    text = data.decode('utf-8')
+    directory = posixpath.dirname(path)
+    # Longest first, so a path is never replaced by a shorter one it ends with
+    for source in sorted(names, key=len, reverse=True):
+        relative = posixpath.relpath(source, directory or '.')
+        target = posixpath.relpath(names[source], directory or '.')
+        pattern = re.compile(r'(["\'(])(\./|/)?' + re.escape(relative) + r'(?=[?#"\')])')
+        text = pattern.sub(lambda match: match.group(1) + (match.group(2) or '') + target, text)
+    return text.encode('utf-8')
+
+
+def read_source_files(source_dir, exclude=()):
+    """Return {posix path relative to source_dir: bytes}, skipping dotfiles"""
+    files = {}
+    excluded = {os.path.abspath(path) for path in exclude}
+    for root, dirs, filenames in os.walk(source_dir):
+        dirs[:] = [name for name in dirs
+                   if not name.startswith('.') and os.path.abspath(os.path.join(root, name)) not in excluded]
+        for filename in filenames:
+            if filename.startswith('.'):
+                continue
+            full_path = os.path.join(root, filename)
+            with open(full_path, 'rb') as f:
+                files[os.path.relpath(full_path, source_dir).replace(os.sep, '/')] = f.read()
+    return files
+
+
+def build_assets(source_dir, build_dir=STATIC_BUILD_DIR):
+    """Fingerprint and compress the files under source_dir (but not in build_dir)
+
+    Returns {path: {"path": served name, "sha256", "encodings": {coding: bytes},
+    "data": bytes}}. HTML and CSS are rewritten to reference the fingerprinted
+    names before they are hashed themselves.
+    """
+    files = read_source_files(source_dir, exclude=[build_dir])
+    names = {}
+    built = {}
+    # Assets that reference others come last, once the names they point at are known
+    ordered = sorted(files, key=lambda path: (path.endswith(REWRITTEN_EXTENSIONS), path.endswith('.html'), path))
+    for path in ordered:
+        data = files[path]
+        if path.endswith(REWRITTEN_EXTENSIONS):
+            data = rewrite_references(path, data, names)
+        served = path if path in UNFINGERPRINTED else fingerprinted_name(path, data)
+        if path not in UNFINGERPRINTED:
+            names[path] = served
+        built[path] = {'path': served, 'sha256': hashlib.sha256(data).hexdigest(),
+                       'encodings': compress(path, data), 'data': data}
+    return built
+
+
+def write_build(built, build_dir=STATIC_BUILD_DIR):
+    """Write built assets, their encoded copies and manifest.json to build_dir, replacing it"""
+    if os.path.isdir(build_dir):
+        shutil.rmtree(build_dir)
+    manifest = {'version': MANIFEST_VERSION, 'assets': {}}
+    for path, asset in built.items():
+        entry = {'path': asset['path'], 'sha256': asset['sha256'], 'size': len(asset['data']), 'encodings': {}}
+        outputs = [(asset['path'], asset['data'])]
+        for coding, body in asset['encodings'].items():
+            encoded_path = f"{asset['path']}.{'gz' if coding == 'gzip' else coding}"
+            entry['encodings'][coding] = encoded_path
+            outputs.append((encoded_path, body))
+        for output_path, body in outputs:
+            full_path = os.path.join(build_dir, *output_path.split('/'))
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, 'wb') as f:
+                f.write(body)
+        manifest['assets'][path] = entry
+    # Written last: a build without its manifest is never used
+    with open(os.path.join(build_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def read_build(build_dir):
+    """Load a build written by write_build back into build_assets' form"""
+    with open(os.path.join(build_dir, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported static manifest version {manifest.get('version')}")
+
+    def read(path):
+        with open(os.path.join(build_dir, *path.split('/')), 'rb') as f:
+            return f.read()
+
+    return {path: {'path': entry['path'], 'sha256': entry['sha256'], 'data': read(entry['path']),
+                   'encodings': {coding: read(encoded) for coding, encoded in entry['encodings'].items()}}
+            for path, entry in manifest['assets'].items()}
+
+
+def build_is_current(source_dir, build_dir):
+    """Whether build_dir has a manifest at least as new as every source file"""
+    manifest_path = os.path.join(build_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return False
+    built_at = os.path.getmtime(manifest_path)
+    for root, dirs, filenames in os.walk(source_dir):
+        dirs[:] = [name for name in dirs if not name.startswith('.')
+                   and os.path.abspath(os.path.join(root, name)) != os.path.abspath(build_dir)]
+        if any(os.path.getmtime(os.path.join(root, name)) > built_at
+               for name in filenames if not name.startswith('.')):
+            return False
+    return True
+
+
+def load_static_index(source_dir, build_dir=STATIC_BUILD_DIR):
+    """Return {request path: StaticAsset} for the app's static files
+
+    Uses the build in build_dir when it is current; otherwise builds the
+    assets in memory, so a checkout without a build step still works. Every
+    asset is reachable by its source path (revalidated) and its fingerprinted
+    path (cached as immutable).
+    """
+    if build_is_current(source_dir, build_dir):
+        built = read_build(build_dir)
+        origin = build_dir
+    else:
+        built = build_assets(source_dir, build_dir)
+        origin = 'memory'
+
+    index = {}
+    for path, asset in built.items():
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type in ('application/javascript', 'image/svg+xml'):
+            content_type += '; charset=utf-8'
+        bodies = dict(asset['encodings'], identity=asset['data'])
+        etag = asset['sha256'][:2 * FINGERPRINT_LENGTH]
+        index[path] = StaticAsset(path, content_type, etag, bodies, REVALIDATE_CACHE_CONTROL)
+        if asset['path'] != path:
+            index[asset['path']] = StaticAsset(asset['path'], content_type, etag, bodies, IMMUTABLE_CACHE_CONTROL)
+    print(f"Serving {len(built)} static assets from {origin}")
+    return index
+
+
+def choose_encoding(asset):
+    """The content coding to send for asset, by the request's Accept-Encoding"""
+    accepted = request.accept_encodings
+    best, best_quality = 'identity', 0
+    # Smallest first, so a tie in quality goes to the better compression
+    for coding in ('br', 'gzip'):
+        quality = accepted[coding]
+        if coding in asset.bodies and quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def serve_asset(asset):
+    """Respond with asset, negotiating its encoding and answering If-None-Match with 304"""
+    coding = choose_encoding(asset) if len(asset.bodies) > 1 else 'identity'
+    if 'If-None-Match' in request.headers and request.if_none_match.contains_weak(asset.etags[coding]):
+        return Response(status=304, headers=asset.headers[coding])
+    return Response(asset.bodies[coding], headers=asset.headers[coding])
@@ -0,0 +1,131 @@
+import hashlib
+import os
+import threading
+import time
+
+from sqlalchemy.exc import IntegrityError
+
+from src.models.extracted_text import ExtractedText
+from src.models.user import db
+from src.services.extraction_executor import extraction_executor
+from src.services.lru_cache import LRUCache
+from src.services.resume_index import index_text, unindex_texts
+from src.services.uploads import upload_memory_budget
+
+# Extracted text cache configuration
+TEXT_CACHE_SIZE = int(os.getenv('TEXT_CACHE_SIZE', '512'))
+TEXT_CACHE_MAX_ROWS = int(os.getenv('TEXT_CACHE_MAX_ROWS', '50000'))
+
+_memory_cache = LRUCache(max_size=TEXT_CACHE_SIZE)
+_stats = {'memory_hits': 0, 'db_hits': 0, 'misses': 0, 'bytes_saved': 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def file_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def lookup_text(digest, source_bytes):
+    """Return the stored text for an upload's digest, or None (counted as a miss)"""
+    text = _memory_cache.get(digest)
+    if text is not None:
+        _count('memory_hits')
+        _count('bytes_saved', source_bytes)
+        return text
+
+    entry = db.session.get(ExtractedText, digest)
+    if entry is not None:
+        entry.last_accessed_at = time.time()
+        db.session.commit()
+        text = entry.text
+        _memory_cache.set(digest, text)
+        _count('db_hits')
+        _count('bytes_saved', source_bytes)
+        return text
+
+    _count('misses')
+    return None
+
+
+def extract_text_cached(filename, data, file_type=None):
+    """Extract text from upload bytes, reusing earlier extractions of identical files
+
+    A cache miss waits for room under the upload memory budget before it is
+    extracted. Returns a (text, digest) tuple. Must run inside an app context.
+    """
+    digest = file_digest(data)
+    text = lookup_text(digest, len(data))
+    if text is None:
+        with upload_memory_budget.reserve(len(data), wait=True):
+            text = extraction_executor.extract(filename, data, file_type)
+        store_text(digest, text, len(data))
+    return text, digest
+
+
+def extract_upload_cached(upload):
+    """extract_text_cached for a SpooledUpload
+
+    The upload is only read into memory on a cache miss, under the upload
+    memory budget (UploadBudgetExceededError when it is spent).
+    """
+    text = lookup_text(upload.digest, upload.size)
+    if text is None:
+        with upload_memory_budget.reserve(upload.size):
+            text = extraction_executor.extract(upload.filename, upload.read(), upload.file_type)
+        store_text(upload.digest, text, upload.size)
+    return text, upload.digest
+
+
+def store_text(digest, text, source_bytes):
+    """Store extracted text in both cache tiers"""
+    _memory_cache.set(digest, text)
+
+    now = time.time()
+    entry = db.session.get(ExtractedText, digest)
+    if entry is None:
+        entry = ExtractedText(digest=digest, source_bytes=source_bytes, created_at=now)
+        db.session.add(entry)
+    entry.text = text
+    entry.last_accessed_at = now
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent upload of the same file stored it first
+        db.session.rollback()
+        return
+    # Newly extracted resumes become searchable by /api/candidates/search right away
+    index_text(digest, text)
+    prune_text_cache()
+
+
+def prune_text_cache():
+    """Trim the table to TEXT_CACHE_MAX_ROWS, dropping the least recently used rows"""
+    excess = ExtractedText.query.count() - TEXT_CACHE_MAX_ROWS
+    if excess > 0:
+        stale_digests = [digest for (digest,) in db.session.query(ExtractedText.digest).order_by(
+            ExtractedText.last_accessed_at.asc()
+        ).limit(excess)]
+        ExtractedText.query.filter(
+            ExtractedText.digest.in_(stale_digests)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        unindex_texts(stale_digests)
+
+
+def text_cache_stats():
+    """Hit rate, bytes saved and storage figures for the extracted text cache"""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['memory_hits'] + stats['db_hits'] + stats['misses']
+    stats['hit_rate'] = round((stats['memory_hits'] + stats['db_hits']) / lookups, 4) if lookups else 0.0
+    stats['memory_entries'] = len(_memory_cache)
+    stats['stored_entries'] = ExtractedText.query.count()
+    stats['stored_bytes'] = db.session.query(
+        db.func.coalesce(db.func.sum(db.func.length(ExtractedText.text_compressed)), 0)
+    ).scalar()
+    return stats
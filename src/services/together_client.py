@@ -0,0 +1,258 @@
+import os
+import random
+import threading
+import time
+
+from src.services.llm_scheduler import QueueDeadlineError, llm_scheduler
+from src.services.metrics import UPSTREAM_SHORT_CIRCUITED, record_upstream
+from src.services.prompt_budget import estimate_tokens
+
+# Connection pool and resilience configuration
+TOGETHER_POOL_SIZE = int(os.getenv('TOGETHER_POOL_SIZE', '16'))
+TOGETHER_CONNECT_TIMEOUT = float(os.getenv('TOGETHER_CONNECT_TIMEOUT', '5'))
+TOGETHER_READ_TIMEOUT = float(os.getenv('TOGETHER_READ_TIMEOUT', '60'))
+TOGETHER_MAX_RETRIES = int(os.getenv('TOGETHER_MAX_RETRIES', '2'))
+TOGETHER_BACKOFF_BASE = float(os.getenv('TOGETHER_BACKOFF_BASE', '0.5'))
+TOGETHER_BACKOFF_MAX = float(os.getenv('TOGETHER_BACKOFF_MAX', '10'))
+TOGETHER_BREAKER_THRESHOLD = int(os.getenv('TOGETHER_BREAKER_THRESHOLD', '5'))
+TOGETHER_BREAKER_RESET = float(os.getenv('TOGETHER_BREAKER_RESET', '30'))
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TogetherAPIError(Exception):
+    """Raised when the Together AI API request fails"""
+
+    def __init__(self, message, status_code=None, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(TogetherAPIError):
+    """Raised without contacting the API while the circuit breaker is open"""
+
+
+class LLMOverloadedError(TogetherAPIError):
+    """Raised without contacting the API when the scheduler sheds the call"""
+
+
+def estimate_request_tokens(payload):
+    """Tokens a chat completion request may use: its messages plus max_tokens"""
+    messages = ''.join(message.get('content', '') for message in payload.get('messages', ()))
+    return estimate_tokens(messages) + payload.get('max_tokens', 0)
+
+
+def usage_tokens(result):
+    """Total tokens a chat completion response reports using, or None"""
+    usage = result.get('usage') if isinstance(result, dict) else None
+    if not usage:
+        return None
+    return usage.get('total_tokens') or usage.get('prompt_tokens', 0) + usage.get('completion_tokens', 0)
+
+
+def shed_error(error):
+    """The API error callers handle, for a call the scheduler shed"""
+    return LLMOverloadedError(f"API request shed: {str(error)}", status_code=429, retry_after=error.retry_after)
+
+
+def parse_retry_after(response):
+    """Return the Retry-After header of a response in seconds, if present"""
+    value = response.headers.get('Retry-After') if response is not None else None
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class CircuitBreaker:
+    """Fail fast after repeated upstream failures, probing again after a cool-down
+
+    The breaker opens after ``threshold`` consecutive failures. Once
+    ``reset_timeout`` seconds have passed a single trial request is let
+    through (half-open); its outcome closes or re-opens the circuit. Only
+    5xx responses, timeouts and connection errors count as failures.
+    """
+
+    def __init__(self, threshold, reset_timeout):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.opened_count = 0
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = 'half-open'
+                self._trial_in_flight = False
+            if self.state == 'half-open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == 'half-open' or self._failures >= self.threshold:
+                if self.state != 'open':
+                    self.opened_count += 1
+                self.state = 'open'
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def record_error(self, status_code, connection_failed):
+        """Record a failed request by what went wrong
+
+        A 4xx response, rate limiting included, shows the upstream is up.
+        An error raised before any request was made is neither outcome.
+        """
+        if status_code is not None and status_code < 500:
+            self.record_success()
+        elif status_code is not None or connection_failed:
+            self.record_failure()
+
+    def release_trial(self):
+        """End a half-open trial that recorded no outcome, so another can be let through"""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class TogetherClient:
+    """Shared keep-alive HTTP client for the Together AI API
+
+    The requests session is created on the first call, so importing the
+    client doesn't import requests.
+    """
+
+    def __init__(self, pool_size=TOGETHER_POOL_SIZE, max_retries=TOGETHER_MAX_RETRIES):
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.session = None
+        self.adapter = None
+        self.breaker = CircuitBreaker(TOGETHER_BREAKER_THRESHOLD, TOGETHER_BREAKER_RESET)
+        self._counters = {'requests': 0, 'retries': 0, 'failures': 0, 'short_circuited': 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _get_session(self):
+        with self._lock:
+            if self.session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount('https://', self.adapter)
+                session.mount('http://', self.adapter)
+                self.session = session
+            return self.session
+
+    def post(self, url, headers, payload, stream=False):
+        """POST a JSON payload, retrying transient failures with backoff
+
+        Returns the successful ``requests.Response``; raises TogetherAPIError
+        (or CircuitOpenError) otherwise.
+        """
+        import requests
+        session = self._get_session()
+        attempt = 0
+        estimated_tokens = estimate_request_tokens(payload)
+        while True:
+            # Every attempt waits its turn under the shared rate limits
+            try:
+                ticket = llm_scheduler.acquire(estimated_tokens)
+            except QueueDeadlineError as e:
+                raise shed_error(e)
+
+            if not self.breaker.allow_request():
+                ticket.cancel()
+                self._count('short_circuited')
+                UPSTREAM_SHORT_CIRCUITED.inc()
+                raise CircuitOpenError("API request failed: circuit breaker is open",
+                                       retry_after=self.breaker.reset_timeout)
+
+            self._count('requests')
+            response = None
+            started = time.perf_counter()
+            try:
+                response = session.post(url, headers=headers, json=payload, stream=stream,
+                                             timeout=(TOGETHER_CONNECT_TIMEOUT, TOGETHER_READ_TIMEOUT))
+                response.raise_for_status()
+                record_upstream(response.status_code, time.perf_counter() - started)
+                self.breaker.record_success()
+                if not stream:
+                    # Streamed responses carry no usage, so they keep the estimate
+                    try:
+                        actual_tokens = usage_tokens(response.json())
+                    except ValueError:
+                        actual_tokens = None
+                    if actual_tokens is not None:
+                        ticket.settle(actual_tokens)
+                return response
+            except requests.exceptions.RequestException as e:
+                status_code = response.status_code if response is not None else None
+                record_upstream(status_code, time.perf_counter() - started)
+                retry_after = parse_retry_after(response)
+                if response is not None:
+                    response.close()
+
+                self.breaker.record_error(status_code, isinstance(
+                    e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)))
+
+                retryable = status_code is None or status_code in RETRYABLE_STATUS_CODES
+                if not retryable or attempt >= self.max_retries:
+                    self._count('failures')
+                    raise TogetherAPIError(f"API request failed: {str(e)}", status_code=status_code,
+                                           retry_after=retry_after)
+            finally:
+                # However the attempt ended, a half-open trial must not stay taken
+                self.breaker.release_trial()
+
+            delay = retry_after
+            if delay is None:
+                delay = TOGETHER_BACKOFF_BASE * (2 ** attempt) * random.uniform(0.5, 1.5)
+            attempt += 1
+            self._count('retries')
+            if status_code == 429:
+                # Every queued call waits it out, and this one retries in its turn
+                llm_scheduler.pause(min(delay, TOGETHER_BACKOFF_MAX))
+            else:
+                time.sleep(min(delay, TOGETHER_BACKOFF_MAX))
+
+    def stats(self):
+        """Return request, retry, breaker and connection reuse counters"""
+        connections_opened = 0
+        pooled_requests = 0
+        pools = self.adapter.poolmanager.pools if self.adapter is not None else {}
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                connections_opened += pool.num_connections
+                pooled_requests += pool.num_requests
+
+        with self._lock:
+            counters = dict(self._counters)
+        counters.update({
+            'connections_opened': connections_opened,
+            'connections_reused': max(0, pooled_requests - connections_opened),
+            'circuit_state': self.breaker.state,
+            'circuit_opened': self.breaker.opened_count
+        })
+        return counters
+
+
+together_client = TogetherClient()
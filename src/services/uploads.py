@@ -0,0 +1,169 @@
+import codecs
+import hashlib
+import os
+import tempfile
+import threading
+import zipfile
+from contextlib import contextmanager
+
+from flask import Request
+
+# Uploads are held in memory up to this size, then spooled to a temporary file
+UPLOAD_SPOOL_BYTES = int(os.getenv('UPLOAD_SPOOL_BYTES', str(512 * 1024)))
+# Upload bytes that in-flight extractions may hold in memory at once (0 disables the budget)
+UPLOAD_MEMORY_BUDGET = int(os.getenv('UPLOAD_MEMORY_BUDGET', str(64 * 1024 * 1024)))
+# Uncompressed size limit for all the parts of a DOCX, checked before it is parsed
+MAX_DOCX_UNCOMPRESSED_BYTES = int(os.getenv('MAX_DOCX_UNCOMPRESSED_BYTES', str(64 * 1024 * 1024)))
+
+SNIFF_BYTES = 1024
+CHUNK_BYTES = 64 * 1024
+
+PDF_MAGIC = b'%PDF-'
+ZIP_MAGIC = b'PK\x03\x04'
+OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+
+class UploadRejectedError(Exception):
+    """Raised for an upload that is refused before extraction"""
+
+    def __init__(self, message, status_code=400, reason='unsupported_type'):
+        super().__init__(message)
+        self.status_code = status_code
+        self.reason = reason
+
+
+class UploadBudgetExceededError(UploadRejectedError):
+    """Raised when extracting an upload would exceed UPLOAD_MEMORY_BUDGET"""
+
+    def __init__(self):
+        super().__init__('The server is busy processing other uploads. Please try again shortly.',
+                         status_code=429, reason='memory_budget')
+
+
+class SpooledRequest(Request):
+    """Request whose uploaded files spool to disk past UPLOAD_SPOOL_BYTES"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES, mode='rb+')
+
+
+def _looks_like_text(head):
+    if b'\0' in head:
+        return False
+    try:
+        # Not final: the sniffed prefix may end partway through a character
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _inspect_docx(stream):
+    try:
+        with zipfile.ZipFile(stream) as archive:
+            members = archive.infolist()
+    except zipfile.BadZipFile:
+        return None
+    if 'word/document.xml' not in {info.filename for info in members}:
+        return None
+    if sum(info.file_size for info in members) > MAX_DOCX_UNCOMPRESSED_BYTES:
+        raise UploadRejectedError('Resume file is too large once decompressed.', 413, 'too_large')
+    return 'docx'
+
+
+def sniff_file_type(stream):
+    """Identify an upload as 'pdf', 'docx' or 'txt' from its content
+
+    Raises UploadRejectedError for anything else, including legacy binary
+    .doc files and DOCX files over MAX_DOCX_UNCOMPRESSED_BYTES, which are
+    checked from the zip directory without decompressing them. Leaves the
+    stream at position 0.
+    """
+    stream.seek(0)
+    head = stream.read(SNIFF_BYTES)
+    stream.seek(0)
+    file_type = None
+    # The PDF header may follow up to 1 KB of leading junk
+    if PDF_MAGIC in head:
+        file_type = 'pdf'
+    elif head.startswith(ZIP_MAGIC):
+        file_type = _inspect_docx(stream)
+        stream.seek(0)
+    elif head.startswith(OLE_MAGIC):
+        raise UploadRejectedError('Legacy .doc files are not supported. Please save the resume as DOCX or PDF.')
+    elif head and _looks_like_text(head):
+        file_type = 'txt'
+    if file_type is None:
+        raise UploadRejectedError('File content is not a PDF, DOCX or text document.')
+    return file_type
+
+
+class SpooledUpload:
+    """An uploaded file's stream with its size, SHA-256 and content-sniffed type
+
+    The digest is computed in chunks, so an upload that was already
+    extracted is recognized without reading it into memory.
+    """
+
+    def __init__(self, filename, stream):
+        self.filename = filename
+        self.stream = stream
+        digest = hashlib.sha256()
+        size = 0
+        stream.seek(0)
+        for chunk in iter(lambda: stream.read(CHUNK_BYTES), b''):
+            digest.update(chunk)
+            size += len(chunk)
+        self.digest = digest.hexdigest()
+        self.size = size
+        self.file_type = sniff_file_type(stream)
+
+    def read(self):
+        self.stream.seek(0)
+        return self.stream.read()
+
+
+class UploadMemoryBudget:
+    """Bounds the upload bytes that in-flight extractions hold in memory
+
+    A reservation that would take the total past the limit is refused with
+    UploadBudgetExceededError (a 429 for the client) rather than queued,
+    unless it is made with wait, as batch screening does, which blocks until
+    there is room. An upload larger than the whole budget is still let
+    through when nothing else is in flight.
+    """
+
+    def __init__(self, limit=UPLOAD_MEMORY_BUDGET):
+        self.limit = limit
+        self.in_flight = 0
+        self.peak = 0
+        self.rejected = 0
+        self._lock = threading.Condition()
+
+    def _fits(self, size):
+        return self.limit <= 0 or not self.in_flight or self.in_flight + size <= self.limit
+
+    @contextmanager
+    def reserve(self, size, wait=False):
+        with self._lock:
+            if wait:
+                self._lock.wait_for(lambda: self._fits(size))
+            elif not self._fits(size):
+                self.rejected += 1
+                raise UploadBudgetExceededError()
+            self.in_flight += size
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= size
+                self._lock.notify_all()
+
+    def stats(self):
+        with self._lock:
+            return {'limit_bytes': self.limit, 'in_flight_bytes': self.in_flight,
+                    'peak_bytes': self.peak, 'rejected': self.rejected}
+
+
+upload_memory_budget = UploadMemoryBudget()
@@ -120,13 +120,12 @@ function handleFileUpload(file) {
     // Validate file type
     const allowedTypes = [
         'application/pdf',
-        'application/msword',
         'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
         'text/plain'
     ];
     
     if (!allowedTypes.includes(file.type)) {
-        showNotification('Please upload a PDF, DOC, DOCX, or TXT file.', 'error');
+        showNotification('Please upload a PDF, DOCX, or TXT file.', 'error');
         return;
     }
     
@@ -222,23 +221,20 @@ async function startAnalysis() {
         const formData = new FormData();
         formData.append('resume', uploadedResumeFile);
         formData.append('jobDescription', jobDescription.value.trim());
+        // Score first; the optimized resume is generated in the background
+        formData.append('deferRewrite', 'true');
         
-        // Call backend API
-        const response = await fetch('/api/analyze', {
-            method: 'POST',
-            body: formData
-        });
-        
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
-        }
-        
-        const results = await response.json();
+        // Call backend API, rendering each section as soon as it streams in
+        const results = await streamAnalysis(formData, displayPartialResult);
         analysisResults = results;
         
         // Display results
         displayResults(results);
         
+        if (results.rewriteJobId) {
+            loadDeferredResume(results.rewriteJobId);
+        }
+        
     } catch (error) {
         console.error('Analysis error:', error);
         
@@ -247,6 +243,109 @@ async function startAnalysis() {
     }
 }
 
+// Stream analysis results from the server as Server-Sent Events
+async function streamAnalysis(formData, onField) {
+    const response = await fetch('/api/analyze/stream', {
+        method: 'POST',
+        body: formData
+    });
+    
+    if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let results = null;
+    
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        
+        // Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            
+            let eventName = 'message';
+            let data = '';
+            rawEvent.split('\n').forEach(line => {
+                if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            });
+            
+            if (eventName === 'field') {
+                const field = JSON.parse(data);
+                onField(field.key, field.value);
+            } else if (eventName === 'result') {
+                results = JSON.parse(data);
+            }
+        }
+    }
+    
+    if (!results) {
+        throw new Error('Analysis stream ended without a result');
+    }
+    return results;
+}
+
+// Poll the background job that generates the optimized resume
+async function loadDeferredResume(jobId) {
+    const pollInterval = 1500;
+    // Give up after three minutes; the server fails jobs it has lost, but may be unreachable
+    const maxPolls = 120;
+    
+    for (let poll = 0; ; poll++) {
+        let job;
+        try {
+            const response = await fetch(`/api/analyze/jobs/${jobId}`);
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            job = await response.json();
+        } catch (error) {
+            console.error('Resume rewrite error:', error);
+            job = { status: 'failed' };
+        }
+        
+        // Ignore results for an analysis the user has since replaced
+        if (!analysisResults || analysisResults.rewriteJobId !== jobId) return;
+        
+        if (job.status === 'completed') {
+            analysisResults.optimizedResume = job.result.optimizedResume;
+            document.getElementById('resumePreview').innerHTML = formatResumePreview(analysisResults.optimizedResume);
+            return;
+        }
+        if (job.status === 'failed' || poll + 1 >= maxPolls) {
+            document.getElementById('resumePreview').innerHTML = formatResumePreview(null);
+            return;
+        }
+        await new Promise(resolve => setTimeout(resolve, pollInterval));
+    }
+}
+
+// Render a single analysis field as soon as it is available
+function displayPartialResult(key, value) {
+    if (resultsContainer.style.display !== 'block') {
+        loadingContainer.style.display = 'none';
+        resultsContainer.style.display = 'block';
+        document.getElementById('resumePreview').innerHTML = '<p>Generating your optimized resume...</p>';
+    }
+    
+    if (key === 'matchScore') {
+        animateMatchScore(value || 75);
+    } else if (key === 'suitability') {
+        document.getElementById('suitabilityContent').innerHTML = formatSuitabilityContent(value);
+    } else if (key === 'skillGaps') {
+        document.getElementById('skillGapsContent').innerHTML = formatSkillGapsContent(value);
+    } else if (key === 'recommendations') {
+        document.getElementById('recommendationsContent').innerHTML = formatRecommendationsContent(value);
+    }
+}
+
 // Animate loading steps
 function animateLoadingSteps() {
     const steps = document.querySelectorAll('.loading-step');
@@ -283,8 +382,10 @@ function displayResults(results) {
     // Update recommendations content
     document.getElementById('recommendationsContent').innerHTML = formatRecommendationsContent(results.recommendations);
     
-    // Update resume preview
-    document.getElementById('resumePreview').innerHTML = formatResumePreview(results.optimizedResume);
+    // Update resume preview (a deferred rewrite fills it in when ready)
+    document.getElementById('resumePreview').innerHTML = results.rewriteJobId && !results.optimizedResume
+        ? '<p>Generating your optimized resume...</p>'
+        : formatResumePreview(results.optimizedResume);
     
     // Scroll to results
     resultsContainer.scrollIntoView({ behavior: 'smooth' });
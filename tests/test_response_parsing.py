@@ -0,0 +1,48 @@
+"""
+Run the malformed-response corpus (benchmarks/malformed_responses.py) through
+both parsers: parse_ai_response on the whole text, and IncrementalJSONFieldParser
+fed the text in chunks the way call_together_ai_stream does.
+"""
+
+import pytest
+
+from benchmarks.malformed_responses import CASES
+from src.routes.analysis import parse_ai_response, validate_ai_fields
+from src.services.json_stream import IncrementalJSONFieldParser
+
+CASE_IDS = [case['name'] for case in CASES]
+
+
+def stream_fields(text, chunk_size):
+    parser = IncrementalJSONFieldParser()
+    for i in range(0, len(text), chunk_size):
+        list(parser.feed(text[i:i + chunk_size]))
+    return parser.close(), parser.truncated
+
+
+def assert_expected(case, fields, missing):
+    for key, value in case['expect'].items():
+        assert fields.get(key) == value, key
+    assert missing == case.get('missing', [])
+
+
+@pytest.mark.parametrize('case', CASES, ids=CASE_IDS)
+def test_parse_ai_response(case):
+    if case['expect'] is None:
+        with pytest.raises(ValueError):
+            parse_ai_response(case['text'])
+        return
+    fields, missing, _ = parse_ai_response(case['text'])
+    assert_expected(case, fields, missing)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64])
+@pytest.mark.parametrize('case', CASES, ids=CASE_IDS)
+def test_incremental_parser(case, chunk_size):
+    fields, truncated = stream_fields(case['text'], chunk_size)
+    if case['expect'] is None:
+        with pytest.raises(ValueError):
+            validate_ai_fields(fields, truncated)
+        return
+    fields, missing, _ = validate_ai_fields(fields, truncated)
+    assert_expected(case, fields, missing)